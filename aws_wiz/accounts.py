@@ -0,0 +1,109 @@
+"""Account sources for multi-account commands (`scan --accounts ...`).
+
+Every source yields one boto3 Session per account; clients are then pooled per
+(session, service, region) by `get_client`, so each account's credentials are
+resolved once no matter how many regions are scanned.
+
+    fellows   credentials from ~/.aws-wiz/fellows.toml (as used by fellow-costs)
+    profiles  every profile in the local AWS config/credentials files
+    org       every ACTIVE account in the AWS Organization, via sts:AssumeRole
+"""
+import os
+import tomllib
+
+from aws_wiz import scheduler
+from aws_wiz.state import FELLOWS_FILE
+from aws_wiz.utils import get_client
+
+ACCOUNT_SOURCES = ("fellows", "profiles", "org")
+ORG_ROLE_NAME = "OrganizationAccountAccessRole"
+
+
+def fellow_sessions():
+    import boto3
+    if not os.path.exists(FELLOWS_FILE):
+        raise FileNotFoundError(f"{FELLOWS_FILE} not found.")
+    with open(FELLOWS_FILE, "rb") as f:
+        fellows = tomllib.load(f)
+    fellows.pop('template', None)
+    return [
+        (name, boto3.Session(
+            aws_access_key_id=creds['aws_access_key_id'],
+            aws_secret_access_key=creds['aws_secret_access_key'],
+            region_name='us-east-1'
+        ))
+        for name, creds in fellows.items()
+    ]
+
+def profile_sessions():
+    import boto3
+    return [(p, boto3.Session(profile_name=p)) for p in boto3.Session().available_profiles]
+
+def org_sessions(role_name=ORG_ROLE_NAME):
+    """One session per ACTIVE member account; the caller's own account uses the default credentials."""
+    import boto3
+    org = get_client('organizations')
+    sts = get_client('sts')
+    own_id = sts.get_caller_identity()['Account']
+
+    accounts = []
+    for page in org.get_paginator('list_accounts').paginate():
+        accounts.extend(a for a in page['Accounts'] if a['Status'] == 'ACTIVE')
+
+    def assume(account):
+        if account['Id'] == own_id:
+            return account['Name'], boto3.Session()
+        creds = sts.assume_role(
+            RoleArn=f"arn:aws:iam::{account['Id']}:role/{role_name}",
+            RoleSessionName="awiz-scan"
+        )['Credentials']
+        return account['Name'], boto3.Session(
+            aws_access_key_id=creds['AccessKeyId'],
+            aws_secret_access_key=creds['SecretAccessKey'],
+            aws_session_token=creds['SessionToken'],
+        )
+
+    sessions, errors = [], []
+    results = scheduler.sweep(assume, [(a,) for a in accounts], 'sts', return_exceptions=True)
+    for account, result in zip(accounts, results):
+        if isinstance(result, Exception):
+            errors.append({'Id': account['Id'], 'Name': account['Name'], 'Error': str(result)})
+        else:
+            sessions.append(result)
+    return sessions, errors
+
+def resolve_account(name, session):
+    """Account ID and enabled regions for one session."""
+    account_id = get_client('sts', 'us-east-1', session).get_caller_identity()['Account']
+    ec2 = get_client('ec2', 'us-east-1', session)
+    regions = [r['RegionName'] for r in ec2.describe_regions()['Regions']]
+    return {'Id': account_id, 'Name': name, 'Session': session, 'Regions': regions}
+
+def load_accounts(source, role_name=ORG_ROLE_NAME):
+    """Resolve an account source into (accounts, errors).
+
+    accounts: [{'Id', 'Name', 'Session', 'Regions'}]; errors: [{'Id', 'Name', 'Error'}]
+    """
+    errors = []
+    if source == 'fellows':
+        sessions = fellow_sessions()
+    elif source == 'profiles':
+        sessions = profile_sessions()
+    elif source == 'org':
+        sessions, errors = org_sessions(role_name)
+    else:
+        raise ValueError(f"Unknown account source '{source}' (expected one of {', '.join(ACCOUNT_SOURCES)})")
+
+    accounts = []
+    results = scheduler.sweep(resolve_account, sessions, 'sts', return_exceptions=True)
+    for (name, _), result in zip(sessions, results):
+        if isinstance(result, Exception):
+            errors.append({'Id': None, 'Name': name, 'Error': str(result)})
+        else:
+            accounts.append(result)
+
+    # Two profiles can point at the same account; scan it once
+    unique = {}
+    for account in accounts:
+        unique.setdefault(account['Id'], account)
+    return list(unique.values()), errors
@@ -0,0 +1,65 @@
+"""Shared asyncio fan-out for blocking boto3 calls.
+
+boto3 clients are synchronous, so concurrency here is still thread-backed:
+every call in flight holds one OS thread waiting on its socket. Instead of each command building (and sometimes
+leaking) its own ThreadPoolExecutor, all fan-outs submit to one process-wide
+pool capped at MAX_THREADS; aws_wiz.scheduler decides how many run at once.
+Threads start on demand and are reused across runs (the daemon refreshes
+through the same pool every interval).
+
+run() is asyncio.run plus clean Ctrl-C: the main task is cancelled, jobs
+not yet started never start, queued calls are dropped, and only calls
+already on the wire finish before the process exits.
+"""
+import threading
+
+# HTTP connections per botocore client (botocore's default is 10). get_client
+# shares one client per (session, service, region), so this is how many calls
+# one region of one account can have on the wire at once.
+MAX_POOL_CONNECTIONS = 32
+
+# Upper bound on blocking AWS calls (and so OS threads) in flight across the
+# whole process: enough to fill 8 clients' connection pools. Wide sweeps spread
+# over many regions/accounts use all of it; a sweep over fewer clients is
+# bounded by their pools, so more threads would only queue inside urllib3.
+MAX_THREADS = 8 * MAX_POOL_CONNECTIONS
+
+_executor = None
+_lock = threading.Lock()
+
+
+def executor():
+    """The shared thread pool, created on first use."""
+    global _executor
+    from concurrent.futures import ThreadPoolExecutor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_THREADS, thread_name_prefix="awiz-io")
+        return _executor
+
+def shutdown():
+    """Drop queued calls and let the pool's threads exit once their current call returns."""
+    global _executor
+    with _lock:
+        pool, _executor = _executor, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+async def call(fn, *args):
+    """Await fn(*args) on the shared pool."""
+    import asyncio
+    return await asyncio.get_running_loop().run_in_executor(executor(), fn, *args)
+
+async def gather(*aws):
+    """asyncio.gather, usable as the coroutine handed to run()."""
+    import asyncio
+    return await asyncio.gather(*aws)
+
+def run(coro):
+    """asyncio.run(coro); on Ctrl-C, cancel outstanding work instead of waiting for it."""
+    import asyncio
+    try:
+        return asyncio.run(coro)
+    except KeyboardInterrupt:
+        shutdown()
+        raise
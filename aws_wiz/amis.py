@@ -0,0 +1,147 @@
+import re
+import threading
+
+from aws_wiz.cache import read_cache, write_cache
+
+AMI_PATTERNS = {
+    'pytorch': "Deep Learning OSS Nvidia Driver AMI GPU PyTorch 2.* (Ubuntu 22.04)*",
+    'tensorflow': "Deep Learning OSS Nvidia Driver AMI GPU TensorFlow 2.* (Ubuntu 22.04)*",
+    'base': "Deep Learning Base OSS Nvidia Driver AMI (Ubuntu 22.04)*",
+}
+
+# Published DLAMI parameters, e.g.
+# /aws/service/deeplearning/ami/x86_64/oss-nvidia-driver-gpu-pytorch-2.5-ubuntu-22.04/latest/ami-id
+SSM_DLAMI_PATH = "/aws/service/deeplearning/ami/x86_64"
+# get_parameters takes at most 10 names: the window of minor versions probed
+# per framework, so one call finds the newest. Move it up as AWS publishes.
+SSM_MINOR_VERSIONS = {'pytorch': range(3, 13), 'tensorflow': range(15, 25)}
+SSM_NAMES = {
+    'pytorch': [f"{SSM_DLAMI_PATH}/oss-nvidia-driver-gpu-pytorch-2.{m}-ubuntu-22.04/latest/ami-id" for m in SSM_MINOR_VERSIONS['pytorch']],
+    'tensorflow': [f"{SSM_DLAMI_PATH}/oss-nvidia-driver-gpu-tensorflow-2.{m}-ubuntu-22.04/latest/ami-id" for m in SSM_MINOR_VERSIONS['tensorflow']],
+    'base': [f"{SSM_DLAMI_PATH}/base-oss-nvidia-driver-gpu-ubuntu-22.04/latest/ami-id"],
+}
+SSM_PATTERNS = {
+    'pytorch': re.compile(r"/oss-nvidia-driver-gpu-pytorch-(\d+)\.(\d+)-ubuntu-22\.04/latest/ami-id$"),
+    'tensorflow': re.compile(r"/oss-nvidia-driver-gpu-tensorflow-(\d+)\.(\d+)-ubuntu-22\.04/latest/ami-id$"),
+    'base': re.compile(r"/base-oss-nvidia-driver-gpu-ubuntu-22\.04/latest/ami-id$"),
+}
+
+AMI_CACHE_TTL = 6 * 3600
+
+_subscriptions = {}
+_subscriptions_lock = threading.Lock()
+
+
+def describe_latest_images(region, framework, count=3):
+    import boto3
+    ec2 = boto3.client('ec2', region_name=region)
+    filters = [
+        {'Name': 'name', 'Values': [AMI_PATTERNS[framework]]},
+        {'Name': 'state', 'Values': ['available']},
+        {'Name': 'owner-alias', 'Values': ['amazon']},
+        {'Name': 'architecture', 'Values': ['x86_64']}
+    ]
+    try:
+        response = ec2.describe_images(Filters=filters)
+    except Exception:
+        return []
+    images = response.get('Images', [])
+    images.sort(key=lambda x: x['CreationDate'], reverse=True)
+    return [
+        {'ImageId': i['ImageId'], 'Name': i['Name'], 'CreationDate': i['CreationDate']}
+        for i in images[:count]
+    ]
+
+def ssm_latest_images(region, framework):
+    """Latest image from the public DLAMI SSM parameters: one get_parameters call, no image-set scan."""
+    import boto3
+    ssm = boto3.client('ssm', region_name=region)
+    pattern = SSM_PATTERNS[framework]
+    best = None
+    try:
+        # Versions not published in this region come back as InvalidParameters
+        params = ssm.get_parameters(Names=SSM_NAMES[framework]).get('Parameters', [])
+    except Exception:
+        return []
+    for param in params:
+        m = pattern.search(param['Name'])
+        if not m:
+            continue
+        version = tuple(int(v) for v in m.groups())
+        if best is None or version > best[0]:
+            best = (version, param)
+    if best is None:
+        return []
+
+    param = best[1]
+    image = {
+        'ImageId': param['Value'],
+        'Name': param['Name'].split('/')[-3],
+        'CreationDate': param['LastModifiedDate'].isoformat()
+    }
+    # Keyed lookup for the display name and date; cheap compared to a name search
+    try:
+        ec2 = boto3.client('ec2', region_name=region)
+        found = ec2.describe_images(ImageIds=[image['ImageId']]).get('Images', [])
+        if found:
+            image['Name'] = found[0]['Name']
+            image['CreationDate'] = found[0]['CreationDate']
+    except Exception:
+        pass
+    return [image]
+
+def get_latest_images(region, framework, refresh=False):
+    """Latest images per (region, framework): TTL cache, then SSM, then describe_images."""
+    cache_key = f"ami-{region}-{framework}"
+    if not refresh:
+        cached = read_cache(cache_key, AMI_CACHE_TTL)
+        if cached:
+            return cached
+
+    images = ssm_latest_images(region, framework) or describe_latest_images(region, framework)
+    if images:
+        write_cache(cache_key, images)
+    return images
+
+def resolve_latest_ami(region, framework, refresh=False):
+    images = get_latest_images(region, framework, refresh)
+    return images[0]['ImageId'] if images else None
+
+def check_ami_subscription(region, ami_id):
+    """
+    Checks if the account is subscribed to the AMI by attempting a DryRun launch.
+    Results are memoised per (region, AMI) for the life of the process.
+    Returns: (is_subscribed, message/link)
+    """
+    import boto3
+    from botocore.exceptions import ClientError
+    key = (region, ami_id)
+    with _subscriptions_lock:
+        if key in _subscriptions:
+            return _subscriptions[key]
+
+    ec2 = boto3.client('ec2', region_name=region)
+    try:
+        ec2.run_instances(
+            ImageId=ami_id,
+            InstanceType='t3.nano',
+            MaxCount=1,
+            MinCount=1,
+            DryRun=True
+        )
+        result = (True, "Subscription Active")
+    except ClientError as e:
+        code = e.response['Error']['Code']
+
+        if code == 'DryRunOperation':
+            result = (True, "Subscription Active")
+        elif code == 'OptInRequired':
+            result = (False, "Opt-In Required")
+        else:
+            result = (False, f"Error: {code}")
+
+    # Transient errors are retried on the next call
+    if not result[1].startswith("Error"):
+        with _subscriptions_lock:
+            _subscriptions[key] = result
+    return result
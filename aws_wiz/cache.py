@@ -0,0 +1,66 @@
+import hashlib
+import json
+import os
+import time
+from collections.abc import Mapping
+from datetime import datetime
+
+from aws_wiz.state import STATE_DIR
+
+CACHE_DIR = STATE_DIR / "cache"
+
+
+def json_default(obj):
+    """JSON fallback: ISO timestamps, records/mappings as dicts, str() for anything else."""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    return str(obj)
+
+
+def identity_key():
+    """Offline key for the AWS identity in use: profile, env access key ID and endpoint.
+
+    Account-specific caches and the daemon are keyed by it, so switching
+    AWS_PROFILE (or credentials, or endpoint) never serves another account's data.
+    """
+    parts = (
+        os.environ.get("AWS_PROFILE") or os.environ.get("AWS_DEFAULT_PROFILE") or "default",
+        os.environ.get("AWS_ACCESS_KEY_ID", ""),
+        os.environ.get("AWS_ENDPOINT_URL", ""),
+    )
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()[:12]
+
+
+def account_cache(name):
+    """Cache name scoped to the current AWS identity."""
+    return f"{name}-{identity_key()}"
+
+
+def read_cache(name, ttl=None):
+    """Return the cached payload for `name`, or None if missing or older than `ttl` seconds."""
+    path = CACHE_DIR / f"{name}.json"
+    try:
+        if ttl is not None and time.time() - path.stat().st_mtime > ttl:
+            return None
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_cache(name, data):
+    """Atomically store `data` as JSON under the cache directory."""
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        path = CACHE_DIR / f"{name}.json"
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "w") as f:
+            json.dump(data, f, default=json_default)
+        os.replace(tmp, path)
+    except OSError:
+        # The cache is an optimisation only; never fail a command because of it
+        pass
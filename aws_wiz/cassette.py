@@ -0,0 +1,200 @@
+"""Record/replay of AWS API traffic (`awiz --record` / `--replay` / `--offline`).
+
+A cassette is NDJSON, one line per HTTP attempt: service, region, operation,
+a hash of the call's parameters, the raw response (status, headers, body)
+and the latency measured while recording. Files ending in .zst are zstd
+compressed (needs the optional `zstandard` package), .gz gzip, anything
+else is plain text; reading sniffs the format.
+
+Replay answers requests on botocore's `before-send` event, so responses go
+through the normal parsers, retry handlers and paginators. Each response is
+delayed by its recorded latency times `speed` (0 = no delay), which keeps
+the fan-out shape of the original run. A request is matched on its exact
+parameters first, then on (service, region, operation) in recorded order,
+so calls with time-dependent parameters (CloudWatch windows, Cost Explorer
+dates) still replay. Without --offline unmatched requests go to AWS; with
+it they fail like an unreachable endpoint, are never sent, and clients use
+placeholder credentials.
+
+Recording stores responses verbatim; treat cassettes like the account data
+they contain. Streaming bodies (S3 GetObject) are recorded empty.
+"""
+import base64
+import gzip
+import hashlib
+import io
+import json
+import threading
+import time
+from collections import defaultdict, deque
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+_KEY = "awiz_cassette_key"
+_SENT = "awiz_cassette_sent"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+class CassetteMiss(Exception):
+    """No recorded response for a request while running --offline."""
+
+
+def request_key(params):
+    return hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+def check_path(path):
+    """Raise ValueError if `path` needs a codec that is not installed."""
+    if str(path).endswith(".zst") and zstandard is None:
+        raise ValueError("zstandard is not installed; use a .ndjson.gz or .ndjson cassette")
+
+def write_lines(path, lines):
+    data = "".join(line + "\n" for line in lines).encode()
+    if str(path).endswith(".zst"):
+        data = zstandard.ZstdCompressor(level=10).compress(data)
+    elif str(path).endswith(".gz"):
+        data = gzip.compress(data)
+    with open(path, "wb") as f:
+        f.write(data)
+
+def read_lines(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    if data.startswith(_ZSTD_MAGIC):
+        if zstandard is None:
+            raise ValueError(f"{path} is zstd compressed; install zstandard to read it")
+        data = zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    elif data.startswith(_GZIP_MAGIC):
+        data = gzip.decompress(data)
+    return [line for line in data.decode().splitlines() if line]
+
+def _operation(event_name):
+    return event_name.rsplit(".", 1)[-1]
+
+
+class _Raw(io.BytesIO):
+    """Stands in for the urllib3 response botocore reads bodies from."""
+
+    def stream(self, **kwargs):
+        chunk = self.read()
+        while chunk:
+            yield chunk
+            chunk = self.read()
+
+
+class _Hooks:
+    """Attaches per-client event handlers to every botocore client created after install()."""
+
+    def install(self):
+        from botocore.session import Session
+        create_client = Session.create_client
+        hooks = self
+
+        def hooked_create_client(session, *args, **kwargs):
+            client = create_client(session, *args, **hooks.client_kwargs(kwargs))
+            hooks.attach(client, client.meta.service_model.service_name, client.meta.region_name or "global")
+            return client
+
+        Session.create_client = hooked_create_client
+
+    def client_kwargs(self, kwargs):
+        return kwargs
+
+    @staticmethod
+    def remember_key(params, context, **kwargs):
+        context[_KEY] = request_key(params)
+
+
+class Recorder(_Hooks):
+    def __init__(self, path):
+        check_path(path)
+        self.path = path
+        self.lines = []
+        self.lock = threading.Lock()
+
+    def attach(self, client, service, region):
+        events = client.meta.events
+        events.register("before-parameter-build", self.remember_key)
+        events.register("before-send", self.stamp)
+        events.register("response-received", lambda **kw: self.record(service, region, **kw))
+
+    @staticmethod
+    def stamp(request, **kwargs):
+        if request.context is not None:
+            request.context[_SENT] = time.perf_counter()
+
+    def record(self, service, region, response_dict, context, event_name, **kwargs):
+        if response_dict is None or _SENT not in context:
+            return
+        body = response_dict["body"]
+        if not isinstance(body, bytes):
+            body = b""
+        entry = {
+            "s": service, "r": region, "o": _operation(event_name), "k": context.get(_KEY),
+            "ms": round((time.perf_counter() - context[_SENT]) * 1000, 1),
+            "st": response_dict["status_code"], "h": dict(response_dict["headers"]),
+        }
+        try:
+            entry["b"] = body.decode()
+        except UnicodeDecodeError:
+            entry["b64"] = base64.b64encode(body).decode()
+        line = json.dumps(entry, separators=(",", ":"))
+        with self.lock:
+            self.lines.append(line)
+
+    def save(self):
+        write_lines(self.path, self.lines)
+        return len(self.lines)
+
+
+class Player(_Hooks):
+    def __init__(self, path, speed=1.0, offline=False):
+        self.speed = speed
+        self.offline = offline
+        self.lock = threading.Lock()
+        self.exact = defaultdict(deque)
+        self.by_operation = defaultdict(deque)
+        self.served = self.missed = 0
+        for line in read_lines(path):
+            entry = json.loads(line)
+            self.exact[(entry["s"], entry["r"], entry["o"], entry["k"])].append(entry)
+            self.by_operation[(entry["s"], entry["r"], entry["o"])].append(entry)
+
+    def client_kwargs(self, kwargs):
+        # Nothing leaves the machine offline, so placeholder keys stand in for
+        # real credentials (and skip the credential provider chain entirely)
+        if self.offline and kwargs.get("aws_access_key_id") is None:
+            kwargs = {**kwargs, "aws_access_key_id": "offline", "aws_secret_access_key": "offline", "aws_session_token": None}
+        return kwargs
+
+    def attach(self, client, service, region):
+        events = client.meta.events
+        events.register("before-parameter-build", self.remember_key)
+        events.register("before-send", lambda request, event_name, **kw: self.respond(service, region, request, event_name))
+
+    def take(self, queue):
+        # Serve recorded attempts in order; the last one answers any repeats
+        return queue.popleft() if len(queue) > 1 else queue[0]
+
+    def respond(self, service, region, request, event_name):
+        from botocore.awsrequest import AWSResponse
+        operation = _operation(event_name)
+        key = (request.context or {}).get(_KEY)
+        with self.lock:
+            queue = self.exact.get((service, region, operation, key)) or self.by_operation.get((service, region, operation))
+            entry = self.take(queue) if queue else None
+            if entry is None:
+                self.missed += 1
+            else:
+                self.served += 1
+        if entry is None:
+            if self.offline:
+                raise CassetteMiss(f"No recorded response for {service}.{operation} in {region}")
+            return None
+        if self.speed:
+            time.sleep(entry["ms"] / 1000 * self.speed)
+        body = base64.b64decode(entry["b64"]) if "b64" in entry else entry["b"].encode()
+        return AWSResponse(request.url, entry["st"], entry["h"], _Raw(body))
@@ -1,47 +1,127 @@
+import importlib
+import os
+from pathlib import Path
+
 import click
+from click.shell_completion import CompletionItem
 
-from aws_wiz.commands.scan import scan
-from aws_wiz.commands.launch import launch
-from aws_wiz.commands.quota_check import quota_check
-from aws_wiz.commands.quota_request import quota_request
-from aws_wiz.commands.quota_status import quota_status
-from aws_wiz.commands.list_instances import list_instances
-from aws_wiz.commands.ami import ami
-from aws_wiz.commands.start import start
-from aws_wiz.commands.stop import stop
-from aws_wiz.commands.terminate import terminate
-from aws_wiz.commands.costs import costs
-from aws_wiz.commands.fellow_costs import fellow_costs
-from aws_wiz.commands.create_auditor import create_auditor
-from aws_wiz.commands.cleanup_sg import cleanup_sg
-from aws_wiz.commands.cleanup_vpc import cleanup_vpc
-from aws_wiz.commands.nuke import nuke
-from aws_wiz.commands.create_cluster import create_cluster
-from aws_wiz.commands.setup_iam import setup_iam
-from aws_wiz.commands.completion import completion
-
-
-@click.group()
-@click.version_option(version="0.1.0", prog_name="awiz")
-def cli():
-    """AWS infrastructure CLI for rapid prototyping."""
+from aws_wiz import __version__
+
+
+# name -> (module, attribute, short help). Modules are imported only when the
+# command is dispatched, so `awiz --help` and tab completion never load boto3.
+# Completing an option value does import the command's module (click needs its
+# shell_complete callback), so command modules import boto3, rich and asyncio
+# inside the functions that use them. tests/test_startup.py enforces both, and
+# that each short help here matches the command's docstring.
+LAZY_COMMANDS = {
+    "scan": ("aws_wiz.commands.scan", "scan", "Global snapshot of resources across all regions."),
+    "query": ("aws_wiz.commands.query", "query", "Query the latest scan with an indexed filter expression."),
+    "launch": ("aws_wiz.commands.launch", "launch", "Launch a GPU instance and manage SSH keys automatically."),
+    "quota-check": ("aws_wiz.commands.quota_check", "quota_check", "Check GPU/Standard vCPU quota limits across regions."),
+    "quota-request": ("aws_wiz.commands.quota_request", "quota_request", "Request service quota increases (one pair, a code x region matrix, or a spec file)."),
+    "quota-status": ("aws_wiz.commands.quota_status", "quota_status", "Check status of service quota increase requests."),
+    "list-instances": ("aws_wiz.commands.list_instances", "list_instances", "List EC2 instance types matching a substring."),
+    "ami": ("aws_wiz.commands.ami", "ami", "Find and validate AWS Deep Learning AMIs."),
+    "start": ("aws_wiz.commands.start", "start", "Start an EC2 instance."),
+    "stop": ("aws_wiz.commands.stop", "stop", "Stop an EC2 instance."),
+    "idle": ("aws_wiz.commands.idle", "idle", "Find running instances that have been idle (CPU/network/GPU) over a window."),
+    "terminate": ("aws_wiz.commands.terminate", "terminate", "Safely terminate an AWS resource (EC2 Instance or S3 Bucket)."),
+    "costs": ("aws_wiz.commands.costs", "costs", "AWS Cost Statement with improved vertical spacing and Net Cost row."),
+    "fellow-costs": ("aws_wiz.commands.fellow_costs", "fellow_costs", "Detailed financial audit for all fellows."),
+    "create-auditor": ("aws_wiz.commands.create_auditor", "create_auditor", "Creates a restricted IAM user for cost auditing."),
+    "cleanup-sg": ("aws_wiz.commands.cleanup_sg", "cleanup_sg", "Find and delete unused Security Groups."),
+    "cleanup-vpc": ("aws_wiz.commands.cleanup_vpc", "cleanup_vpc", "Deep cleanup of non-default VPCs and their dependencies."),
+    "nuke": ("aws_wiz.commands.nuke", "nuke", "Nuclear option: Delete ALL AWS resources (except S3 buckets)"),
+    "create-cluster": ("aws_wiz.commands.create_cluster", "create_cluster", "Create a 4-machine cluster with custom NAT"),
+    "s3-bench": ("aws_wiz.commands.s3_bench", "s3_bench", "Benchmark S3 throughput (parallel PUT/GET, multipart and ranged reads)."),
+    "setup-iam": ("aws_wiz.commands.setup_iam", "setup_iam", "Set up IAM role and instance profile for S3 throughput testing."),
+    "daemon": ("aws_wiz.commands.daemon", "daemon", "Background daemon that keeps scan/quota data warm for other commands."),
+    "completion": ("aws_wiz.commands.completion", "completion", "Output shell completion script for awiz."),
+}
+
+
+class LazyGroup(click.Group):
+    """click.Group that resolves command modules from LAZY_COMMANDS on demand."""
+
+    def __init__(self, *args, lazy_commands=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = lazy_commands or {}
 
-cli.add_command(scan)
-cli.add_command(launch)
-cli.add_command(quota_check, "quota-check")
-cli.add_command(quota_request, "quota-request")
-cli.add_command(quota_status, "quota-status")
-cli.add_command(list_instances, "list-instances")
-cli.add_command(ami)
-cli.add_command(start)
-cli.add_command(stop)
-cli.add_command(terminate)
-cli.add_command(costs)
-cli.add_command(fellow_costs, "fellow-costs")
-cli.add_command(create_auditor, "create-auditor")
-cli.add_command(cleanup_sg, "cleanup-sg")
-cli.add_command(cleanup_vpc, "cleanup-vpc")
-cli.add_command(nuke)
-cli.add_command(create_cluster, "create-cluster")
-cli.add_command(setup_iam, "setup-iam")
-cli.add_command(completion)
+    def list_commands(self, ctx):
+        return sorted({*self.commands, *self.lazy_commands})
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name in self.commands:
+            return self.commands[cmd_name]
+        if cmd_name not in self.lazy_commands:
+            return None
+        module_name, attr, _ = self.lazy_commands[cmd_name]
+        command = getattr(importlib.import_module(module_name), attr)
+        self.commands[cmd_name] = command
+        return command
+
+    def _short_help(self, ctx, name, limit):
+        if name in self.lazy_commands and name not in self.commands:
+            help_text = self.lazy_commands[name][2]
+            # Same truncation rule click applies to docstrings
+            return click.utils.make_default_short_help(help_text, limit)
+        return self.get_command(ctx, name).get_short_help_str(limit)
+
+    def format_commands(self, ctx, formatter):
+        names = self.list_commands(ctx)
+        if not names:
+            return
+        limit = formatter.width - 6 - max(len(name) for name in names)
+        rows = [(name, self._short_help(ctx, name, limit)) for name in names]
+        with formatter.section("Commands"):
+            formatter.write_dl(rows)
+
+    def shell_complete(self, ctx, incomplete):
+        results = [
+            CompletionItem(name, help=self._short_help(ctx, name, 45))
+            for name in self.list_commands(ctx)
+            if name.startswith(incomplete)
+        ]
+        results.extend(click.Command.shell_complete(self, ctx, incomplete))
+        return results
+
+
+@click.group(cls=LazyGroup, lazy_commands=LAZY_COMMANDS)
+@click.version_option(version=__version__, prog_name="awiz")
+@click.option('--trace', is_flag=True, help='Time every AWS API call; print a summary and write a Chrome trace.')
+@click.option('--trace-file', type=click.Path(dir_okay=False, path_type=Path), help='Chrome trace output (default: ~/.aws-wiz/traces/trace-<time>.json); implies --trace.')
+@click.option('--record', type=click.Path(dir_okay=False, path_type=Path), help='Record every AWS response to a cassette (.ndjson, .ndjson.gz or .ndjson.zst).')
+@click.option('--replay', type=click.Path(exists=True, dir_okay=False, path_type=Path), help='Answer AWS calls from a recorded cassette; unmatched calls still go to AWS.')
+@click.option('--offline', is_flag=True, help='With --replay, never contact AWS: unmatched calls fail.')
+@click.option('--replay-speed', default=1.0, type=click.FloatRange(0), show_default=True, help='Scale recorded latencies during replay (0 = no delay).')
+@click.pass_context
+def cli(ctx, trace, trace_file, record, replay, offline, replay_speed):
+    """AWS infrastructure CLI for rapid prototyping."""
+    if record and replay:
+        raise click.UsageError("--record and --replay are mutually exclusive.")
+    if offline and not replay:
+        raise click.UsageError("--offline needs --replay CASSETTE.")
+    if record or replay:
+        from aws_wiz import cassette
+        # Daemon answers would be neither recorded nor replayed
+        os.environ["AWIZ_NO_DAEMON"] = "1"
+        if record:
+            try:
+                recorder = cassette.Recorder(record)
+            except ValueError as e:
+                raise click.BadParameter(str(e), param_hint="--record")
+            recorder.install()
+            ctx.call_on_close(lambda: click.echo(f"Recorded {recorder.save()} responses to {record}", err=True))
+        else:
+            try:
+                player = cassette.Player(replay, replay_speed, offline)
+            except ValueError as e:
+                raise click.BadParameter(str(e), param_hint="--replay")
+            player.install()
+            ctx.call_on_close(lambda: click.echo(f"Replayed {player.served} responses from {replay} ({player.missed} unmatched)", err=True))
+    if trace or trace_file:
+        from aws_wiz.trace import Tracer
+        tracer = Tracer()
+        tracer.install()
+        ctx.call_on_close(lambda: tracer.report(trace_file))
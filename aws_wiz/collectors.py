@@ -0,0 +1,296 @@
+"""Registry of the resource kinds `awiz scan` collects.
+
+Each Collector declares one kind: the boto3 operation that lists it (and
+whether to paginate), where the items sit in a response, an optional
+per-item detail call, the projection of an item onto a record, the ARN type
+the tagging API reports it under, and how `scan --pretty` shows it. scan
+runs every (kind, region) pair as its own job on the scheduler, so kinds
+are collected concurrently and throttle per service; `--kinds` picks which
+ones a run pays for.
+
+Kinds without `columns` are rendered by scan's own sections (the original
+EC2/VPC tables); the rest get a generic table.
+"""
+from dataclasses import dataclass, field
+
+from aws_wiz.records import (
+    EksCluster, ElasticIp, Image, Instance, InternetGateway, KeyPair, LoadBalancer, NatGateway,
+    NetworkInterface, NO_TAGS, SageMakerEndpoint, SecurityGroup, Snapshot, Subnet, Volume, Vpc,
+    tags_of,
+)
+
+
+@dataclass(frozen=True)
+class Collector:
+    kind: str
+    service: str
+    operation: str
+    # Response key holding the items, or a callable(page) -> items
+    items: object
+    # callable(item, region, account) -> record
+    project: object
+    id_field: str
+    title: str
+    paginate: bool = True
+    params: dict = field(default_factory=dict)
+    # callable(client, item) -> item: one extra call per item for attributes the listing lacks
+    detail: object = None
+    # (service, resource type) in the kind's ARNs, as the tagging API reports them
+    arn: tuple = None
+    # callable(resource_id, tags, region, account) -> record, for `scan --tagged`
+    from_tags: object = None
+    aliases: tuple = ()
+    # (header, record field) pairs for the generic table, and how many rows it shows
+    columns: tuple = ()
+    max_rows: int = 10
+    # Collected when --kinds is not given
+    default: bool = True
+
+    def collect(self, client, region, account):
+        if self.paginate:
+            pages = client.get_paginator(self.operation).paginate(**self.params)
+        else:
+            pages = [getattr(client, self.operation)(**self.params)]
+        records = []
+        for page in pages:
+            for item in self.items(page) if callable(self.items) else page.get(self.items, []):
+                if self.detail is not None:
+                    item = self.detail(client, item)
+                records.append(self.project(item, region, account))
+        return records
+
+    def render(self, console, records, account_names=None):
+        from rich.table import Table
+        from rich import box
+        console.print(f"\n[bold cyan]{self.title}[/bold cyan] [dim]({len(records)} found)[/dim]")
+        if not records:
+            return
+        table = Table(box=box.SIMPLE)
+        for header, _ in self.columns:
+            table.add_column(header)
+        table.add_column("Region", style="dim")
+        if account_names: table.add_column("Account", style="dim")
+        for r in records[:self.max_rows]:
+            row = [_cell(r.get(name)) for _, name in self.columns] + [r.get('Region') or "-"]
+            if account_names: row.append(account_names.get(r.get('Account'), r.get('Account') or "-"))
+            table.add_row(*row)
+        console.print(table)
+        if len(records) > self.max_rows: console.print(f"[dim]...and {len(records) - self.max_rows} more.[/dim]")
+
+
+def _cell(value):
+    if value is None or value == "":
+        return "-"
+    if hasattr(value, "strftime"):
+        return value.strftime("%Y-%m-%d %H:%M")
+    return str(value)
+
+def _name(item):
+    return tags_of(item.get('Tags')).get('Name', "-")
+
+
+def instance(i, region, account):
+    return Instance(
+        InstanceId=i.get('InstanceId'),
+        InstanceType=i.get('InstanceType'),
+        State=i.get('State', {}).get('Name'),
+        PublicIpAddress=i.get('PublicIpAddress'),
+        PrivateIpAddress=i.get('PrivateIpAddress'),
+        LaunchTime=i.get('LaunchTime'),
+        KeyName=i.get('KeyName'),
+        ImageId=i.get('ImageId'),
+        PlatformDetails=i.get('PlatformDetails', ''),
+        InstanceLifecycle=i.get('InstanceLifecycle'),
+        VpcId=i.get('VpcId'),
+        SubnetId=i.get('SubnetId'),
+        Tags=tags_of(i.get('Tags')),
+        Region=region,
+        Account=account
+    )
+
+def load_balancer(lb, region, account):
+    return LoadBalancer(
+        LoadBalancerName=lb.get('LoadBalancerName'),
+        LoadBalancerArn=lb.get('LoadBalancerArn'),
+        Type=lb.get('Type'),
+        Scheme=lb.get('Scheme'),
+        State=lb.get('State', {}).get('Code'),
+        VpcId=lb.get('VpcId'),
+        DNSName=lb.get('DNSName'),
+        CreateTime=lb.get('CreatedTime'),
+        Region=region,
+        Account=account
+    )
+
+def eks_cluster(c, region, account):
+    return EksCluster(
+        Name=c.get('name'),
+        Arn=c.get('arn'),
+        State=c.get('status'),
+        Version=c.get('version'),
+        CreateTime=c.get('createdAt'),
+        # EKS returns tags as a map already
+        Tags=dict(c['tags']) if c.get('tags') else NO_TAGS,
+        Region=region,
+        Account=account
+    )
+
+
+REGISTRY = [
+    Collector(
+        kind="ec2", service="ec2", operation="describe_instances",
+        items=lambda page: [i for r in page.get('Reservations', []) for i in r.get('Instances', [])],
+        project=instance, id_field="InstanceId", title="EC2 Instances",
+        arn=("ec2", "instance"), aliases=("instance", "instances"),
+    ),
+    Collector(
+        kind="volumes", service="ec2", operation="describe_volumes", items="Volumes",
+        project=lambda v, region, account: Volume(
+            VolumeId=v.get('VolumeId'), Size=v.get('Size'), VolumeType=v.get('VolumeType'),
+            State=v.get('State'), CreateTime=v.get('CreateTime'), Region=region, Account=account,
+        ),
+        id_field="VolumeId", title="EBS Volumes", arn=("ec2", "volume"), aliases=("volume",),
+    ),
+    Collector(
+        kind="security_groups", service="ec2", operation="describe_security_groups", items="SecurityGroups",
+        project=lambda sg, region, account: SecurityGroup(
+            GroupId=sg.get('GroupId'), GroupName=sg.get('GroupName'), Description=sg.get('Description'),
+            VpcId=sg.get('VpcId'), Region=region, Account=account,
+        ),
+        id_field="GroupId", title="Security Groups", arn=("ec2", "security-group"),
+        from_tags=lambda rid, tags, region, account: SecurityGroup(GroupId=rid, Region=region, Account=account),
+        aliases=("sg", "sgs"),
+    ),
+    Collector(
+        kind="key_pairs", service="ec2", operation="describe_key_pairs", items="KeyPairs", paginate=False,
+        project=lambda k, region, account: KeyPair(
+            KeyName=k.get('KeyName'), KeyPairId=k.get('KeyPairId'), Region=region, Account=account,
+        ),
+        id_field="KeyName", title="Key Pairs", arn=("ec2", "key-pair"), aliases=("key", "keys"),
+    ),
+    Collector(
+        kind="elastic_ips", service="ec2", operation="describe_addresses", items="Addresses", paginate=False,
+        project=lambda e, region, account: ElasticIp(
+            PublicIp=e.get('PublicIp'), AllocationId=e.get('AllocationId'), Region=region, Account=account,
+        ),
+        id_field="AllocationId", title="Elastic IPs", arn=("ec2", "elastic-ip"), aliases=("eip", "eips"),
+    ),
+    Collector(
+        kind="vpcs", service="ec2", operation="describe_vpcs", items="Vpcs",
+        project=lambda v, region, account: Vpc(
+            VpcId=v.get('VpcId'), IsDefault=v.get('IsDefault'), CidrBlock=v.get('CidrBlock'),
+            Name=_name(v), Region=region, Account=account,
+        ),
+        id_field="VpcId", title="VPCs", arn=("ec2", "vpc"),
+        from_tags=lambda rid, tags, region, account: Vpc(VpcId=rid, IsDefault=None, Name=tags.get('Name', "-"), Region=region, Account=account),
+        aliases=("vpc",),
+    ),
+    Collector(
+        kind="subnets", service="ec2", operation="describe_subnets", items="Subnets",
+        project=lambda s, region, account: Subnet(
+            SubnetId=s.get('SubnetId'), VpcId=s.get('VpcId'), CidrBlock=s.get('CidrBlock'),
+            Name=_name(s), Region=region, Account=account,
+        ),
+        id_field="SubnetId", title="Subnets", arn=("ec2", "subnet"),
+        from_tags=lambda rid, tags, region, account: Subnet(SubnetId=rid, Name=tags.get('Name', "-"), Region=region, Account=account),
+        aliases=("subnet",),
+    ),
+    Collector(
+        kind="igws", service="ec2", operation="describe_internet_gateways", items="InternetGateways",
+        project=lambda i, region, account: InternetGateway(
+            InternetGatewayId=i.get('InternetGatewayId'),
+            VpcId=i['Attachments'][0]['VpcId'] if i.get('Attachments') else "-",
+            Name=_name(i), Region=region, Account=account,
+        ),
+        id_field="InternetGatewayId", title="Internet Gateways", arn=("ec2", "internet-gateway"),
+        from_tags=lambda rid, tags, region, account: InternetGateway(InternetGatewayId=rid, Name=tags.get('Name', "-"), Region=region, Account=account),
+        aliases=("igw",),
+    ),
+    # Leftovers that cost money while idle; opt in with --kinds
+    Collector(
+        kind="nat_gateways", service="ec2", operation="describe_nat_gateways", items="NatGateways",
+        params={'Filters': [{'Name': 'state', 'Values': ['pending', 'available', 'failed']}]},
+        project=lambda n, region, account: NatGateway(
+            NatGatewayId=n.get('NatGatewayId'), State=n.get('State'), VpcId=n.get('VpcId'),
+            SubnetId=n.get('SubnetId'),
+            PublicIp=next((a.get('PublicIp') for a in n.get('NatGatewayAddresses', []) if a.get('PublicIp')), None),
+            CreateTime=n.get('CreateTime'), Tags=tags_of(n.get('Tags')), Region=region, Account=account,
+        ),
+        id_field="NatGatewayId", title="NAT Gateways", arn=("ec2", "natgateway"), aliases=("nat", "nats"),
+        columns=(("NAT Gateway ID", "NatGatewayId"), ("State", "State"), ("VPC", "VpcId"),
+                 ("Public IP", "PublicIp"), ("Created", "CreateTime")),
+        default=False,
+    ),
+    Collector(
+        kind="network_interfaces", service="ec2", operation="describe_network_interfaces", items="NetworkInterfaces",
+        # Unattached only: attached ENIs belong to something already listed
+        params={'Filters': [{'Name': 'status', 'Values': ['available']}]},
+        project=lambda e, region, account: NetworkInterface(
+            NetworkInterfaceId=e.get('NetworkInterfaceId'), State=e.get('Status'),
+            InterfaceType=e.get('InterfaceType'), VpcId=e.get('VpcId'), SubnetId=e.get('SubnetId'),
+            PrivateIpAddress=e.get('PrivateIpAddress'), Description=e.get('Description'),
+            Tags=tags_of(e.get('TagSet')), Region=region, Account=account,
+        ),
+        id_field="NetworkInterfaceId", title="Unattached Network Interfaces", arn=("ec2", "network-interface"),
+        aliases=("eni", "enis"),
+        columns=(("ENI ID", "NetworkInterfaceId"), ("Type", "InterfaceType"), ("VPC", "VpcId"),
+                 ("Private IP", "PrivateIpAddress"), ("Description", "Description")),
+        default=False,
+    ),
+    Collector(
+        kind="snapshots", service="ec2", operation="describe_snapshots", items="Snapshots",
+        params={'OwnerIds': ['self']},
+        project=lambda s, region, account: Snapshot(
+            SnapshotId=s.get('SnapshotId'), VolumeId=s.get('VolumeId'), VolumeSize=s.get('VolumeSize'),
+            State=s.get('State'), StartTime=s.get('StartTime'), Description=s.get('Description'),
+            Tags=tags_of(s.get('Tags')), Region=region, Account=account,
+        ),
+        id_field="SnapshotId", title="EBS Snapshots", arn=("ec2", "snapshot"), aliases=("snapshot", "snap", "snaps"),
+        columns=(("Snapshot ID", "SnapshotId"), ("Size (GiB)", "VolumeSize"), ("State", "State"),
+                 ("Volume", "VolumeId"), ("Started", "StartTime")),
+        default=False,
+        max_rows=5,
+    ),
+    Collector(
+        kind="images", service="ec2", operation="describe_images", items="Images",
+        params={'Owners': ['self']},
+        project=lambda i, region, account: Image(
+            ImageId=i.get('ImageId'), Name=i.get('Name'), State=i.get('State'),
+            CreationDate=i.get('CreationDate'), Tags=tags_of(i.get('Tags')), Region=region, Account=account,
+        ),
+        id_field="ImageId", title="AMIs (owned)", arn=("ec2", "image"), aliases=("ami", "amis", "image"),
+        columns=(("AMI ID", "ImageId"), ("Name", "Name"), ("State", "State"), ("Created", "CreationDate")),
+        default=False,
+        max_rows=5,
+    ),
+    Collector(
+        kind="load_balancers", service="elbv2", operation="describe_load_balancers", items="LoadBalancers",
+        project=load_balancer, id_field="LoadBalancerName", title="Load Balancers",
+        arn=("elasticloadbalancing", "loadbalancer"), aliases=("lb", "lbs", "elb", "alb", "nlb"),
+        columns=(("Name", "LoadBalancerName"), ("Type", "Type"), ("Scheme", "Scheme"), ("State", "State"),
+                 ("VPC", "VpcId"), ("Created", "CreateTime")),
+        default=False,
+    ),
+    Collector(
+        kind="sagemaker_endpoints", service="sagemaker", operation="list_endpoints", items="Endpoints",
+        project=lambda e, region, account: SageMakerEndpoint(
+            EndpointName=e.get('EndpointName'), EndpointArn=e.get('EndpointArn'), State=e.get('EndpointStatus'),
+            CreateTime=e.get('CreationTime'), Region=region, Account=account,
+        ),
+        id_field="EndpointName", title="SageMaker Endpoints", arn=("sagemaker", "endpoint"),
+        aliases=("endpoint", "endpoints", "sagemaker"),
+        columns=(("Endpoint", "EndpointName"), ("State", "State"), ("Created", "CreateTime")),
+        default=False,
+    ),
+    Collector(
+        kind="eks_clusters", service="eks", operation="list_clusters", items="clusters",
+        detail=lambda client, name: client.describe_cluster(name=name)['cluster'],
+        project=eks_cluster, id_field="Name", title="EKS Clusters", arn=("eks", "cluster"),
+        aliases=("eks", "cluster", "clusters"),
+        columns=(("Cluster", "Name"), ("State", "State"), ("Version", "Version"), ("Created", "CreateTime")),
+        default=False,
+    ),
+]
+
+COLLECTORS = {c.kind: c for c in REGISTRY}
+DEFAULT_KINDS = tuple(c.kind for c in REGISTRY if c.default)
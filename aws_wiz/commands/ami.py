@@ -1,93 +1,65 @@
-import boto3
 import click
-from rich.console import Console
-from rich.table import Table
-from rich import box
-from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
 
-def get_latest_images(region, search_pattern):
-    ec2 = boto3.client('ec2', region_name=region)
-    filters = [
-        {'Name': 'name', 'Values': [search_pattern]},
-        {'Name': 'state', 'Values': ['available']},
-        {'Name': 'owner-alias', 'Values': ['amazon']},
-        {'Name': 'architecture', 'Values': ['x86_64']}
-    ]
-    try:
-        response = ec2.describe_images(Filters=filters)
-        images = response.get('Images', [])
-        images.sort(key=lambda x: x['CreationDate'], reverse=True)
-        return images[:3]
-    except Exception:
-        return []
+from aws_wiz import scheduler
+from aws_wiz.amis import AMI_PATTERNS, get_latest_images, check_ami_subscription
+from aws_wiz.complete import complete_regions
+from aws_wiz.utils import get_regions
 
-def check_ami_subscription(region, ami_id):
-    """
-    Checks if the account is subscribed to the AMI by attempting a DryRun launch.
-    Returns: (is_subscribed, message/link)
-    """
-    ec2 = boto3.client('ec2', region_name=region)
-    try:
-        ec2.run_instances(
-            ImageId=ami_id,
-            InstanceType='t3.nano',
-            MaxCount=1,
-            MinCount=1,
-            DryRun=True
-        )
-        return True, "Subscription Active"
-    except ClientError as e:
-        code = e.response['Error']['Code']
-        msg = e.response['Error']['Message']
 
-        if code == 'DryRunOperation':
-            return True, "Subscription Active"
-        elif code == 'OptInRequired':
-            return False, "Opt-In Required"
-        else:
-            return False, f"Error: {code}"
+def resolve_region(region, framework, refresh, executor):
+    images = get_latest_images(region, framework, refresh)
+    statuses = executor.map(lambda img: check_ami_subscription(region, img['ImageId']), images)
+    return [(region, img, status) for img, status in zip(images, statuses)]
 
 @click.command()
-@click.option('--region', '-r', default='us-east-1', help='AWS Region')
+@click.option('--region', '-r', multiple=True, shell_complete=complete_regions, help='AWS Region (repeatable, or "all"; default: us-east-1)')
 @click.option('--framework', '-f', default='pytorch', type=click.Choice(['pytorch', 'tensorflow', 'base']), help='DL Framework')
-def ami(region, framework):
+@click.option('--refresh', is_flag=True, help='Ignore cached AMI lookups')
+def ami(region, framework, refresh):
     """Find and validate AWS Deep Learning AMIs."""
+    from rich.console import Console
+    from rich.table import Table
+    from rich import box
     console = Console()
 
-    if framework == 'pytorch':
-        pattern = "Deep Learning OSS Nvidia Driver AMI GPU PyTorch 2.* (Ubuntu 22.04)*"
-    elif framework == 'tensorflow':
-        pattern = "Deep Learning OSS Nvidia Driver AMI GPU TensorFlow 2.* (Ubuntu 22.04)*"
-    else:
-        pattern = "Deep Learning Base OSS Nvidia Driver AMI (Ubuntu 22.04)*"
+    regions = list(region) or ['us-east-1']
+    if 'all' in regions:
+        regions = get_regions()
+    pattern = AMI_PATTERNS[framework]
 
-    console.print(f"[bold cyan]Searching for {framework} AMIs in {region}...[/bold cyan]")
-    images = get_latest_images(region, pattern)
+    label = regions[0] if len(regions) == 1 else f"{len(regions)} regions"
+    with console.status(f"[bold cyan]Searching for {framework} AMIs in {label}...[/bold cyan]"):
+        # Separate pool: region jobs block on the subscription checks
+        with ThreadPoolExecutor(max_workers=20) as check_pool:
+            results = scheduler.sweep(resolve_region, [(r, framework, refresh, check_pool) for r in regions], 'ec2', name='ami')
+            rows = [row for region_rows in results for row in region_rows]
 
-    if not images:
+    if not rows:
         console.print(f"[yellow]No AMIs found matching pattern: {pattern}[/yellow]")
         return
 
     table = Table(box=box.ROUNDED, show_header=True, header_style="bold white")
+    if len(regions) > 1:
+        table.add_column("Region", style="yellow")
     table.add_column("AMI ID", style="green")
     table.add_column("Name", style="cyan")
     table.add_column("Date", style="dim")
     table.add_column("Status", style="bold")
 
-    for img in images:
-        is_sub, status = check_ami_subscription(region, img['ImageId'])
-
+    for reg, img, (is_sub, status) in rows:
         status_style = "green" if is_sub else "red"
-        table.add_row(
+        row = [
             img['ImageId'],
             img['Name'],
             img['CreationDate'].split('T')[0],
             f"[{status_style}]{status}[/{status_style}]"
-        )
+        ]
+        table.add_row(*([reg] if len(regions) > 1 else []), *row)
 
     console.print(table)
 
     # If any need opt-in, provide general advice
-    if any(not check_ami_subscription(region, i['ImageId'])[0] for i in images):
+    if any(not is_sub for _, _, (is_sub, _) in rows):
         console.print("\n[bold red]Action Required:[/bold red] Some AMIs require manual Opt-In.")
         console.print("Please visit the [link=https://aws.amazon.com/marketplace]AWS Marketplace[/link] and search for 'Deep Learning AMI' to subscribe.")
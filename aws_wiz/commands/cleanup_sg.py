@@ -1,14 +1,16 @@
-import boto3
 import click
-from rich.console import Console
-from rich.table import Table
-from rich import box
+
+from aws_wiz.complete import complete_regions
 
 @click.command()
-@click.option('--region', '-r', default='us-east-1', help='AWS Region')
+@click.option('--region', '-r', default='us-east-1', shell_complete=complete_regions, help='AWS Region')
 @click.option('--force', '-f', is_flag=True, help='Skip confirmation')
 def cleanup_sg(region, force):
     """Find and delete unused Security Groups."""
+    import boto3
+    from rich.console import Console
+    from rich.table import Table
+    from rich import box
     console = Console()
     ec2 = boto3.client('ec2', region_name=region)
 
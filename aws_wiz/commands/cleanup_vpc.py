@@ -1,9 +1,9 @@
-import boto3
 import click
-from rich.console import Console
-from rich.panel import Panel
+
+from aws_wiz.complete import complete_regions
 
 def delete_vpc_dependencies(ec2, vpc_id):
+    from rich.console import Console
     console = Console()
 
     # 1. Delete Subnets
@@ -48,11 +48,14 @@ def delete_vpc_dependencies(ec2, vpc_id):
             console.print(f"  [red]- Error SG {sg['GroupId']}: {e}[/red]")
 
 @click.command()
-@click.option('--region', '-r', default='us-east-1', help='AWS Region')
+@click.option('--region', '-r', default='us-east-1', shell_complete=complete_regions, help='AWS Region')
 @click.option('--all', 'all_custom', is_flag=True, help='Delete ALL non-default VPCs')
 @click.option('--vpc-id', help='Specific VPC ID to delete')
 def cleanup_vpc(region, all_custom, vpc_id):
     """Deep cleanup of non-default VPCs and their dependencies."""
+    import boto3
+    from rich.console import Console
+    from rich.panel import Panel
     console = Console()
     ec2 = boto3.client('ec2', region_name=region)
 
@@ -1,7 +1,36 @@
 import os
-import subprocess
 
 import click
+from click.shell_completion import get_completion_class
+
+from aws_wiz import __version__
+from aws_wiz.state import STATE_DIR
+
+COMPLETION_DIR = STATE_DIR / "completion"
+
+
+def completion_source(shell):
+    """Completion script for `shell`, generated in-process and cached per version."""
+    cache_file = COMPLETION_DIR / f"awiz-{__version__}.{shell}"
+    try:
+        return cache_file.read_text()
+    except OSError:
+        pass
+
+    from aws_wiz.cli import cli
+
+    comp_cls = get_completion_class(shell)
+    output = comp_cls(cli, {}, "awiz", "_AWIZ_COMPLETE").source()
+    # macOS ships bash 3.2 which doesn't support the -o nosort flag
+    if shell == "bash":
+        output = output.replace("-o nosort", "")
+
+    try:
+        COMPLETION_DIR.mkdir(parents=True, exist_ok=True)
+        cache_file.write_text(output)
+    except OSError:
+        pass
+    return output
 
 
 @click.command()
@@ -22,18 +51,7 @@ def completion(shell):
                 "Could not detect shell. Pass --shell bash|zsh|fish explicitly."
             )
 
-    env_val = f"{shell}_source"
-    result = subprocess.run(
-        ["awiz"],
-        env={**os.environ, "_AWIZ_COMPLETE": env_val},
-        capture_output=True,
-        text=True,
-    )
-    output = result.stdout
-    # macOS ships bash 3.2 which doesn't support the -o nosort flag
-    if shell == "bash":
-        output = output.replace("-o nosort", "")
-    click.echo(output)
+    click.echo(completion_source(shell))
 
     # Print setup hint to stderr so it doesn't pollute piped output
     hints = {
@@ -1,19 +1,20 @@
-import boto3
 import click
 import json
 import time
 import base64
 import os
-from rich.console import Console
-from rich.table import Table
-from rich.progress import Progress, SpinnerColumn, TextColumn
 
+from aws_wiz.complete import complete_instance_types, complete_regions
 from aws_wiz.state import KEYS_DIR, ensure_state_dirs
+from aws_wiz.utils import get_console
+
+WORKER_COUNT = 3
+PLACEMENT_STRATEGIES = ('cluster', 'spread', 'partition')
 
-console = Console()
 
 def create_vpc_and_subnet(ec2, region):
     """Create VPC and subnet for the cluster"""
+    console = get_console()
     console.print("[cyan]Creating VPC...[/cyan]")
 
     vpc_response = ec2.create_vpc(CidrBlock='10.0.0.0/16')
@@ -49,8 +50,9 @@ def create_vpc_and_subnet(ec2, region):
 
     return vpc_id, subnet_id, igw_id
 
-def create_security_groups(ec2, vpc_id):
+def create_security_groups(ec2, vpc_id, efa=False):
     """Create security groups for bastion and private instances"""
+    console = get_console()
     console.print("[cyan]Creating security groups...[/cyan]")
 
     bastion_sg_response = ec2.create_security_group(
@@ -94,10 +96,63 @@ def create_security_groups(ec2, vpc_id):
         ]
     )
 
+    if efa:
+        # EFA's OS-bypass traffic only passes rules that reference the group itself, both ways
+        self_rule = [{'IpProtocol': '-1', 'UserIdGroupPairs': [{'GroupId': private_sg_id}]}]
+        ec2.authorize_security_group_ingress(GroupId=private_sg_id, IpPermissions=self_rule)
+        ec2.authorize_security_group_egress(GroupId=private_sg_id, IpPermissions=self_rule)
+
     return bastion_sg_id, private_sg_id
 
+def efa_network_cards(ec2, instance_type):
+    """Network cards of instance_type per the region's instance-type catalog; 0 if it lacks EFA"""
+    try:
+        types = ec2.describe_instance_types(InstanceTypes=[instance_type])['InstanceTypes']
+    except Exception:
+        return 0
+    network = types[0].get('NetworkInfo', {}) if types else {}
+    if not network.get('EfaSupported', False):
+        return 0
+    return network.get('MaximumNetworkCards', 1)
+
+def get_worker_interfaces(subnet_id, sg_id, efa_cards=0):
+    """Worker network interfaces: plain ENI, or one EFA interface per network card"""
+    if not efa_cards:
+        return [{
+            'DeviceIndex': 0,
+            'SubnetId': subnet_id,
+            'Groups': [sg_id],
+            'AssociatePublicIpAddress': False
+        }]
+    # Full EFA bandwidth needs an EFA on every card; only card 0 has the primary (device 0)
+    return [{
+        'NetworkCardIndex': card,
+        'DeviceIndex': 0 if card == 0 else 1,
+        'SubnetId': subnet_id,
+        'Groups': [sg_id],
+        'InterfaceType': 'efa'
+    } for card in range(efa_cards)]
+
+def create_placement_group(ec2, vpc_id, strategy, partitions=None):
+    """Create a placement group for the workers, named after the cluster VPC"""
+    console = get_console()
+    group_name = f"cluster-{vpc_id}"
+    console.print(f"[cyan]Creating {strategy} placement group: {group_name}[/cyan]")
+    options = {'PartitionCount': partitions} if strategy == 'partition' else {}
+    ec2.create_placement_group(
+        GroupName=group_name,
+        Strategy=strategy,
+        TagSpecifications=[{
+            'ResourceType': 'placement-group',
+            'Tags': [{'Key': 'Name', 'Value': 'cluster-placement'}]
+        }],
+        **options
+    )
+    return group_name
+
 def get_or_create_key_pair(ec2, region):
     """Get existing or create new key pair"""
+    console = get_console()
     key_name = f"cluster-key-{region}"
 
     try:
@@ -173,14 +228,32 @@ systemctl enable fix-routing.service
     return base64.b64encode(worker_script.encode()).decode()
 
 @click.command()
-@click.option('--instance-type', default='t3.large', help='Instance type for all instances')
-@click.option('--region', default='us-east-1', help='AWS region')
+@click.option('--instance-type', default='t3.large', shell_complete=complete_instance_types, help='Instance type for all instances')
+@click.option('--region', default='us-east-1', shell_complete=complete_regions, help='AWS region')
 @click.option('--ami-id', help='AMI ID (will auto-detect PyTorch AMI if not provided)')
-def create_cluster(instance_type, region, ami_id):
+@click.option('--placement', type=click.Choice(PLACEMENT_STRATEGIES), help='Launch the workers into a new placement group with this strategy')
+@click.option('--partitions', type=click.IntRange(1, 7), help=f'Partitions of a --placement partition group (default: {WORKER_COUNT}, one per worker)')
+@click.option('--efa', is_flag=True, help='Give the workers Elastic Fabric Adapter interfaces, one per network card (instance type must support EFA)')
+def create_cluster(instance_type, region, ami_id, placement, partitions, efa):
     """Create a 4-machine cluster with custom NAT"""
+    import boto3
+    from rich.table import Table
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    console = get_console()
+
+    if partitions and placement != 'partition':
+        raise click.UsageError("--partitions only applies with --placement partition.")
 
     ec2 = boto3.client('ec2', region_name=region)
 
+    # Checked before anything is created, so a bad type leaves nothing behind
+    efa_cards = 0
+    if efa:
+        efa_cards = efa_network_cards(ec2, instance_type)
+        if not efa_cards:
+            console.print(f"[red]{instance_type} does not support EFA in {region}.[/red] Find one with: awiz list-instances --filter p5 --region {region}")
+            return
+
     if not ami_id:
         console.print("[cyan]Using latest PyTorch Deep Learning AMI...[/cyan]")
         ami_id = 'ami-019bc5029386e3730'
@@ -195,7 +268,12 @@ def create_cluster(instance_type, region, ami_id):
         vpc_id, subnet_id, igw_id = create_vpc_and_subnet(ec2, region)
 
         progress.update(task, description="Creating security groups...")
-        bastion_sg_id, private_sg_id = create_security_groups(ec2, vpc_id)
+        bastion_sg_id, private_sg_id = create_security_groups(ec2, vpc_id, efa)
+
+        placement_group = None
+        if placement:
+            progress.update(task, description="Creating placement group...")
+            placement_group = create_placement_group(ec2, vpc_id, placement, partitions or WORKER_COUNT)
 
         progress.update(task, description="Setting up key pair...")
         key_name = get_or_create_key_pair(ec2, region)
@@ -252,30 +330,22 @@ def create_cluster(instance_type, region, ami_id):
 
         progress.update(task, description="Launching private instances...")
 
-        private_instances = []
-        for i in range(3):
-            private_ip = f'10.0.1.{11 + i}'
+        placement_options = {'Placement': {'GroupName': placement_group}} if placement_group else {}
 
+        # All workers in one all-or-nothing request, so a cluster placement
+        # group gets them in one go instead of failing on the last node
+        try:
             response = ec2.run_instances(
                 ImageId=ami_id,
                 InstanceType=instance_type,
                 KeyName=key_name,
-                MaxCount=1,
-                MinCount=1,
-                NetworkInterfaces=[{
-                    'DeviceIndex': 0,
-                    'SubnetId': subnet_id,
-                    'Groups': [private_sg_id],
-                    'AssociatePublicIpAddress': False,
-                    'PrivateIpAddress': private_ip
-                }],
+                MaxCount=WORKER_COUNT,
+                MinCount=WORKER_COUNT,
+                NetworkInterfaces=get_worker_interfaces(subnet_id, private_sg_id, efa_cards),
                 UserData=get_worker_user_data(bastion_private_ip),
                 TagSpecifications=[{
                     'ResourceType': 'instance',
-                    'Tags': [
-                        {'Key': 'Name', 'Value': f'cluster-worker-{i+1}'},
-                        {'Key': 'Role', 'Value': 'worker'}
-                    ]
+                    'Tags': [{'Key': 'Role', 'Value': 'worker'}]
                 }],
                 InstanceMarketOptions={
                     'MarketType': 'spot',
@@ -283,13 +353,27 @@ def create_cluster(instance_type, region, ami_id):
                         'SpotInstanceType': 'one-time',
                         'InstanceInterruptionBehavior': 'terminate'
                     }
-                }
+                },
+                **placement_options
             )
+        except Exception:
+            # Nothing launched into the group we just made; do not leave it behind
+            if placement_group:
+                try:
+                    ec2.delete_placement_group(GroupName=placement_group)
+                except Exception:
+                    pass
+            raise
 
+        private_instances = []
+        workers = sorted(response['Instances'], key=lambda inst: inst.get('AmiLaunchIndex', 0))
+        for i, inst in enumerate(workers):
+            name = f'cluster-worker-{i+1}'
+            ec2.create_tags(Resources=[inst['InstanceId']], Tags=[{'Key': 'Name', 'Value': name}])
             private_instances.append({
-                'id': response['Instances'][0]['InstanceId'],
-                'private_ip': private_ip,
-                'name': f'cluster-worker-{i+1}'
+                'id': inst['InstanceId'],
+                'private_ip': inst.get('PrivateIpAddress', '-'),
+                'name': name
             })
 
         progress.update(task, description="Waiting for all instances to be running...")
@@ -313,7 +397,11 @@ def create_cluster(instance_type, region, ami_id):
     console.print(table)
     console.print(f"\n[green]SSH Access:[/green]")
     console.print(f"  Bastion: ssh -i {key_path} ubuntu@{bastion_public_ip}")
-    console.print(f"  Workers: SSH through bastion using private IPs (10.0.1.11-13)")
+    console.print(f"  Workers: SSH through bastion using private IPs ({', '.join(inst['private_ip'] for inst in private_instances)})")
     console.print(f"\n[yellow]Note: NAT is configured on the bastion instance.[/yellow]")
     console.print(f"[yellow]Workers automatically route internet traffic through bastion at 10.0.1.10[/yellow]")
     console.print(f"[green]Routing is persistent across reboots via systemd service.[/green]")
+    if placement_group:
+        console.print(f"[green]Workers share the {placement} placement group {placement_group}.[/green]")
+    if efa:
+        console.print("[green]Workers have EFA interfaces; their security group allows all traffic within itself.[/green]")
@@ -0,0 +1,74 @@
+import subprocess
+import sys
+import time
+
+import click
+
+from aws_wiz import daemon as awiz_daemon
+from aws_wiz.cache import identity_key
+from aws_wiz.state import STATE_DIR
+from aws_wiz.utils import get_console
+
+
+
+@click.group()
+def daemon():
+    """Background daemon that keeps scan/quota data warm for other commands."""
+
+
+@daemon.command()
+@click.option('--interval', default=300, type=int, help='Refresh interval in seconds')
+@click.option('--foreground', is_flag=True, help='Run in the foreground instead of detaching')
+def start(interval, foreground):
+    """Start the daemon."""
+    console = get_console()
+    if awiz_daemon.is_running():
+        console.print(f"[yellow]Daemon already running on {awiz_daemon.SOCKET_PATH}.[/yellow]")
+        return
+
+    if foreground:
+        awiz_daemon.serve(interval)
+        return
+
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    with open(awiz_daemon.LOG_PATH, "a") as log:
+        subprocess.Popen(
+            [sys.executable, "-m", "aws_wiz.daemon", "--interval", str(interval)],
+            stdin=subprocess.DEVNULL, stdout=log, stderr=log,
+            start_new_session=True,
+        )
+
+    # Wait for the socket to come up
+    for _ in range(50):
+        if awiz_daemon.is_running():
+            console.print(f"[green]Daemon started on {awiz_daemon.SOCKET_PATH}[/green] [dim](log: {awiz_daemon.LOG_PATH})[/dim]")
+            return
+        time.sleep(0.1)
+    console.print(f"[red]Daemon did not start; see {awiz_daemon.LOG_PATH}[/red]")
+
+
+@daemon.command()
+def stop():
+    """Stop the daemon."""
+    console = get_console()
+    if awiz_daemon.query("shutdown") is None:
+        console.print("[yellow]Daemon is not running.[/yellow]")
+        return
+    console.print("[green]Daemon stopped.[/green]")
+
+
+@daemon.command()
+def status():
+    """Show daemon status."""
+    console = get_console()
+    info = awiz_daemon.query("ping")
+    if info is None:
+        console.print("[yellow]Daemon is not running.[/yellow]")
+        return
+    console.print(
+        f"[green]Running[/green] (pid {info['pid']}) on {awiz_daemon.SOCKET_PATH}\n"
+        f"Started: {info['started']}\n"
+        f"Last refresh: {info['refreshed'] or '[yellow]in progress[/yellow]'} (every {info['interval']}s)"
+    )
+    if info.get('identity') != identity_key():
+        console.print("[yellow]The daemon serves a different AWS profile/credentials/endpoint; commands in this shell query AWS directly.[/yellow]")
@@ -1,14 +1,13 @@
 import boto3
 import click
-import asyncio
 import os
 import tomllib
 from datetime import datetime, timedelta
-from concurrent.futures import ThreadPoolExecutor
 from rich.console import Console
 from rich.table import Table
 from rich import box
 
+from aws_wiz import aio, scheduler
 from aws_wiz.state import FELLOWS_FILE
 
 
@@ -89,14 +88,7 @@ def get_detailed_fellow_statement(name, creds):
         }
 
 async def scan_all_fellows(fellows_dict):
-    executor = ThreadPoolExecutor(max_workers=5)
-    loop = asyncio.get_running_loop()
-
-    tasks = [
-        loop.run_in_executor(executor, get_detailed_fellow_statement, name, creds)
-        for name, creds in fellows_dict.items()
-    ]
-    return await asyncio.gather(*tasks)
+    return await scheduler.fan_out(get_detailed_fellow_statement, list(fellows_dict.items()), 'ce', name='fellow-costs')
 
 def print_statement_table(console, title, months, statement_data, usage_services, credit_types, style="cyan"):
     """Generic function to print a cost statement table."""
@@ -187,7 +179,7 @@ def fellow_costs():
     if not fellows: return
 
     with console.status(f"[bold green]Auditing {len(fellows)} fellows..."):
-        results = asyncio.run(scan_all_fellows(fellows))
+        results = aio.run(scan_all_fellows(fellows))
 
     cohort_months = []
     cohort_statement = {}
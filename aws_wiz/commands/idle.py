@@ -0,0 +1,193 @@
+import click
+import json
+from datetime import datetime, timedelta, timezone
+
+from aws_wiz import scheduler
+from aws_wiz.cache import json_default
+from aws_wiz.commands.stop import stop
+from aws_wiz.complete import complete_regions
+from aws_wiz.utils import get_client, get_regions
+
+# Published by the CloudWatch agent's nvidia_gpu plugin, one series per GPU
+GPU_NAMESPACE = 'CWAgent'
+GPU_METRIC = 'nvidia_smi_utilization_gpu'
+MAX_QUERIES = 500
+
+
+def running_instances(region, pattern=None):
+    ec2 = get_client('ec2', region)
+    instances = []
+    try:
+        paginator = ec2.get_paginator('describe_instances')
+        for page in paginator.paginate(Filters=[{'Name': 'instance-state-name', 'Values': ['running']}]):
+            for res in page['Reservations']:
+                for i in res['Instances']:
+                    if pattern and pattern.lower() not in i['InstanceType'].lower():
+                        continue
+                    instances.append({
+                        'InstanceId': i['InstanceId'],
+                        'InstanceType': i['InstanceType'],
+                        'Name': next((t['Value'] for t in i.get('Tags', []) if t['Key'] == 'Name'), "-"),
+                        'LaunchTime': i['LaunchTime'],
+                        'Region': region
+                    })
+    except Exception:
+        # Region might be disabled or unreachable
+        pass
+    return instances
+
+def gpu_series(cw, instance_ids):
+    """CWAgent GPU utilisation series (one per GPU) for the given instances."""
+    series = []
+    try:
+        paginator = cw.get_paginator('list_metrics')
+        for page in paginator.paginate(Namespace=GPU_NAMESPACE, MetricName=GPU_METRIC):
+            for m in page.get('Metrics', []):
+                dims = {d['Name']: d['Value'] for d in m['Dimensions']}
+                if dims.get('InstanceId') in instance_ids:
+                    series.append(m['Dimensions'])
+    except Exception:
+        pass
+    return series
+
+def fetch_region_utilisation(region, window_hours, pattern=None):
+    """Peak hourly CPU %, network KB/s and GPU % over the window for every running instance.
+
+    Every metric of the region goes through batched get_metric_data calls
+    (up to MAX_QUERIES series each); nothing is fetched per instance.
+    """
+    instances = running_instances(region, pattern)
+    if not instances:
+        return []
+    by_id = {i['InstanceId']: i for i in instances}
+    for i in instances:
+        i.update({'CpuPeak': None, 'NetworkPeakKBps': None, 'GpuPeak': None})
+
+    cw = get_client('cloudwatch', region)
+    # (instance id, metric name, metric, stat) per query, in query order
+    queries = []
+    for iid in by_id:
+        for metric in ('CPUUtilization', 'NetworkIn', 'NetworkOut'):
+            stat = 'Average' if metric == 'CPUUtilization' else 'Sum'
+            queries.append((iid, metric, {
+                'Namespace': 'AWS/EC2', 'MetricName': metric,
+                'Dimensions': [{'Name': 'InstanceId', 'Value': iid}]
+            }, stat))
+    for dims in gpu_series(cw, set(by_id)):
+        iid = next(d['Value'] for d in dims if d['Name'] == 'InstanceId')
+        queries.append((iid, GPU_METRIC, {'Namespace': GPU_NAMESPACE, 'MetricName': GPU_METRIC, 'Dimensions': dims}, 'Average'))
+
+    end = datetime.now(timezone.utc)
+    start = end - timedelta(hours=window_hours)
+    network = {}  # iid -> {hour: bytes}
+
+    for offset in range(0, len(queries), MAX_QUERIES):
+        chunk = queries[offset:offset + MAX_QUERIES]
+        request = [{
+            'Id': f"m{idx}",
+            'MetricStat': {'Metric': metric, 'Period': 3600, 'Stat': stat}
+        } for idx, (_iid, _name, metric, stat) in enumerate(chunk)]
+        try:
+            paginator = cw.get_paginator('get_metric_data')
+            for page in paginator.paginate(MetricDataQueries=request, StartTime=start, EndTime=end):
+                for r in page.get('MetricDataResults', []):
+                    if not r.get('Values'):
+                        continue
+                    iid, name, _metric, _stat = chunk[int(r['Id'][1:])]
+                    entry = by_id[iid]
+                    if name == 'CPUUtilization':
+                        entry['CpuPeak'] = max([entry['CpuPeak'] or 0, *r['Values']])
+                    elif name == GPU_METRIC:
+                        # Busiest GPU of the instance
+                        entry['GpuPeak'] = max([entry['GpuPeak'] or 0, *r['Values']])
+                    else:
+                        hours = network.setdefault(iid, {})
+                        for ts, value in zip(r['Timestamps'], r['Values']):
+                            hours[ts] = hours.get(ts, 0) + value
+        except Exception:
+            pass
+
+    for iid, hours in network.items():
+        by_id[iid]['NetworkPeakKBps'] = max(hours.values()) / 3600 / 1024
+
+    return instances
+
+def classify(instance, window_hours, cpu, net_kbps, gpu, now):
+    """'idle', 'active', 'no data' or 'too new' for one instance."""
+    if now - instance['LaunchTime'] < timedelta(hours=window_hours):
+        return 'too new'
+    if instance['CpuPeak'] is None:
+        return 'no data'
+    if instance['CpuPeak'] >= cpu:
+        return 'active'
+    # A failed or empty network query must not read as zero traffic
+    if instance['NetworkPeakKBps'] is None:
+        return 'no data'
+    if instance['NetworkPeakKBps'] >= net_kbps:
+        return 'active'
+    if instance['GpuPeak'] is not None and instance['GpuPeak'] >= gpu:
+        return 'active'
+    return 'idle'
+
+def fmt(value, digits=1):
+    return f"{value:.{digits}f}" if value is not None else "-"
+
+@click.command()
+@click.option('--region', '-r', multiple=True, shell_complete=complete_regions, help='AWS Region (repeatable; default: all)')
+@click.option('--filter', '-f', 'pattern', help='Only instance types containing this substring (e.g. "g5")')
+@click.option('--window', '-w', default=6, type=int, show_default=True, help='Look-back window in hours')
+@click.option('--cpu', default=5.0, show_default=True, help='Idle if peak hourly CPU % stays below this')
+@click.option('--net-kbps', default=50.0, show_default=True, help='Idle if peak hourly network (in+out) KB/s stays below this')
+@click.option('--gpu', default=5.0, show_default=True, help='Idle if peak hourly GPU % stays below this (CloudWatch agent data only)')
+@click.option('--all', 'show_all', is_flag=True, help='Show every running instance, not only idle ones')
+@click.option('--stop', 'stop_idle', is_flag=True, help='Offer to stop each idle instance (same confirmation as `awiz stop`; implies --pretty)')
+@click.option('--pretty', '-p', is_flag=True, help='Pretty print table')
+@click.pass_context
+def idle(ctx, region, pattern, window, cpu, net_kbps, gpu, show_all, stop_idle, pretty):
+    """Find running instances that have been idle (CPU/network/GPU) over a window."""
+    from rich.console import Console
+    from rich.table import Table
+    from rich import box
+    from aws_wiz.commands.scan import calculate_uptime
+    console = Console()
+    regions = [r for r in region if r != 'all'] or get_regions()
+
+    with console.status(f"[bold green]Fetching {window}h of metrics in {len(regions)} regions..."):
+        results = scheduler.sweep(fetch_region_utilisation, [(r, window, pattern) for r in regions], 'cloudwatch', name='idle')
+        instances = [i for res in results for i in res]
+
+    now = datetime.now(timezone.utc)
+    for i in instances:
+        i['Status'] = classify(i, window, cpu, net_kbps, gpu, now)
+    idle_instances = [i for i in instances if i['Status'] == 'idle']
+    shown = instances if show_all else idle_instances
+
+    # --stop prompts on stdout, so it always shows the table rather than JSON
+    if not pretty and not stop_idle:
+        print(json.dumps(shown, indent=2, default=json_default))
+    else:
+        table = Table(box=box.ROUNDED, show_header=True, header_style="bold white",
+                      title=f"Peak hourly utilisation over the last {window}h")
+        table.add_column("Instance ID", style="cyan")
+        table.add_column("Name", style="yellow")
+        table.add_column("Type")
+        table.add_column("Uptime", justify="right")
+        table.add_column("CPU %", justify="right")
+        table.add_column("Net KB/s", justify="right")
+        table.add_column("GPU %", justify="right")
+        table.add_column("Status")
+        table.add_column("Region", style="dim")
+        for i in shown:
+            style = {"idle": "bold red", "active": "green"}.get(i['Status'], "dim")
+            table.add_row(
+                i['InstanceId'], i['Name'], i['InstanceType'], calculate_uptime(i['LaunchTime']),
+                fmt(i['CpuPeak']), fmt(i['NetworkPeakKBps']), fmt(i['GpuPeak']),
+                f"[{style}]{i['Status']}[/{style}]", i['Region']
+            )
+        console.print(table)
+        console.print(f"[dim]{len(idle_instances)} idle of {len(instances)} running instances "
+                      f"(thresholds: CPU {cpu}%, network {net_kbps} KB/s, GPU {gpu}%).[/dim]")
+
+    if stop_idle:
+        for i in idle_instances:
+            ctx.invoke(stop, id=i['InstanceId'], region=i['Region'])
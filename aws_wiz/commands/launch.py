@@ -1,36 +1,20 @@
-import boto3
 import click
 import os
 import stat
 from datetime import datetime
-from rich.console import Console
-from rich.panel import Panel
 
+from aws_wiz.amis import resolve_latest_ami
+from aws_wiz.complete import complete_instance_types, complete_regions
+from aws_wiz.iam import PROFILE_NAME, provision_instance_profile, wait_for_profile
 from aws_wiz.state import KEYS_DIR, ensure_state_dirs
-
-console = Console()
+from aws_wiz.utils import get_console
 
 
 def get_latest_ami(ec2, framework):
-    if framework == 'pytorch':
-        pattern = "Deep Learning OSS Nvidia Driver AMI GPU PyTorch 2.* (Ubuntu 22.04)*"
-    elif framework == 'tensorflow':
-        pattern = "Deep Learning OSS Nvidia Driver AMI GPU TensorFlow 2.* (Ubuntu 22.04)*"
-    else:
-        pattern = "Deep Learning Base OSS Nvidia Driver AMI (Ubuntu 22.04)*"
-
-    filters = [
-        {'Name': 'name', 'Values': [pattern]},
-        {'Name': 'state', 'Values': ['available']},
-        {'Name': 'owner-alias', 'Values': ['amazon']},
-        {'Name': 'architecture', 'Values': ['x86_64']}
-    ]
-    resp = ec2.describe_images(Filters=filters)
-    images = resp.get('Images', [])
-    images.sort(key=lambda x: x['CreationDate'], reverse=True)
-    return images[0]['ImageId'] if images else None
+    return resolve_latest_ami(ec2.meta.region_name, framework)
 
 def get_or_create_key(ec2, region):
+    console = get_console()
     ensure_state_dirs()
 
     # 1. Check if any local key in keys dir exists in AWS
@@ -62,6 +46,7 @@ def get_or_create_key(ec2, region):
     return key_name, key_file
 
 def get_or_create_sg(ec2, vpc_id=None):
+    console = get_console()
     sg_name = "aws-wiz-ssh"
 
     if not vpc_id:
@@ -95,22 +80,36 @@ def get_or_create_sg(ec2, vpc_id=None):
         return None
 
 @click.command()
-@click.option('--type', '-t', required=True, help='Instance Type')
-@click.option('--region', '-r', default='us-east-1', help='AWS Region')
+@click.option('--type', '-t', required=True, shell_complete=complete_instance_types, help='Instance Type')
+@click.option('--region', '-r', default='us-east-1', shell_complete=complete_regions, help='AWS Region')
 @click.option('--name', '-n', default='training-rig', help='Instance Name')
 @click.option('--spot', '-s', is_flag=True, help='Use Spot')
 @click.option('--framework', '-f', default='pytorch', type=click.Choice(['pytorch', 'tensorflow', 'base']), help='DL Framework')
 @click.option('--iam-profile', help='IAM Instance Profile Name')
-def launch(type, region, name, spot, framework, iam_profile):
+@click.option('--provision-iam', is_flag=True, help=f'Create the S3 role and instance profile first (as `awiz setup-iam`; profile defaults to {PROFILE_NAME})')
+def launch(type, region, name, spot, framework, iam_profile, provision_iam):
     """Launch a GPU instance and manage SSH keys automatically."""
+    import boto3
+    from rich.panel import Panel
+    console = get_console()
     ec2 = boto3.client('ec2', region_name=region)
 
+    if provision_iam:
+        iam_profile = iam_profile or PROFILE_NAME
+        try:
+            provision_instance_profile(profile_name=iam_profile, log=console.print)
+        except Exception as e:
+            console.print(f"[red]IAM setup failed: {e}[/red]")
+            return
+
     console.print(Panel(f"Launching [bold cyan]{type}[/bold cyan] in [yellow]{region}[/yellow]", title="AwsWiz Launch"))
 
     # 1. AMI
     with console.status("Finding AMI..."):
         ami_id = get_latest_ami(ec2, framework)
-        if not ami_id: return
+    if not ami_id:
+        console.print(f"[red]No {framework} AMI found in {region}.[/red]")
+        return
 
     # 2. Key Pair (Auto-Managed)
     key_name, key_path = get_or_create_key(ec2, region)
@@ -142,6 +141,11 @@ def launch(type, region, name, spot, framework, iam_profile):
         launch_args['IamInstanceProfile'] = {'Name': iam_profile}
 
     try:
+        if iam_profile:
+            # A new profile can take a few seconds to reach EC2; probe instead of sleeping
+            with console.status(f"Waiting for EC2 to accept instance profile {iam_profile}..."):
+                wait_for_profile(ec2, launch_args)
+
         with console.status("Launching..."):
             resp = ec2.run_instances(**launch_args)
             instance_id = resp['Instances'][0]['InstanceId']
@@ -1,61 +1,57 @@
-import boto3
 import click
 import sys
-import asyncio
-from concurrent.futures import ThreadPoolExecutor
-from rich.console import Console
-from rich.table import Table
-from rich import box
 
-from aws_wiz.utils import get_regions
+from aws_wiz import aio, daemon, scheduler
+from aws_wiz.cache import read_cache, write_cache
+from aws_wiz.complete import complete_regions
+from aws_wiz.utils import get_client, get_regions
 
+# Every instance type name seen during a search, for shell completion
+seen_types = set()
 
-def check_region_for_types(region, pattern):
-    ec2 = boto3.client('ec2', region_name=region)
-    found_types = {}
+
+def fetch_region_types(region):
+    """Specs of every instance type offered in a region."""
+    ec2 = get_client('ec2', region)
+    types = {}
 
     paginator = ec2.get_paginator('describe_instance_types')
     try:
-        # We assume if the pattern is in the name, we want it.
-        # We'll use a client-side filter for simplicity and flexibility with wildcards
         for page in paginator.paginate():
             for it in page['InstanceTypes']:
                 name = it['InstanceType']
-                if pattern.lower() in name.lower():
-                    # Extract GPU info
-                    gpus = it.get('GpuInfo', {}).get('Gpus', [])
-                    gpu_count = sum(g['Count'] for g in gpus)
-                    gpu_name = gpus[0]['Name'] if gpus else "N/A"
-                    gpu_mem = sum(g['MemoryInfo']['SizeInMiB'] for g in gpus) / 1024 if gpus else 0
-
-                    found_types[name] = {
-                        "Name": name,
-                        "vCPUs": it['VCpuInfo']['DefaultVCpus'],
-                        "Memory (GiB)": it['MemoryInfo']['SizeInMiB'] / 1024,
-                        "GPUs": gpu_count,
-                        "GPU Name": gpu_name,
-                        "GPU Mem (GiB)": gpu_mem,
-                        "Region": region
-                    }
+                seen_types.add(name)
+
+                # Extract GPU info
+                gpus = it.get('GpuInfo', {}).get('Gpus', [])
+                gpu_count = sum(g['Count'] for g in gpus)
+                gpu_name = gpus[0]['Name'] if gpus else "N/A"
+                gpu_mem = sum(g['MemoryInfo']['SizeInMiB'] for g in gpus) / 1024 if gpus else 0
+
+                types[name] = {
+                    "Name": name,
+                    "vCPUs": it['VCpuInfo']['DefaultVCpus'],
+                    "Memory (GiB)": it['MemoryInfo']['SizeInMiB'] / 1024,
+                    "GPUs": gpu_count,
+                    "GPU Name": gpu_name,
+                    "GPU Mem (GiB)": gpu_mem,
+                    "EFA": it.get('NetworkInfo', {}).get('EfaSupported', False),
+                    "Region": region
+                }
     except Exception:
         # Region might be disabled or unreachable
         pass
 
-    return found_types
+    return types
 
-async def scan_all_regions(pattern, specific_region=None):
-    if specific_region and specific_region != 'all':
-        regions = [specific_region]
-    else:
-        regions = get_regions()
-        print(f"Scanning {len(regions)} regions for '{pattern}'...", file=sys.stderr)
+def filter_types(types, pattern):
+    # We'll use a client-side filter for simplicity and flexibility with wildcards
+    return {name: data for name, data in types.items() if pattern.lower() in name.lower()}
 
-    loop = asyncio.get_running_loop()
-    with ThreadPoolExecutor(max_workers=20) as executor:
-        tasks = [loop.run_in_executor(executor, check_region_for_types, r, pattern) for r in regions]
-        results = await asyncio.gather(*tasks)
+def check_region_for_types(region, pattern):
+    return filter_types(fetch_region_types(region), pattern)
 
-    # Aggregate results
+def aggregate_types(results):
     # Map: InstanceType -> {Specs, Regions: set()}
     aggregated = {}
 
@@ -83,18 +79,36 @@ async def scan_all_regions(pattern, specific_region=None):
 
     return sorted(final_list, key=lambda x: x['Name'])
 
+async def scan_all_regions(pattern, specific_region=None):
+    if specific_region and specific_region != 'all':
+        regions = [specific_region]
+    else:
+        regions = get_regions()
+        print(f"Scanning {len(regions)} regions for '{pattern}'...", file=sys.stderr)
+
+    results = await scheduler.fan_out(check_region_for_types, [(r, pattern) for r in regions], 'ec2', name='list-instances')
+
+    write_cache("instance-types", sorted(seen_types | set(read_cache("instance-types") or [])))
+
+    return aggregate_types(results)
+
 @click.command()
-@click.option('--region', '-r', default='us-east-1', help='AWS Region (use "all" for global search)')
+@click.option('--region', '-r', default='us-east-1', shell_complete=complete_regions, help='AWS Region (use "all" for global search)')
 @click.option('--filter', '-f', required=True, help='Substring to filter instance types (e.g. "g5")')
 def list_instances(region, filter):
     """List EC2 instance types matching a substring."""
+    from rich.console import Console
+    from rich.table import Table
+    from rich import box
     console = Console()
 
     # Handle "all" explicitly or pass through
     target_region = 'all' if region == 'all' or region == '*' else region
 
-    with console.status(f"[bold green]Searching for '{filter}'..."):
-        results = asyncio.run(scan_all_regions(filter, target_region))
+    results = daemon.query("list-instances", pattern=filter, region=target_region)
+    if results is None:
+        with console.status(f"[bold green]Searching for '{filter}'..."):
+            results = aio.run(scan_all_regions(filter, target_region))
 
     if not results:
         console.print(f"[yellow]No instance types found matching '{filter}'.[/yellow]")
@@ -107,6 +121,7 @@ def list_instances(region, filter):
     table.add_column("GPUs", justify="right", style="green")
     table.add_column("GPU Name", style="magenta")
     table.add_column("GPU Mem", justify="right", style="magenta")
+    table.add_column("EFA", justify="center", style="green")
     table.add_column("Available Regions", style="yellow", max_width=60) # Wrap long lists
 
     for r in results:
@@ -127,6 +142,7 @@ def list_instances(region, filter):
             gpu_str,
             gpu_name,
             gpu_mem_str,
+            "yes" if r.get('EFA') else "-",
             regions_str
         )
 
@@ -1,18 +1,19 @@
-import boto3
 import click
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from rich.console import Console
-from rich.table import Table
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich.panel import Panel
 
-from aws_wiz.utils import get_regions
+from aws_wiz import scheduler
+from aws_wiz.complete import complete_regions
+from aws_wiz.utils import get_console, get_regions
 
-console = Console()
+
+def sweep_regions(phase, regions):
+    """Run one per-region phase in every region; the results, flattened."""
+    return [item for batch in scheduler.sweep(phase, [(r,) for r in regions], 'ec2', name='nuke') for item in batch]
 
 def terminate_instances(region):
     """Terminate all EC2 instances in a region"""
+    import boto3
+    console = get_console()
     terminated = []
     try:
         ec2 = boto3.client('ec2', region_name=region)
@@ -41,6 +42,8 @@ def terminate_instances(region):
 
 def delete_vpcs(region):
     """Delete all non-default VPCs and their dependencies"""
+    import boto3
+    console = get_console()
     deleted_vpcs = []
     try:
         ec2 = boto3.client('ec2', region_name=region)
@@ -116,6 +119,8 @@ def delete_vpcs(region):
 
 def release_elastic_ips(region):
     """Release all Elastic IPs"""
+    import boto3
+    console = get_console()
     released = []
     try:
         ec2 = boto3.client('ec2', region_name=region)
@@ -137,6 +142,8 @@ def release_elastic_ips(region):
 
 def delete_key_pairs(region):
     """Delete all key pairs"""
+    import boto3
+    console = get_console()
     deleted = []
     try:
         ec2 = boto3.client('ec2', region_name=region)
@@ -156,6 +163,8 @@ def delete_key_pairs(region):
 
 def delete_volumes(region):
     """Delete all available EBS volumes"""
+    import boto3
+    console = get_console()
     deleted = []
     try:
         ec2 = boto3.client('ec2', region_name=region)
@@ -175,9 +184,12 @@ def delete_volumes(region):
 
 @click.command()
 @click.option('--force', is_flag=True, help='Skip confirmation prompt')
-@click.option('--region', help='Specific region to nuke (default: all regions)')
+@click.option('--region', shell_complete=complete_regions, help='Specific region to nuke (default: all regions)')
 def nuke(force, region):
     """Nuclear option: Delete ALL AWS resources (except S3 buckets)"""
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    from rich.panel import Panel
+    console = get_console()
 
     # Warning panel
     console.print(Panel.fit(
@@ -210,11 +222,7 @@ def nuke(force, region):
         # Phase 1: Terminate instances
         task = progress.add_task(f"[red]Terminating EC2 instances across {len(regions)} regions...[/red]", total=None)
 
-        all_terminated = []
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            futures = [executor.submit(terminate_instances, r) for r in regions]
-            for future in as_completed(futures):
-                all_terminated.extend(future.result())
+        all_terminated = sweep_regions(terminate_instances, regions)
 
         if all_terminated:
             console.print(f"\n[red]Terminated {len(all_terminated)} instances[/red]")
@@ -231,11 +239,7 @@ def nuke(force, region):
         # Phase 2: Delete VPCs
         progress.update(task, description="[red]Deleting VPCs and networking...[/red]")
 
-        all_vpcs = []
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            futures = [executor.submit(delete_vpcs, r) for r in regions]
-            for future in as_completed(futures):
-                all_vpcs.extend(future.result())
+        all_vpcs = sweep_regions(delete_vpcs, regions)
 
         if all_vpcs:
             console.print(f"\n[red]Deleted {len(all_vpcs)} VPCs[/red]")
@@ -245,11 +249,7 @@ def nuke(force, region):
         # Phase 3: Release Elastic IPs
         progress.update(task, description="[red]Releasing Elastic IPs...[/red]")
 
-        all_eips = []
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            futures = [executor.submit(release_elastic_ips, r) for r in regions]
-            for future in as_completed(futures):
-                all_eips.extend(future.result())
+        all_eips = sweep_regions(release_elastic_ips, regions)
 
         if all_eips:
             console.print(f"\n[red]Released {len(all_eips)} Elastic IPs[/red]")
@@ -257,11 +257,7 @@ def nuke(force, region):
         # Phase 4: Delete Key Pairs
         progress.update(task, description="[red]Deleting key pairs...[/red]")
 
-        all_keys = []
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            futures = [executor.submit(delete_key_pairs, r) for r in regions]
-            for future in as_completed(futures):
-                all_keys.extend(future.result())
+        all_keys = sweep_regions(delete_key_pairs, regions)
 
         if all_keys:
             console.print(f"\n[red]Deleted {len(all_keys)} key pairs[/red]")
@@ -271,11 +267,7 @@ def nuke(force, region):
         # Phase 5: Delete available volumes
         progress.update(task, description="[red]Deleting available EBS volumes...[/red]")
 
-        all_volumes = []
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            futures = [executor.submit(delete_volumes, r) for r in regions]
-            for future in as_completed(futures):
-                all_volumes.extend(future.result())
+        all_volumes = sweep_regions(delete_volumes, regions)
 
         if all_volumes:
             total_gb = sum(size for _, size, _ in all_volumes)
@@ -0,0 +1,76 @@
+import json
+import sys
+import click
+
+from aws_wiz import aio, daemon
+from aws_wiz.cache import account_cache, json_default, read_cache, write_cache
+from aws_wiz.index import KIND_ID_FIELDS, QuerySyntaxError, ResourceStore, parse_query
+
+
+def load_snapshot(refresh=False):
+    """Latest scan snapshot: cached copy unless `refresh`, otherwise a fresh scan."""
+    data = None if refresh else read_cache(account_cache("scan"))
+    if data is None:
+        from aws_wiz.commands.scan import scan_all_async
+        data = aio.run(scan_all_async())
+        write_cache(account_cache("scan"), data)
+    return data
+
+def run_query(expr, refresh=False):
+    """Returns (snapshot timestamp, matching records tagged with their Kind)."""
+    if not refresh:
+        served = daemon.query("query", expr=expr)
+        if served is not None:
+            return served["timestamp"], served["matches"]
+
+    data = load_snapshot(refresh)
+    matches = ResourceStore(data).query(expr)
+    return data.get("timestamp"), [{"Kind": kind, **record} for kind, record in matches]
+
+@click.command()
+@click.argument('expr')
+@click.option('--pretty', '-p', is_flag=True, help='Pretty print table')
+@click.option('--count', is_flag=True, help='Print only the number of matches')
+@click.option('--refresh', is_flag=True, help='Run a fresh scan instead of using the daemon or cached snapshot')
+def query(expr, pretty, count, refresh):
+    """Query the latest scan with an indexed filter expression.
+
+    Example: awiz query 'ec2 vpc=vpc-0abc tag:team=ml age>2d state=running'
+    """
+    from rich.console import Console
+    from rich.table import Table
+    from rich import box
+    try:
+        # Validate before touching AWS or the daemon
+        parse_query(expr)
+        timestamp, matches = run_query(expr, refresh)
+    except QuerySyntaxError as e:
+        raise click.UsageError(str(e))
+
+    if count:
+        print(len(matches))
+        return
+
+    if not pretty:
+        print(json.dumps(matches, indent=2, default=json_default))
+        return
+
+    console = Console()
+    if not matches:
+        console.print("[dim]No matching resources.[/dim]")
+    else:
+        table = Table(box=box.ROUNDED, show_header=True, header_style="bold white")
+        table.add_column("Kind", style="dim")
+        table.add_column("ID", style="cyan")
+        table.add_column("Name", style="yellow")
+        table.add_column("State")
+        table.add_column("VPC", style="blue")
+        table.add_column("Region", style="dim")
+        for r in matches:
+            name = r.get('Name') or (r.get('Tags') or {}).get('Name') or "-"
+            table.add_row(
+                r['Kind'], r.get(KIND_ID_FIELDS[r['Kind']]) or "-", name,
+                r.get('State') or "-", r.get('VpcId') or "-", r.get('Region') or "-"
+            )
+        console.print(table)
+    print(f"{len(matches)} match(es) in snapshot from {timestamp}", file=sys.stderr)
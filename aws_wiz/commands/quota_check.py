@@ -1,13 +1,12 @@
-import boto3
 import json
-import asyncio
+import re
 import click
-from concurrent.futures import ThreadPoolExecutor
-from rich.console import Console
-from rich.table import Table
-from rich import box
+from functools import lru_cache
 
-from aws_wiz.utils import get_regions
+from aws_wiz import aio, daemon, scheduler
+from aws_wiz.cache import account_cache, read_cache, write_cache
+from aws_wiz.complete import complete_regions
+from aws_wiz.utils import get_client, get_regions
 
 
 QUOTA_BUCKETS = [
@@ -48,52 +47,152 @@ QUOTA_BUCKETS = [
     },
 ]
 
-def scan_region_buckets(region):
-    sq_client = boto3.client('service-quotas', region_name=region)
-    results = {}
+# Instance family prefix -> quota code, precomputed from the QUOTA_BUCKETS coverage
+_STANDARD_FAMILIES = ("a", "c", "d", "h", "i", "im", "is", "m", "r", "t", "z")
+_G_FAMILIES = ("g", "gr", "vt")
+
+ON_DEMAND_FAMILY_INDEX = {
+    **{f: "L-1216C47A" for f in _STANDARD_FAMILIES},
+    **{f: "L-DB2E81BA" for f in _G_FAMILIES},
+    "p": "L-417A185B",
+}
+SPOT_FAMILY_INDEX = {
+    **{f: "L-34B43A08" for f in _STANDARD_FAMILIES},
+    **{f: "L-3819A6DF" for f in _G_FAMILIES},
+    "p2": "L-7212CCBC", "p3": "L-7212CCBC", "p4": "L-7212CCBC",
+    "p5": "L-C4BD4855",
+}
+
+QUOTA_CACHE_TTL = 3600
+
+@lru_cache(maxsize=None)
+def bucket_for_instance_type(instance_type, spot=False):
+    """Map an instance type (e.g. g5.12xlarge) to its QUOTA_BUCKETS code, or None."""
+    m = re.match(r"([a-z]+)(\d?)", instance_type.split(".")[0])
+    if not m:
+        return None
+    letters, generation = m.groups()
+    if spot:
+        return SPOT_FAMILY_INDEX.get(letters + generation) or SPOT_FAMILY_INDEX.get(letters)
+    return ON_DEMAND_FAMILY_INDEX.get(letters)
+
+def scan_region_usage(region):
+    """vCPUs currently pending/running in each quota bucket, or None if they can't be counted.
+
+    A failed or partial listing returns None rather than an undercount, so
+    headroom is never overstated.
+    """
+    ec2 = get_client('ec2', region)
+    usage = {item["code"]: 0 for item in QUOTA_BUCKETS}
+    unsized = {}
+    try:
+        paginator = ec2.get_paginator('describe_instances')
+        for page in paginator.paginate(
+            Filters=[{'Name': 'instance-state-name', 'Values': ['pending', 'running']}]
+        ):
+            for res in page.get('Reservations', []):
+                for i in res.get('Instances', []):
+                    code = bucket_for_instance_type(i['InstanceType'], i.get('InstanceLifecycle') == 'spot')
+                    if not code:
+                        continue
+                    cpu = i.get('CpuOptions')
+                    if cpu:
+                        usage[code] += cpu.get('CoreCount', 0) * cpu.get('ThreadsPerCore', 1)
+                    else:
+                        unsized.setdefault(i['InstanceType'], []).append(code)
+
+        # Fall back to the default vCPU count for instances without CpuOptions
+        types = list(unsized)
+        for offset in range(0, len(types), 100):
+            resp = ec2.describe_instance_types(InstanceTypes=types[offset:offset + 100])
+            for it in resp.get('InstanceTypes', []):
+                for code in unsized[it['InstanceType']]:
+                    usage[code] += it['VCpuInfo']['DefaultVCpus']
+    except Exception:
+        return None
+    return usage
+
+def fetch_region_quotas(sq_client):
+    """Single paginated pass over all EC2 quotas, indexed by quota code."""
+    index = {}
+    paginator = sq_client.get_paginator("list_service_quotas")
+    for page in paginator.paginate(ServiceCode="ec2"):
+        for q in page.get("Quotas", []):
+            index[q.get("QuotaCode")] = {
+                "name": q.get("QuotaName", ""),
+                "value": q.get("Value", 0.0)
+            }
+    return index
+
+def scan_region_buckets(region, refresh=False):
+    # Limits differ per account, so the key includes the AWS identity
+    cache_key = account_cache(f"quotas-{region}")
+    if not refresh:
+        cached = read_cache(cache_key, QUOTA_CACHE_TTL)
+        if cached is not None:
+            return cached
+
+    sq_client = get_client('service-quotas', region)
+
+    try:
+        index = fetch_region_quotas(sq_client)
+        complete = True
+    except Exception:
+        index = {}
+        complete = False
 
+    results = {}
     for item in QUOTA_BUCKETS:
+        if item["code"] in index:
+            results[item["code"]] = index[item["code"]]["value"]
+            continue
+        # Not every quota is guaranteed to be in the applied list; ask for it directly
         try:
             resp = sq_client.get_service_quota(ServiceCode="ec2", QuotaCode=item["code"])
             results[item["code"]] = resp["Quota"].get("Value", 0.0)
         except Exception:
-            results[item["code"]] = 0.0
+            # Unknown, not zero: shown as "?" rather than as a real limit
+            results[item["code"]] = None
 
-    # Also search for Capacity Blocks
-    capacity_matches = []
-    try:
-        paginator = sq_client.get_paginator("list_service_quotas")
-        for page in paginator.paginate(ServiceCode="ec2"):
-            for q in page.get("Quotas", []):
-                name = q.get("QuotaName", "")
-                if "Capacity Block" in name:
-                    capacity_matches.append({
-                        "name": name,
-                        "code": q.get("QuotaCode"),
-                        "value": q.get("Value")
-                    })
-    except Exception:
-        pass
+    # Capacity Blocks come from the same index
+    capacity_matches = [
+        {"name": q["name"], "code": code, "value": q["value"]}
+        for code, q in index.items()
+        if "Capacity Block" in q["name"]
+    ]
 
-    return {
+    result = {
         "region": region,
         "buckets": results,
         "capacity": capacity_matches
     }
+    # Don't pin a failed lookup in the cache for the whole TTL
+    if complete:
+        write_cache(cache_key, result)
+    return result
 
-async def run_scan(target_region=None):
+async def run_scan(target_region=None, refresh=False, usage=False):
     if target_region and target_region != 'all':
         regions = [target_region]
     else:
         regions = get_regions()
 
-    executor = ThreadPoolExecutor(max_workers=20)
-    loop = asyncio.get_running_loop()
+    results = await scheduler.fan_out(scan_region_buckets, [(r, refresh) for r in regions], 'service-quotas', name='quota-check')
+    if not usage:
+        return results
+
+    usages = await scheduler.fan_out(scan_region_usage, [(r,) for r in regions], 'ec2', name='quota-usage')
+    return [{**res, "usage": used} for res, used in zip(results, usages)]
 
-    tasks = [loop.run_in_executor(executor, scan_region_buckets, r) for r in regions]
-    return await asyncio.gather(*tasks)
+def region_sort_key(r):
+    if r.startswith('us-'): return (0, r)
+    if r.startswith('eu-'): return (1, r)
+    return (2, r)
 
 def print_pretty_table(results):
+    from rich.console import Console
+    from rich.table import Table
+    from rich import box
     console = Console()
 
     # We want one row per Bucket, showing aggregate info
@@ -111,18 +210,13 @@ def print_pretty_table(results):
         max_val = 0.0
         active_regions = []
         for res in results:
-            val = res["buckets"].get(code, 0.0)
-            if val > 0:
+            val = res["buckets"].get(code)
+            if val and val > 0:
                 active_regions.append(res["region"])
                 max_val = max(max_val, val)
 
         # Format regions: show first 4 then ... (+N)
-        def sort_key(r):
-            if r.startswith('us-'): return (0, r)
-            if r.startswith('eu-'): return (1, r)
-            return (2, r)
-
-        sorted_regions = sorted(active_regions, key=sort_key)
+        sorted_regions = sorted(active_regions, key=region_sort_key)
         if len(sorted_regions) > 2:
             reg_str = f"{', '.join(sorted_regions[:2])}  +{len(sorted_regions)-2}"
         else:
@@ -170,13 +264,64 @@ def print_pretty_table(results):
     else:
         console.print("[dim]No active Capacity Block quotas found in scanned regions.[/dim]")
 
+def print_headroom_table(results):
+    from rich.console import Console
+    from rich.table import Table
+    from rich import box
+    console = Console()
+    console.print("\n[bold cyan]Live Headroom (vCPUs)[/bold cyan]")
+
+    table = Table(box=box.ROUNDED, show_header=True, header_style="bold white")
+    table.add_column("Region", style="yellow")
+    table.add_column("QuotaCode", style="dim")
+    table.add_column("Description", style="italic")
+    table.add_column("Used", justify="right")
+    table.add_column("Limit", justify="right")
+    table.add_column("Headroom", justify="right")
+
+    found_any = unknown = False
+    for res in sorted(results, key=lambda r: region_sort_key(r["region"])):
+        for bucket in QUOTA_BUCKETS:
+            code = bucket["code"]
+            limit = res["buckets"].get(code)
+            used = res["usage"].get(code) if res["usage"] is not None else None
+            if limit == 0 and used == 0:
+                continue
+            if limit is None or used is None:
+                # A failed lookup must not look like headroom
+                headroom = "[yellow]?[/yellow]"
+                unknown = True
+            else:
+                style = "bold green" if limit - used > 0 else "bold red"
+                headroom = f"[{style}]{limit - used}[/{style}]"
+            table.add_row(
+                res["region"], code, bucket["includes"],
+                "?" if used is None else str(used), "?" if limit is None else str(limit), headroom
+            )
+            found_any = True
+
+    if found_any:
+        console.print(table)
+    else:
+        console.print("[dim]No quota or running usage found in scanned regions.[/dim]")
+        return
+    if unknown:
+        console.print("[dim]? = quota or instance lookup failed in that region; headroom unknown.[/dim]")
+
 @click.command()
-@click.option('--region', '-r', default='all', help='AWS Region or "all"')
+@click.option('--region', '-r', default='all', shell_complete=complete_regions, help='AWS Region or "all"')
 @click.option('--pretty', '-p', is_flag=True, help='Pretty print table')
-def quota_check(region, pretty):
-    results = asyncio.run(run_scan(region))
+@click.option('--refresh', is_flag=True, help=f'Ignore quota values cached in the last {QUOTA_CACHE_TTL // 60} minutes')
+@click.option('--usage', '-u', is_flag=True, help='Include running vCPUs and headroom per quota bucket')
+def quota_check(region, pretty, refresh, usage):
+    """Check GPU/Standard vCPU quota limits across regions."""
+    results = None if refresh else daemon.query("quota-check", region=region, usage=usage)
+    if results is None:
+        results = aio.run(run_scan(region, refresh, usage))
 
     if pretty:
         print_pretty_table(results)
+        if usage:
+            print_headroom_table(results)
     else:
         print(json.dumps(results, indent=2))
@@ -1,59 +1,183 @@
-import boto3
 import click
-from rich.console import Console
-from rich.panel import Panel
+import time
+import tomllib
 
-@click.command()
-@click.option('--code', '-c', required=True, help='The Quota Code (e.g. L-DB2E81BA)')
-@click.option('--value', '-v', required=True, type=float, help='The new desired vCPU value')
-@click.option('--region', '-r', default='us-east-1', help='AWS Region')
-@click.option('--service', '-s', default='ec2', help='Service code (default: ec2)')
-def quota_request(code, value, region, service):
-    """Request a service quota increase."""
-    console = Console()
+from aws_wiz import scheduler
+from aws_wiz.commands.quota_status import OPEN_STATUSES
+from aws_wiz.complete import complete_regions
+from aws_wiz.utils import get_regions
+
+# Minimum spacing between two submissions in the same region
+SUBMIT_INTERVAL = 1.0
+
+
+def load_spec(path, default_service):
+    """Read a TOML spec into (service, code, region, value) tuples.
+
+    [[request]]
+    code = "L-DB2E81BA"
+    value = 48
+    regions = ["us-east-1", "us-west-2"]
+    """
+    with open(path, "rb") as f:
+        spec = tomllib.load(f)
+
+    pairs = []
+    service = spec.get('service', default_service)
+    for req in spec.get('request', []):
+        regions = req.get('regions') or [req.get('region', 'us-east-1')]
+        if regions == ['all']:
+            regions = get_regions()
+        for region in regions:
+            pairs.append((req.get('service', service), req['code'], region, float(req['value'])))
+    return pairs
+
+def plan_pair(service, code, region, value):
+    """Fetch the current value and any open request for one (code, region) pair."""
+    import boto3
+    plan = {
+        'service': service, 'code': code, 'region': region, 'value': value,
+        'name': code, 'current': None, 'action': 'submit', 'reason': ''
+    }
     sq = boto3.client('service-quotas', region_name=region)
 
-    # 1. Fetch current info for confirmation
     try:
-        resp = sq.get_service_quota(ServiceCode=service, QuotaCode=code)
-        quota = resp['Quota']
-        name = quota['QuotaName']
-        current_val = quota['Value']
+        quota = sq.get_service_quota(ServiceCode=service, QuotaCode=code)['Quota']
+        plan['name'] = quota['QuotaName']
+        plan['current'] = quota['Value']
     except Exception as e:
-        console.print(f"[red]Error fetching quota info: {e}[/red]")
+        plan['action'] = 'error'
+        plan['reason'] = str(e)
+        return plan
+
+    if plan['current'] >= value:
+        plan['action'] = 'skip'
+        plan['reason'] = 'already satisfied'
+        return plan
+
+    try:
+        paginator = sq.get_paginator('list_requested_service_quota_change_history_by_quota')
+        for page in paginator.paginate(ServiceCode=service, QuotaCode=code):
+            for req in page.get('RequestedQuotas', []):
+                if req['Status'] in OPEN_STATUSES:
+                    plan['action'] = 'skip'
+                    plan['reason'] = f"pending request {req['Id']} ({req.get('DesiredValue')})"
+                    return plan
+    except Exception:
+        pass
+
+    return plan
+
+def submit_region(region, plans):
+    """Submit one region's requests sequentially, spaced by SUBMIT_INTERVAL."""
+    import boto3
+    sq = boto3.client('service-quotas', region_name=region)
+    for i, plan in enumerate(plans):
+        if i: time.sleep(SUBMIT_INTERVAL)
+        try:
+            response = sq.request_service_quota_increase(
+                ServiceCode=plan['service'],
+                QuotaCode=plan['code'],
+                DesiredValue=plan['value']
+            )
+            req = response['RequestedQuota']
+            plan['request_id'] = req['Id']
+            plan['status'] = req['Status']
+        except Exception as e:
+            plan['request_id'] = None
+            plan['status'] = f"Error: {e}"
+    return plans
+
+@click.command()
+@click.option('--code', '-c', multiple=True, help='The Quota Code (e.g. L-DB2E81BA); repeatable')
+@click.option('--value', '-v', type=float, help='The new desired vCPU value')
+@click.option('--region', '-r', multiple=True, shell_complete=complete_regions, help='AWS Region (repeatable, or "all"; default: us-east-1)')
+@click.option('--service', '-s', default='ec2', help='Service code (default: ec2)')
+@click.option('--spec', type=click.Path(exists=True, dir_okay=False), help='TOML file listing [[request]] code/value/regions')
+def quota_request(code, value, region, service, spec):
+    """Request service quota increases (one pair, a code x region matrix, or a spec file)."""
+    from rich.console import Console
+    from rich.table import Table
+    from rich import box
+    console = Console()
+
+    if spec:
+        try:
+            pairs = load_spec(spec, service)
+        except Exception as e:
+            console.print(f"[red]Error parsing {spec}: {e}[/red]")
+            return
+    else:
+        if not code or value is None:
+            raise click.UsageError("Pass --code and --value, or --spec FILE.")
+        regions = list(region) or ['us-east-1']
+        if 'all' in regions:
+            regions = get_regions()
+        pairs = [(service, c, r, value) for c in code for r in regions]
+
+    # Repeated codes/regions or overlapping spec entries would submit the
+    # same quota twice in one run: keep one pair each, at the highest value
+    wanted = {}
+    for svc, c, r, v in pairs:
+        key = (svc, c, r)
+        wanted[key] = max(v, wanted.get(key, v))
+    pairs = [(*key, v) for key, v in wanted.items()]
+
+    if not pairs:
+        console.print("[yellow]Nothing to request.[/yellow]")
+        return
+
+    # 1. Fetch current values and open requests for every pair concurrently
+    with console.status(f"[bold green]Checking {len(pairs)} quota/region pairs..."):
+        plans = scheduler.sweep(plan_pair, pairs, 'service-quotas')
+
+    # 2. One consolidated plan
+    table = Table(box=box.ROUNDED, show_header=True, header_style="bold white", title="Quota Increase Plan")
+    table.add_column("Region", style="yellow")
+    table.add_column("Quota Name", style="cyan")
+    table.add_column("Code", style="dim")
+    table.add_column("Current", justify="right")
+    table.add_column("Requested", justify="right", style="bold green")
+    table.add_column("Action")
+
+    for p in plans:
+        if p['action'] == 'submit':
+            action = "[bold green]submit[/bold green]"
+        elif p['action'] == 'skip':
+            action = f"[dim]skip: {p['reason']}[/dim]"
+        else:
+            action = f"[red]error: {p['reason']}[/red]"
+        current = str(p['current']) if p['current'] is not None else "-"
+        table.add_row(p['region'], p['name'], p['code'], current, str(p['value']), action)
+
+    console.print(table)
+
+    to_submit = [p for p in plans if p['action'] == 'submit']
+    if not to_submit:
+        console.print("[green]Nothing to submit: every pair is satisfied, pending or failed.[/green]")
         return
 
-    # 2. Display confirmation panel
-    console.print(Panel(
-        f"Requesting increase for: [bold cyan]{name}[/bold cyan]\n"
-        f"Quota Code: [dim]{code}[/dim]\n"
-        f"Region: [yellow]{region}[/yellow]\n\n"
-        f"Current Value: [bold]{current_val}[/bold]\n"
-        f"Requested Value: [bold green]{value}[/bold green]",
-        title="Quota Increase Request",
-        border_style="cyan"
-    ))
-
-    if value <= current_val:
-        console.print(f"[yellow]Warning: Requested value ({value}) is not greater than current value ({current_val}).[/yellow]")
-
-    if not click.confirm("Do you want to submit this request to AWS?"):
+    if not click.confirm(f"Do you want to submit {len(to_submit)} request(s) to AWS?"):
         console.print("[yellow]Request cancelled.[/yellow]")
         return
 
-    # 3. Submit
-    try:
-        response = sq.request_service_quota_increase(
-            ServiceCode=service,
-            QuotaCode=code,
-            DesiredValue=value
-        )
-        req = response['RequestedQuota']
-
-        console.print(f"\n[bold green]Success! Request submitted.[/bold green]")
-        console.print(f"Request ID: [bold]{req['Id']}[/bold]")
-        console.print(f"Status: [yellow]{req['Status']}[/yellow]")
-        console.print("\n[dim]Note: Quota increases are reviewed by AWS and can take minutes to hours.[/dim]")
+    # 3. Submit regions in parallel, rate-limited within each region
+    by_region = {}
+    for p in to_submit:
+        by_region.setdefault(p['region'], []).append(p)
 
-    except Exception as e:
-        console.print(f"[bold red]Error submitting request:[/bold red] {e}")
+    with console.status("[bold green]Submitting requests..."):
+        scheduler.sweep(submit_region, list(by_region.items()), 'service-quotas')
+
+    result_table = Table(box=box.ROUNDED, show_header=True, header_style="bold white", title="Submitted Requests")
+    result_table.add_column("Region", style="yellow")
+    result_table.add_column("Code", style="dim")
+    result_table.add_column("Request ID", style="bold")
+    result_table.add_column("Status")
+
+    for p in to_submit:
+        status_style = "yellow" if p['request_id'] else "red"
+        result_table.add_row(p['region'], p['code'], p['request_id'] or "-", f"[{status_style}]{p['status']}[/{status_style}]")
+
+    console.print(result_table)
+    console.print("\n[dim]Note: Quota increases are reviewed by AWS and can take minutes to hours.[/dim]")
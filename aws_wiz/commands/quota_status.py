@@ -1,23 +1,28 @@
-import boto3
 import click
-import asyncio
-from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor
-from rich.console import Console
-from rich.table import Table
-from rich import box
-
+import json
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from aws_wiz import aio, scheduler
+from aws_wiz.cache import account_cache, read_cache, write_cache
+from aws_wiz.complete import complete_regions
 from aws_wiz.utils import get_regions
 
+OPEN_STATUSES = ('PENDING', 'CASE_OPENED')
+STORE_NAME = "quota-requests"
+
 
 def get_quota_history(region):
+    import boto3
     sq = boto3.client('service-quotas', region_name=region)
     try:
-        # Fetching the last 10 requests for brevity
-        response = sq.list_requested_service_quota_change_history(
-            ServiceCode='ec2'
-        )
-        history = response.get('RequestedQuotas', [])
+        # Full history, all pages
+        history = []
+        paginator = sq.get_paginator('list_requested_service_quota_change_history')
+        for page in paginator.paginate(ServiceCode='ec2'):
+            history.extend(page.get('RequestedQuotas', []))
 
         # Add region info to each entry
         for h in history:
@@ -33,11 +38,7 @@ async def scan_all_history(target_region=None):
     else:
         regions = get_regions()
 
-    executor = ThreadPoolExecutor(max_workers=20)
-    loop = asyncio.get_running_loop()
-
-    tasks = [loop.run_in_executor(executor, get_quota_history, r) for r in regions]
-    results = await asyncio.gather(*tasks)
+    results = await scheduler.fan_out(get_quota_history, [(r,) for r in regions], 'service-quotas', name='quota-status')
 
     # Flatten results
     flat_history = [item for sublist in results for item in sublist]
@@ -45,16 +46,95 @@ async def scan_all_history(target_region=None):
     # Sort by creation date (newest first)
     return sorted(flat_history, key=lambda x: x.get('Created', datetime.min), reverse=True)
 
+def diff_history(store, history):
+    """Merge fresh history into the store and return the status transitions."""
+    events = []
+    now = datetime.now(timezone.utc).isoformat()
+    for h in history:
+        old = store.get(h['Id'])
+        old_status = old['Status'] if old else None
+        if old_status != h['Status'] and (old or h['Status'] in OPEN_STATUSES):
+            events.append({
+                "event": "status_changed" if old else "new",
+                "id": h['Id'],
+                "region": h['Region'],
+                "quota_code": h.get('QuotaCode'),
+                "quota_name": h.get('QuotaName'),
+                "desired_value": h.get('DesiredValue'),
+                "old_status": old_status,
+                "status": h['Status'],
+                "time": now
+            })
+        store[h['Id']] = {
+            key: h.get(key) for key in
+            ('Id', 'Region', 'QuotaCode', 'QuotaName', 'DesiredValue', 'Status', 'Created', 'LastUpdated')
+        }
+    return events
+
+def emit_event(event, hook):
+    line = json.dumps(event, default=str)
+    if hook:
+        # Hook receives one NDJSON event on stdin
+        subprocess.run(hook, shell=True, input=line + "\n", text=True)
+    else:
+        print(line, flush=True)
+
+def watch_history(regions, hook, interval, max_interval):
+    """Poll until no request is open, backing off while nothing changes."""
+    from rich.console import Console
+    console = Console(stderr=True)
+    store = read_cache(account_cache(STORE_NAME)) or {}
+    poll_regions = regions
+    delay = interval
+
+    while True:
+        console.print(f"[dim]Polling {len(poll_regions)} region(s)...[/dim]")
+        results = scheduler.sweep(get_quota_history, [(r,) for r in poll_regions], 'service-quotas', name='quota-status')
+        history = [item for sublist in results for item in sublist]
+
+        events = diff_history(store, history)
+        write_cache(account_cache(STORE_NAME), store)
+        for event in events:
+            emit_event(event, hook)
+
+        # Only regions with open requests need polling again
+        poll_regions = sorted({
+            r['Region'] for r in store.values()
+            if r['Status'] in OPEN_STATUSES and r['Region'] in regions
+        })
+        if not poll_regions:
+            console.print("[green]No open quota requests left.[/green]")
+            return
+
+        delay = interval if events else min(delay * 2, max_interval)
+        console.print(f"[dim]{len(poll_regions)} region(s) with open requests; next poll in {delay}s.[/dim]")
+        time.sleep(delay)
+
 @click.command()
-@click.option('--region', '-r', default='us-east-1', help='AWS Region or "all"')
+@click.option('--region', '-r', default='us-east-1', shell_complete=complete_regions, help='AWS Region or "all"')
 @click.option('--all', 'scan_all', is_flag=True, help='Scan all regions')
-def quota_status(region, scan_all):
+@click.option('--watch', '-w', is_flag=True, help='Poll open requests and emit status changes as NDJSON')
+@click.option('--hook', help='Shell command run per status change (event JSON on stdin)')
+@click.option('--interval', default=60, type=int, help='Initial poll interval in seconds (--watch)')
+@click.option('--max-interval', default=900, type=int, help='Maximum poll interval in seconds (--watch)')
+def quota_status(region, scan_all, watch, hook, interval, max_interval):
     """Check status of service quota increase requests."""
+    from rich.console import Console
+    from rich.table import Table
+    from rich import box
     console = Console()
     target = 'all' if scan_all else region
 
+    if watch:
+        regions = get_regions() if target == 'all' else [target]
+        try:
+            watch_history(regions, hook, interval, max_interval)
+        except KeyboardInterrupt:
+            print("Stopped watching.", file=sys.stderr)
+        return
+
     with console.status(f"[bold green]Fetching quota request history in {target}..."):
-        results = asyncio.run(scan_all_history(target))
+        results = aio.run(scan_all_history(target))
 
     if not results:
         console.print(f"[yellow]No quota request history found.[/yellow]")
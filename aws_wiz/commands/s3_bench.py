@@ -0,0 +1,236 @@
+import click
+import io
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from aws_wiz.iam import BUCKET_NAME
+from aws_wiz.complete import complete_regions
+
+WORKLOADS = ('put', 'get', 'multipart', 'ranged')
+_SIZE = re.compile(r"^(\d+(?:\.\d+)?)\s*([KMGT]?i?B?)$", re.IGNORECASE)
+_UNITS = {'': 1, 'B': 1, 'K': 1024, 'M': 1024**2, 'G': 1024**3, 'T': 1024**4}
+
+
+def parse_size(ctx, param, value):
+    """'8MB', '64KiB', '1G' or a plain byte count -> bytes (binary units), at least 1."""
+    if value is None or isinstance(value, int):
+        return value
+    m = _SIZE.match(value.strip())
+    if not m:
+        raise click.BadParameter(f"Invalid size '{value}' (e.g. 8MB, 64KiB, 1G)")
+    size = int(float(m.group(1)) * _UNITS[m.group(2)[:1].upper()])
+    # Zero would mean empty objects (meaningless MB/s) or a zero range step
+    if size < 1:
+        raise click.BadParameter(f"Size '{value}' must be at least 1 byte")
+    return size
+
+def format_size(num):
+    for unit in ('B', 'KiB', 'MiB', 'GiB'):
+        if num < 1024: return f"{num:g} {unit}"
+        num /= 1024
+    return f"{num:g} TiB"
+
+def percentile(values, pct):
+    if not values: return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def instance_type():
+    """EC2 instance type via IMDSv2, or None when not running on EC2."""
+    import urllib.request
+    try:
+        token_req = urllib.request.Request(
+            "http://169.254.169.254/latest/api/token", method="PUT",
+            headers={"X-aws-ec2-metadata-token-ttl-seconds": "60"}
+        )
+        token = urllib.request.urlopen(token_req, timeout=0.5).read().decode()
+        req = urllib.request.Request(
+            "http://169.254.169.254/latest/meta-data/instance-type",
+            headers={"X-aws-ec2-metadata-token": token}
+        )
+        return urllib.request.urlopen(req, timeout=0.5).read().decode()
+    except Exception:
+        return None
+
+def run_parallel(fn, jobs, concurrency):
+    """Run fn(job) -> bytes over all jobs; returns (wall seconds, bytes, latencies, errors)."""
+    def timed(job):
+        start = time.perf_counter()
+        try:
+            size = fn(job)
+            return time.perf_counter() - start, size, None
+        except Exception as e:
+            return time.perf_counter() - start, 0, str(e)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(timed, jobs))
+    wall = time.perf_counter() - start
+
+    latencies = [lat for lat, _, err in results if err is None]
+    errors = [err for _, _, err in results if err is not None]
+    return wall, sum(size for _, size, _ in results), latencies, errors
+
+def summarise(workload, wall, total_bytes, latencies, errors):
+    requests = len(latencies)
+    return {
+        'workload': workload,
+        'requests': requests,
+        'errors': len(errors),
+        'first_error': errors[0] if errors else None,
+        'bytes': total_bytes,
+        'seconds': round(wall, 4),
+        'mb_per_s': round(total_bytes / 1e6 / wall, 2) if wall else None,
+        'requests_per_s': round(requests / wall, 2) if wall else None,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2) if latencies else None,
+    }
+
+def run_workload(s3, workload, bucket, keys, payload, concurrency, transfer_config, range_size):
+    size = len(payload)
+
+    if workload == 'put':
+        def put(key):
+            s3.put_object(Bucket=bucket, Key=key, Body=payload)
+            return size
+        return run_parallel(put, keys, concurrency)
+
+    if workload == 'get':
+        def get(key):
+            return len(s3.get_object(Bucket=bucket, Key=key)['Body'].read())
+        return run_parallel(get, keys, concurrency)
+
+    if workload == 'multipart':
+        def upload(key):
+            s3.upload_fileobj(io.BytesIO(payload), bucket, key, Config=transfer_config)
+            return size
+        return run_parallel(upload, keys, concurrency)
+
+    # Ranged reads covering every object in range_size pieces
+    ranges = [(key, start, min(start + range_size, size) - 1) for key in keys for start in range(0, size, range_size)]
+    def ranged(job):
+        key, first, last = job
+        return len(s3.get_object(Bucket=bucket, Key=key, Range=f"bytes={first}-{last}")['Body'].read())
+    return run_parallel(ranged, ranges, concurrency)
+
+def cleanup(s3, bucket, keys):
+    for offset in range(0, len(keys), 1000):
+        chunk = keys[offset:offset + 1000]
+        try:
+            s3.delete_objects(Bucket=bucket, Delete={'Objects': [{'Key': k} for k in chunk], 'Quiet': True})
+        except Exception:
+            pass
+
+@click.command()
+@click.option('--bucket', '-b', default=BUCKET_NAME, show_default=True, help='Bucket to benchmark against')
+@click.option('--region', '-r', default='us-east-1', shell_complete=complete_regions, help='AWS Region')
+@click.option('--endpoint-url', help='S3-compatible endpoint (e.g. a local moto/MinIO server); AWS_ENDPOINT_URL also works')
+@click.option('--workload', '-w', 'workloads', multiple=True, type=click.Choice(WORKLOADS), help='Workload to run, repeatable (default: put, get, multipart, ranged)')
+@click.option('--size', '-s', default='8MiB', callback=parse_size, show_default=True, help='Object size')
+@click.option('--count', '-n', default=32, type=click.IntRange(1), show_default=True, help='Objects per workload')
+@click.option('--concurrency', '-c', default=16, type=click.IntRange(1), show_default=True, help='Parallel requests (or transfers)')
+@click.option('--multipart-threshold', default='8MiB', callback=parse_size, show_default=True, help='TransferConfig multipart_threshold')
+@click.option('--multipart-chunksize', default='8MiB', callback=parse_size, show_default=True, help='TransferConfig multipart_chunksize')
+@click.option('--max-concurrency', default=10, type=click.IntRange(1), show_default=True, help='TransferConfig max_concurrency (threads per multipart transfer)')
+@click.option('--range-size', default='1MiB', callback=parse_size, show_default=True, help='Bytes per ranged GET')
+@click.option('--create-bucket', is_flag=True, help='Create the bucket if it does not exist')
+@click.option('--keep', is_flag=True, help='Keep benchmark objects instead of deleting them')
+@click.option('--output', '-o', type=click.Path(dir_okay=False), help='Write results as JSON to this file')
+def s3_bench(bucket, region, endpoint_url, workloads, size, count, concurrency, multipart_threshold,
+             multipart_chunksize, max_concurrency, range_size, create_bucket, keep, output):
+    """Benchmark S3 throughput (parallel PUT/GET, multipart and ranged reads)."""
+    import boto3
+    from boto3.s3.transfer import TransferConfig
+    from botocore.config import Config
+    from rich.console import Console
+    from rich.table import Table
+    from rich import box
+    console = Console()
+    workloads = workloads or WORKLOADS
+
+    # Enough pooled connections for every request in flight
+    pool = max(10, concurrency * (max_concurrency if 'multipart' in workloads else 1))
+    s3 = boto3.client('s3', region_name=region, endpoint_url=endpoint_url, config=Config(max_pool_connections=pool))
+    transfer_config = TransferConfig(
+        multipart_threshold=multipart_threshold,
+        multipart_chunksize=multipart_chunksize,
+        max_concurrency=max_concurrency,
+    )
+
+    try:
+        s3.head_bucket(Bucket=bucket)
+    except Exception as e:
+        if not create_bucket:
+            console.print(f"[red]Bucket {bucket} is not accessible: {e}[/red]")
+            console.print("[dim]Pass --bucket, or --create-bucket to create it (see `awiz setup-iam` for instance access).[/dim]")
+            return
+        kwargs = {} if region == 'us-east-1' else {'CreateBucketConfiguration': {'LocationConstraint': region}}
+        s3.create_bucket(Bucket=bucket, **kwargs)
+        console.print(f"[green]Created bucket {bucket}[/green]")
+
+    prefix = f"awiz-bench/{datetime.now().strftime('%Y%m%dT%H%M%S')}-{os.getpid()}/"
+    payload = os.urandom(size)
+    data_keys = [f"{prefix}obj-{n:05d}" for n in range(count)]
+    written = []
+    results = []
+
+    for workload in workloads:
+        keys = data_keys
+        if workload == 'multipart':
+            keys = [f"{prefix}mpu-{n:05d}" for n in range(count)]
+        elif workload in ('get', 'ranged') and not set(data_keys) <= set(written):
+            # Reads need objects; write them first, untimed
+            with console.status("[dim]Writing objects for read workloads...[/dim]"):
+                run_workload(s3, 'put', bucket, data_keys, payload, concurrency, transfer_config, range_size)
+            written.extend(data_keys)
+
+        with console.status(f"[bold green]Running {workload} ({count} x {format_size(size)}, concurrency {concurrency})..."):
+            wall, total, latencies, errors = run_workload(s3, workload, bucket, keys, payload, concurrency, transfer_config, range_size)
+        if workload in ('put', 'multipart'):
+            written.extend(keys)
+        results.append(summarise(workload, wall, total, latencies, errors))
+
+    if not keep:
+        cleanup(s3, bucket, sorted(set(written)))
+
+    table = Table(box=box.ROUNDED, show_header=True, header_style="bold white",
+                  title=f"S3 throughput: {bucket} ({format_size(size)} objects)")
+    table.add_column("Workload", style="cyan")
+    table.add_column("Requests", justify="right")
+    table.add_column("MB/s", justify="right", style="bold green")
+    table.add_column("Req/s", justify="right")
+    table.add_column("p50 ms", justify="right")
+    table.add_column("p99 ms", justify="right")
+    table.add_column("Errors", justify="right")
+    for r in results:
+        err_style = "red" if r['errors'] else "dim"
+        table.add_row(
+            r['workload'], str(r['requests']), str(r['mb_per_s']), str(r['requests_per_s']),
+            str(r['p50_ms']), str(r['p99_ms']), f"[{err_style}]{r['errors']}[/{err_style}]"
+        )
+    console.print(table)
+    for r in results:
+        if r['first_error']:
+            console.print(f"[red]{r['workload']}: {r['first_error']}[/red]")
+
+    if output:
+        report = {
+            'timestamp': datetime.now().isoformat(),
+            'instance_type': instance_type(),
+            'bucket': bucket,
+            'region': region,
+            'endpoint_url': endpoint_url or os.environ.get('AWS_ENDPOINT_URL'),
+            'config': {
+                'object_size': size, 'count': count, 'concurrency': concurrency,
+                'multipart_threshold': multipart_threshold, 'multipart_chunksize': multipart_chunksize,
+                'max_concurrency': max_concurrency, 'range_size': range_size,
+            },
+            'results': results,
+        }
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+        console.print(f"[dim]Results written to {output}[/dim]")
@@ -1,137 +1,212 @@
-import boto3
-import json
-import asyncio
+import sys
 import click
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from concurrent.futures import ThreadPoolExecutor
-from rich.console import Console
-from rich.table import Table
-from rich import box
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
-
-from aws_wiz.utils import get_regions
-
-
-def json_serial(obj):
-    """JSON serializer for objects not serializable by default json code"""
-    if isinstance(obj, datetime):
-        return obj.isoformat()
-    raise TypeError ("Type %s not serializable" % type(obj))
-
-def scan_region_sync(region):
-    ec2 = boto3.client('ec2', region_name=region)
-    data = {
-        "ec2": [], "volumes": [], "security_groups": [],
-        "key_pairs": [], "elastic_ips": [], "vpcs": [],
-        "subnets": [], "igws": []
-    }
 
+from aws_wiz import aio, daemon, scheduler
+from aws_wiz.accounts import ACCOUNT_SOURCES, ORG_ROLE_NAME, load_accounts
+from aws_wiz.cache import account_cache, write_cache
+from aws_wiz.index import ResourceStore
+from aws_wiz.pricing import annotate_costs
+from aws_wiz.collectors import COLLECTORS, DEFAULT_KINDS, REGISTRY
+from aws_wiz.records import columnar, dumps
+from aws_wiz.tagging import FROM_TAGS_KINDS, tagged_resources
+from aws_wiz.utils import get_client, get_regions
+
+# Default bound on concurrent region scans across all accounts. Each worker
+# holds one blocking region scan, so 50 accounts x ~17 regions (850 jobs) take
+# about 4 rounds at 256; raise --max-workers for larger organizations.
+MAX_SCAN_WORKERS = 256
+
+
+def collect_kind(kind, region, session=None, account=None):
+    """{kind: records} for one collector in one region; a failed call yields no records."""
+    collector = COLLECTORS[kind]
+    # One shared string object per region across every record
+    region = sys.intern(region)
     try:
-        # Batch 1: Instances
-        for res in ec2.describe_instances().get('Reservations', []):
-            for i in res.get('Instances', []):
-                data["ec2"].append({
-                    'InstanceId': i.get('InstanceId'),
-                    'InstanceType': i.get('InstanceType'),
-                    'State': i.get('State', {}).get('Name'),
-                    'PublicIpAddress': i.get('PublicIpAddress'),
-                    'PrivateIpAddress': i.get('PrivateIpAddress'),
-                    'LaunchTime': i.get('LaunchTime'),
-                    'KeyName': i.get('KeyName'),
-                    'ImageId': i.get('ImageId'),
-                    'PlatformDetails': i.get('PlatformDetails', ''),
-                    'Tags': {tag['Key']: tag['Value'] for tag in i.get('Tags', [])},
-                    'Region': region
-                })
-
-        # Batch 2: Volumes
-        for v in ec2.describe_volumes().get('Volumes', []):
-            data["volumes"].append({
-                'VolumeId': v.get('VolumeId'),
-                'Size': v.get('Size'),
-                'State': v.get('State'),
-                'Region': region
-            })
-
-        # Batch 3: Security Groups
-        for sg in ec2.describe_security_groups().get('SecurityGroups', []):
-            data["security_groups"].append({
-                'GroupId': sg.get('GroupId'),
-                'GroupName': sg.get('GroupName'),
-                'Description': sg.get('Description'),
-                'Region': region
-            })
-
-        # Batch 4: Key Pairs
-        for k in ec2.describe_key_pairs().get('KeyPairs', []):
-            data["key_pairs"].append({
-                'KeyName': k.get('KeyName'),
-                'KeyPairId': k.get('KeyPairId'),
-                'Region': region
-            })
+        return {kind: collector.collect(get_client(collector.service, region, session), region, account)}
+    except Exception:
+        return {kind: []}
 
-        # Batch 5: Elastic IPs
-        for e in ec2.describe_addresses().get('Addresses', []):
-            data["elastic_ips"].append({
-                'PublicIp': e.get('PublicIp'),
-                'AllocationId': e.get('AllocationId'),
-                'Region': region
-            })
+# Every kind --kinds accepts, in registry order
+SCAN_KINDS = (*COLLECTORS, "s3")
 
-        # Batch 6: VPCs
-        for v in ec2.describe_vpcs().get('Vpcs', []):
-            name = next((t['Value'] for t in v.get('Tags', []) if t['Key'] == 'Name'), "-")
-            data["vpcs"].append({
-                'VpcId': v.get('VpcId'),
-                'IsDefault': v.get('IsDefault'),
-                'CidrBlock': v.get('CidrBlock'),
-                'Name': name,
-                'Region': region
-            })
+def get_bucket_region(s3, name):
+    try:
+        loc = s3.get_bucket_location(Bucket=name).get('LocationConstraint')
+    except Exception:
+        return None
+    # Legacy buckets report 'EU' and us-east-1 buckets report no constraint
+    if loc == 'EU': return 'eu-west-1'
+    return loc or 'us-east-1'
 
-        # Batch 7: Subnets
-        for s in ec2.describe_subnets().get('Subnets', []):
-            name = next((t['Value'] for t in s.get('Tags', []) if t['Key'] == 'Name'), "-")
-            data["subnets"].append({
-                'SubnetId': s.get('SubnetId'),
-                'VpcId': s.get('VpcId'),
-                'CidrBlock': s.get('CidrBlock'),
-                'Name': name,
-                'Region': region
-            })
+def fetch_s3_metrics(region, bucket_names, session=None):
+    """Latest daily BucketSizeBytes/NumberOfObjects for the buckets in one region.
 
-        # Batch 8: IGWs
-        for i in ec2.describe_internet_gateways().get('InternetGateways', []):
-            name = next((t['Value'] for t in i.get('Tags', []) if t['Key'] == 'Name'), "-")
-            vpc_id = i['Attachments'][0]['VpcId'] if i['Attachments'] else "-"
-            data["igws"].append({
-                'InternetGatewayId': i.get('InternetGatewayId'),
-                'VpcId': vpc_id,
-                'Name': name,
-                'Region': region
-            })
+    Uses CloudWatch storage metrics only, so no objects are ever listed.
+    """
+    cw = get_client('cloudwatch', region, session)
+    wanted = set(bucket_names)
+    metrics = {name: {'SizeBytes': None, 'Objects': None, 'StorageClasses': {}} for name in bucket_names}
 
+    series = []
+    try:
+        paginator = cw.get_paginator('list_metrics')
+        for page in paginator.paginate(Namespace='AWS/S3'):
+            for m in page.get('Metrics', []):
+                if m['MetricName'] not in ('BucketSizeBytes', 'NumberOfObjects'):
+                    continue
+                dims = {d['Name']: d['Value'] for d in m['Dimensions']}
+                if dims.get('BucketName') in wanted:
+                    series.append((m['MetricName'], dims))
     except Exception:
-        pass
-
-    return data
-
-def scan_s3():
-    s3 = boto3.client('s3')
+        return metrics
+
+    end = datetime.now(timezone.utc)
+    start = end - timedelta(days=3)
+
+    # get_metric_data accepts up to 500 queries per call
+    for offset in range(0, len(series), 500):
+        chunk = series[offset:offset + 500]
+        queries = [{
+            'Id': f"m{idx}",
+            'MetricStat': {
+                'Metric': {
+                    'Namespace': 'AWS/S3',
+                    'MetricName': metric_name,
+                    'Dimensions': [{'Name': k, 'Value': v} for k, v in dims.items()]
+                },
+                'Period': 86400,
+                'Stat': 'Average'
+            }
+        } for idx, (metric_name, dims) in enumerate(chunk)]
+        try:
+            paginator = cw.get_paginator('get_metric_data')
+            for page in paginator.paginate(MetricDataQueries=queries, StartTime=start, EndTime=end):
+                for r in page.get('MetricDataResults', []):
+                    if not r.get('Values'):
+                        continue
+                    metric_name, dims = chunk[int(r['Id'][1:])]
+                    entry = metrics[dims['BucketName']]
+                    value = r['Values'][0]  # newest first
+                    if metric_name == 'NumberOfObjects':
+                        entry['Objects'] = int(value)
+                    else:
+                        entry['StorageClasses'][dims.get('StorageType', 'Unknown')] = int(value)
+                        entry['SizeBytes'] = (entry['SizeBytes'] or 0) + int(value)
+        except Exception:
+            pass
+
+    return metrics
+
+def sample_bucket_prefixes(bucket, region, max_prefixes, executor, session=None):
+    """Sample the first page of up to `max_prefixes` top-level prefixes of a bucket."""
+    s3 = get_client('s3', region, session)
+    try:
+        resp = s3.list_objects_v2(Bucket=bucket, Delimiter='/', MaxKeys=1000)
+    except Exception:
+        return []
+    prefixes = [p['Prefix'] for p in resp.get('CommonPrefixes', [])][:max_prefixes]
+
+    def sample(prefix):
+        try:
+            page = s3.list_objects_v2(Bucket=bucket, Prefix=prefix, MaxKeys=1000)
+        except Exception:
+            return {'Prefix': prefix, 'SampledObjects': 0, 'SampledBytes': 0, 'Truncated': False}
+        contents = page.get('Contents', [])
+        return {
+            'Prefix': prefix,
+            'SampledObjects': len(contents),
+            'SampledBytes': sum(o.get('Size', 0) for o in contents),
+            'Truncated': page.get('IsTruncated', False)
+        }
+
+    return list(executor.map(sample, prefixes))
+
+def scan_s3(details=False, sample_prefixes=0, session=None, account=None):
+    s3 = get_client('s3', session=session)
     buckets = []
     try:
         response = s3.list_buckets()
         for bucket in response.get('Buckets', []):
             buckets.append({
                 'Name': bucket.get('Name'),
-                'CreationDate': bucket.get('CreationDate')
+                'CreationDate': bucket.get('CreationDate'),
+                'Account': account
             })
     except Exception:
         pass
+
+    if not buckets or not (details or sample_prefixes):
+        return buckets
+
+    with ThreadPoolExecutor(max_workers=20) as executor:
+        # 1. Bucket regions, in parallel
+        regions = executor.map(lambda b: get_bucket_region(s3, b['Name']), buckets)
+        by_region = {}
+        for b, region in zip(buckets, regions):
+            b['Region'] = region
+            if region: by_region.setdefault(region, []).append(b['Name'])
+
+        # 2. Size/object metrics, one CloudWatch sweep per region
+        if details:
+            futures = {r: executor.submit(fetch_s3_metrics, r, names, session) for r, names in by_region.items()}
+            for b in buckets:
+                b.update({'SizeBytes': None, 'Objects': None, 'StorageClasses': {}})
+                if b['Region']:
+                    b.update(futures[b['Region']].result()[b['Name']])
+
+    # 3. Optional prefix sampling through a bounded lister
+    if sample_prefixes:
+        with ThreadPoolExecutor(max_workers=8) as lister:
+            for b in buckets:
+                b['PrefixSample'] = sample_bucket_prefixes(b['Name'], b['Region'], sample_prefixes, lister, session) if b['Region'] else []
+
     return buckets
 
-async def scan_all_async():
-    regions = get_regions()
+async def scan_all_async(s3_details=False, s3_sample=0, show_progress=True, accounts=None, max_workers=MAX_SCAN_WORKERS,
+                         kinds=None, tagged=False, describe=()):
+    """Scan every region (of every account, when `accounts` from load_accounts is given).
+
+    `kinds` (default DEFAULT_KINDS and s3) picks the collectors. Every
+    (kind, region) pair is its own scheduler job, grouped by service, so
+    kinds run concurrently and throttle independently; at most
+    `max_workers` jobs per service run at once, so a 50-account scan runs
+    as one wide fan-out rather than 50 sequential scans.
+
+    With `tagged`, one tagging API listing per region replaces the describe
+    calls of the from-tags kinds that are not in `describe`.
+    """
+    from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
+    kinds = kinds or (*DEFAULT_KINDS, "s3")
+    if accounts:
+        targets = [(r, a['Session'], a['Id']) for a in accounts for r in a['Regions']]
+        s3_jobs = [(s3_details, s3_sample, a['Session'], a['Id']) for a in accounts]
+    else:
+        targets = [(r, None, None) for r in get_regions()]
+        s3_jobs = [(s3_details, s3_sample, None, None)]
+    if "s3" not in kinds:
+        s3_jobs = []
+
+    from_tags = tuple(k for k in kinds if k in FROM_TAGS_KINDS and k not in describe) if tagged else ()
+    # (function, service, jobs, latency key) per fan-out
+    sweeps = {}
+    for kind in kinds:
+        if kind == "s3" or kind in from_tags:
+            continue
+        service = COLLECTORS[kind].service
+        sweeps.setdefault(service, (collect_kind, service, [], lambda job: f"{job[0]}:{job[1]}"))[2].extend(
+            (kind, region, session, account) for region, session, account in targets
+        )
+    sweeps = list(sweeps.values())
+    if tagged:
+        sweeps.append((tagged_resources, 'resourcegroupstaggingapi',
+                       [(region, session, account, from_tags) for region, session, account in targets],
+                       lambda job: f"tagged:{job[0]}"))
+
+    total = sum(len(jobs) for _, _, jobs, _ in sweeps)
+    label = f"{len(targets)} regions" if not accounts else f"{len(targets)} regions in {len(accounts)} accounts"
 
     # Setup Progress Bar
     with Progress(
@@ -139,40 +214,51 @@ async def scan_all_async():
         TextColumn("[progress.description]{task.description}"),
         BarColumn(),
         TaskProgressColumn(),
+        disable=not show_progress,
     ) as progress:
 
-        task_id = progress.add_task(f"[cyan]Scanning {len(regions)} regions...", total=len(regions))
+        task_id = progress.add_task(f"[cyan]Scanning {label}...", total=total)
+        track = scheduler.track(progress, task_id)
 
-        executor = ThreadPoolExecutor(max_workers=20)
-        loop = asyncio.get_running_loop()
+        # S3 is global, so one listing per account
+        s3_results, *swept = await aio.gather(
+            scheduler.fan_out(scan_s3, s3_jobs, 's3', ceiling=max_workers),
+            *(scheduler.fan_out(fn, jobs, service, name='scan', key=key, ceiling=max_workers, on_done=track)
+              for fn, service, jobs, key in sweeps),
+        )
 
-        # Helper to update progress
-        async def run_and_track(region):
-            res = await loop.run_in_executor(executor, scan_region_sync, region)
-            progress.advance(task_id)
-            return res
+    data = {kind: [] for kind in kinds if kind != "s3"}
+    if "s3" in kinds:
+        data["s3"] = [b for buckets in s3_results for b in buckets]
+    if tagged:
+        data["tagged"] = []
+    data["timestamp"] = datetime.now().isoformat()
 
-        tasks = [run_and_track(r) for r in regions]
-        results = await asyncio.gather(*tasks)
+    for results in swept:
+        for res in results:
+            for key in res:
+                data[key].extend(res[key])
 
-    # S3 is global
-    s3_data = scan_s3()
+    if accounts:
+        data["accounts"] = [{'Id': a['Id'], 'Name': a['Name'], 'Regions': len(a['Regions'])} for a in accounts]
 
-    data = {
-        "ec2": [], "volumes": [], "security_groups": [],
-        "key_pairs": [], "elastic_ips": [], "vpcs": [],
-        "subnets": [], "igws": [], "s3": s3_data,
-        "timestamp": datetime.now().isoformat()
-    }
+    return data
 
-    for res in results:
-        for key in res:
-            data[key].extend(res[key])
+def format_bytes(num):
+    if num is None: return "-"
+    for unit in ("B", "KiB", "MiB", "GiB", "TiB"):
+        if num < 1024: return f"{num:.1f} {unit}" if unit != "B" else f"{num} B"
+        num /= 1024
+    return f"{num:.1f} PiB"
 
-    return data
+def format_money(amount, digits=2):
+    if amount is None: return "-"
+    return f"${amount:,.{digits}f}"
 
 def calculate_uptime(launch_time):
     if not launch_time: return "-"
+    # Snapshots served from the daemon or cache carry ISO strings
+    if isinstance(launch_time, str): launch_time = datetime.fromisoformat(launch_time)
     now = datetime.now(timezone.utc)
     diff = now - launch_time
     days = diff.days
@@ -205,116 +291,249 @@ def get_ssh_user(platform_details):
         return 'ec2-user'  # default
 
 def print_pretty(data):
+    from rich.console import Console
+    from rich.table import Table
+    from rich import box
     console = Console()
+    # Multi-account scans get an Account column (account name, falling back to ID)
+    account_names = {a['Id']: a['Name'] for a in data.get('accounts', [])}
+    # Set by `scan --costs`
+    has_costs = any(r.get('HourlyRate') is not None for r in data.get('ec2', []) + data.get('volumes', []))
 
     # 1. EC2 Table
-    console.print("\n[bold cyan]EC2 Instances[/bold cyan]")
-    if not data['ec2']:
-        console.print("[dim]No instances found.[/dim]")
-    else:
-        table = Table(box=box.ROUNDED, show_header=True, header_style="bold white")
-        table.add_column("Instance ID", style="cyan")
-        table.add_column("Name", style="yellow")
-        table.add_column("Type")
-        table.add_column("State")
-        table.add_column("Uptime", justify="right")
-        table.add_column("Public IP", style="green")
-        table.add_column("Private IP", style="blue")
-        table.add_column("SSH Key", style="magenta")
-        table.add_column("SSH User", style="bright_magenta")
-        table.add_column("Region", style="dim")
-
-        for i in data['ec2']:
-            name = i['Tags'].get('Name', '-')
-            state_style = "green" if i['State'] == 'running' else "red" if i['State'] == 'terminated' else "yellow"
-            uptime = "-"
-            if i['State'] == 'running': uptime = calculate_uptime(i['LaunchTime'])
-            ssh_user = get_ssh_user(i.get('PlatformDetails', ''))
-
-            table.add_row(
-                i['InstanceId'], name, i['InstanceType'],
-                f"[{state_style}]{i['State']}[/{state_style}]",
-                uptime, i['PublicIpAddress'] or "-", i.get('PrivateIpAddress') or "-",
-                i.get('KeyName') or "-", ssh_user, i['Region']
-            )
-        console.print(table)
+    if 'ec2' in data:
+        console.print("\n[bold cyan]EC2 Instances[/bold cyan]")
+        if not data['ec2']:
+            console.print("[dim]No instances found.[/dim]")
+        else:
+            table = Table(box=box.ROUNDED, show_header=True, header_style="bold white")
+            table.add_column("Instance ID", style="cyan")
+            table.add_column("Name", style="yellow")
+            table.add_column("Type")
+            table.add_column("State")
+            table.add_column("Uptime", justify="right")
+            if has_costs:
+                table.add_column("$/h", justify="right", style="green")
+                table.add_column("Accrued", justify="right", style="bold green")
+            table.add_column("Public IP", style="green")
+            table.add_column("Private IP", style="blue")
+            table.add_column("SSH Key", style="magenta")
+            table.add_column("SSH User", style="bright_magenta")
+            table.add_column("Region", style="dim")
+            if account_names: table.add_column("Account", style="dim")
+
+            for i in data['ec2']:
+                name = i['Tags'].get('Name', '-')
+                state_style = "green" if i['State'] == 'running' else "red" if i['State'] == 'terminated' else "yellow"
+                uptime = "-"
+                if i['State'] == 'running': uptime = calculate_uptime(i['LaunchTime'])
+                ssh_user = get_ssh_user(i.get('PlatformDetails', ''))
+
+                row = [i['InstanceId'], name, i['InstanceType'], f"[{state_style}]{i['State']}[/{state_style}]", uptime]
+                if has_costs: row += [format_money(i.get('HourlyRate'), 3), format_money(i.get('AccruedCost'))]
+                row += [
+                    i['PublicIpAddress'] or "-", i.get('PrivateIpAddress') or "-",
+                    i.get('KeyName') or "-", ssh_user, i['Region']
+                ]
+                if account_names: row.append(account_names.get(i.get('Account'), i.get('Account') or "-"))
+                table.add_row(*row)
+            console.print(table)
 
     # 2. Volumes
-    console.print("\n[bold cyan]EBS Volumes[/bold cyan]")
-    if not data['volumes']:
-        console.print("[dim]No volumes found.[/dim]")
-    else:
-        v_table = Table(box=box.ROUNDED, show_header=True)
-        v_table.add_column("Volume ID", style="blue")
-        v_table.add_column("Size (GiB)", justify="right")
-        v_table.add_column("State")
-        v_table.add_column("Region", style="dim")
-        for v in data['volumes']:
-            v_table.add_row(v['VolumeId'], str(v['Size']), v['State'], v['Region'])
-        console.print(v_table)
+    if 'volumes' in data:
+        console.print("\n[bold cyan]EBS Volumes[/bold cyan]")
+        if not data['volumes']:
+            console.print("[dim]No volumes found.[/dim]")
+        else:
+            v_table = Table(box=box.ROUNDED, show_header=True)
+            v_table.add_column("Volume ID", style="blue")
+            v_table.add_column("Size (GiB)", justify="right")
+            v_table.add_column("State")
+            if has_costs:
+                v_table.add_column("Type")
+                v_table.add_column("$/h", justify="right", style="green")
+                v_table.add_column("Accrued", justify="right", style="bold green")
+            v_table.add_column("Region", style="dim")
+            if account_names: v_table.add_column("Account", style="dim")
+            for v in data['volumes']:
+                row = [v['VolumeId'], str(v['Size']), v['State']]
+                if has_costs: row += [v.get('VolumeType') or "-", format_money(v.get('HourlyRate'), 4), format_money(v.get('AccruedCost'))]
+                row.append(v['Region'])
+                if account_names: row.append(account_names.get(v.get('Account'), v.get('Account') or "-"))
+                v_table.add_row(*row)
+            console.print(v_table)
 
     # 3. Security Groups
-    non_defaults = [sg for sg in data['security_groups'] if sg['GroupName'] != 'default']
-    console.print(f"\n[bold cyan]Security Groups[/bold cyan] [dim]({len(non_defaults)} non-default found)[/dim]")
-    if non_defaults:
-        sg_table = Table(box=box.SIMPLE)
-        sg_table.add_column("Group ID", style="cyan")
-        sg_table.add_column("Name", style="yellow")
-        sg_table.add_column("Region", style="dim")
-        for sg in non_defaults[:5]:
-            sg_table.add_row(sg['GroupId'], sg['GroupName'], sg['Region'])
-        console.print(sg_table)
-        if len(non_defaults) > 5: console.print(f"[dim]...and {len(non_defaults)-5} more.[/dim]")
-    else:
-        console.print("[dim]No non-default security groups found.[/dim]")
-
-    # 4. Networking
-    console.print("\n[bold cyan]Networking (Non-Default)[/bold cyan]")
-    non_default_vpcs = [v for v in data['vpcs'] if not v['IsDefault']]
-    if non_default_vpcs:
-        v_table = Table(box=box.SIMPLE, title="Custom VPCs")
-        v_table.add_column("VPC ID", style="cyan")
-        v_table.add_column("Name", style="yellow")
-        v_table.add_column("CIDR")
-        v_table.add_column("Region", style="dim")
-        vpc_ids = {v['VpcId'] for v in non_default_vpcs}
-        for v in non_default_vpcs:
-            v_table.add_row(v['VpcId'], v['Name'], v['CidrBlock'], v['Region'])
-        console.print(v_table)
-
-        custom_subnets = [s for s in data['subnets'] if s['VpcId'] in vpc_ids]
-        if custom_subnets:
-            console.print(f"[dim]Found {len(custom_subnets)} subnets and {len([i for i in data['igws'] if i['VpcId'] in vpc_ids])} IGWs associated with these VPCs.[/dim]")
-    else:
-        console.print("[dim]No non-default VPCs found.[/dim]")
+    if 'security_groups' in data:
+        non_defaults = [sg for sg in data['security_groups'] if sg['GroupName'] != 'default']
+        console.print(f"\n[bold cyan]Security Groups[/bold cyan] [dim]({len(non_defaults)} non-default found)[/dim]")
+        if non_defaults:
+            sg_table = Table(box=box.SIMPLE)
+            sg_table.add_column("Group ID", style="cyan")
+            sg_table.add_column("Name", style="yellow")
+            sg_table.add_column("Region", style="dim")
+            for sg in non_defaults[:5]:
+                sg_table.add_row(sg['GroupId'], sg['GroupName'], sg['Region'])
+            console.print(sg_table)
+            if len(non_defaults) > 5: console.print(f"[dim]...and {len(non_defaults)-5} more.[/dim]")
+        else:
+            console.print("[dim]No non-default security groups found.[/dim]")
+
+    # 4. Networking (VPCs, with their subnets and IGWs)
+    if 'vpcs' in data:
+        console.print("\n[bold cyan]Networking (Non-Default)[/bold cyan]")
+        non_default_vpcs = [v for v in data['vpcs'] if not v['IsDefault']]
+        if non_default_vpcs:
+            v_table = Table(box=box.SIMPLE, title="Custom VPCs")
+            v_table.add_column("VPC ID", style="cyan")
+            v_table.add_column("Name", style="yellow")
+            v_table.add_column("CIDR")
+            v_table.add_column("Region", style="dim")
+            for v in non_default_vpcs:
+                v_table.add_row(v['VpcId'], v['Name'], v['CidrBlock'], v['Region'])
+            console.print(v_table)
+
+            vpc_ids = {v['VpcId'] for v in non_default_vpcs}
+            store = ResourceStore(data)
+            custom_subnets = store.find("subnets", vpc=vpc_ids)
+            if custom_subnets:
+                console.print(f"[dim]Found {len(custom_subnets)} subnets and {len(store.find('igws', vpc=vpc_ids))} IGWs associated with these VPCs.[/dim]")
+        else:
+            console.print("[dim]No non-default VPCs found.[/dim]")
 
     # 5. Keys
-    console.print("\n[bold cyan]Key Pairs[/bold cyan]")
-    if not data['key_pairs']: console.print("[dim]No key pairs found.[/dim]")
-    else:
-        k_table = Table(box=box.SIMPLE)
-        k_table.add_column("Key Name", style="green")
-        k_table.add_column("Region", style="dim")
-        for k in data['key_pairs']: k_table.add_row(k['KeyName'], k['Region'])
-        console.print(k_table)
+    if 'key_pairs' in data:
+        console.print("\n[bold cyan]Key Pairs[/bold cyan]")
+        if not data['key_pairs']: console.print("[dim]No key pairs found.[/dim]")
+        else:
+            k_table = Table(box=box.SIMPLE)
+            k_table.add_column("Key Name", style="green")
+            k_table.add_column("Region", style="dim")
+            for k in data['key_pairs']: k_table.add_row(k['KeyName'], k['Region'])
+            console.print(k_table)
 
     # 6. S3
-    console.print("\n[bold cyan]S3 Buckets[/bold cyan]")
-    if not data['s3']: console.print("[dim]No buckets found.[/dim]")
-    else:
-        s3_table = Table(box=box.ROUNDED)
-        s3_table.add_column("Bucket Name", style="magenta")
-        s3_table.add_column("Creation Date", style="dim")
-        for b in data['s3']: s3_table.add_row(b['Name'], str(b['CreationDate']))
-        console.print(s3_table)
-
-    console.print(f"\n[dim]Scan completed at {data['timestamp']}. {len(data['ec2'])} instances, {len(data['vpcs'])} VPCs.[/dim]\n")
+    if 's3' in data:
+        console.print("\n[bold cyan]S3 Buckets[/bold cyan]")
+        if not data['s3']: console.print("[dim]No buckets found.[/dim]")
+        else:
+            has_details = any('SizeBytes' in b for b in data['s3'])
+            s3_table = Table(box=box.ROUNDED)
+            s3_table.add_column("Bucket Name", style="magenta")
+            s3_table.add_column("Creation Date", style="dim")
+            if has_details:
+                s3_table.add_column("Region", style="dim")
+                s3_table.add_column("Size", justify="right", style="green")
+                s3_table.add_column("Objects", justify="right")
+                s3_table.add_column("Storage Classes", style="yellow")
+            if account_names: s3_table.add_column("Account", style="dim")
+            for b in data['s3']:
+                row = [b['Name'], str(b['CreationDate'])]
+                if has_details:
+                    classes = ", ".join(c.replace("Storage", "") for c in sorted(b.get('StorageClasses', {})))
+                    objects = b.get('Objects')
+                    row += [
+                        b.get('Region') or "-", format_bytes(b.get('SizeBytes')),
+                        f"{objects:,}" if objects is not None else "-", classes or "-"
+                    ]
+                if account_names: row.append(account_names.get(b.get('Account'), b.get('Account') or "-"))
+                s3_table.add_row(*row)
+            console.print(s3_table)
+            if has_details:
+                total = sum(b.get('SizeBytes') or 0 for b in data['s3'])
+                console.print(f"[dim]Total stored: {format_bytes(total)} (CloudWatch daily storage metrics, up to 48h old).[/dim]")
+
+            sampled = [b for b in data['s3'] if b.get('PrefixSample')]
+            for b in sampled:
+                p_table = Table(box=box.SIMPLE, title=f"Prefix sample: {b['Name']}")
+                p_table.add_column("Prefix", style="cyan")
+                p_table.add_column("Objects (sampled)", justify="right")
+                p_table.add_column("Size (sampled)", justify="right")
+                for p in b['PrefixSample']:
+                    count = f"{p['SampledObjects']}+" if p['Truncated'] else str(p['SampledObjects'])
+                    p_table.add_row(p['Prefix'], count, format_bytes(p['SampledBytes']))
+                console.print(p_table)
+
+    # Extra kinds (scan --kinds) in registry order
+    for c in REGISTRY:
+        if c.columns and c.kind in data:
+            c.render(console, data[c.kind], account_names)
+
+    # 8. Everything else the tagging API reported (scan --tagged)
+    if data.get('tagged'):
+        counts = {}
+        for r in data['tagged']:
+            key = (r['Service'], r['ResourceType'] or "-")
+            counts[key] = counts.get(key, 0) + 1
+        console.print(f"\n[bold cyan]Other Tagged Resources[/bold cyan] [dim]({len(data['tagged'])} found)[/dim]")
+        t_table = Table(box=box.SIMPLE)
+        t_table.add_column("Service", style="cyan")
+        t_table.add_column("Type", style="yellow")
+        t_table.add_column("Count", justify="right")
+        for (service, resource_type), count in sorted(counts.items()):
+            t_table.add_row(service, resource_type, str(count))
+        console.print(t_table)
+
+    if has_costs:
+        hourly = sum(r.get('HourlyRate') or 0 for r in data.get('ec2', []) + data.get('volumes', []))
+        unpriced = sum(1 for r in data.get('ec2', []) if r['State'] == 'running' and r.get('HourlyRate') is None)
+        note = f" ({unpriced} running instances without a price)" if unpriced else ""
+        console.print(f"\n[bold green]Running cost: {format_money(hourly)}/h (~{format_money(hourly * 730)}/month){note}[/bold green] [dim]On-demand/spot list prices; EBS storage only.[/dim]")
+
+    accounts = f", {len(account_names)} accounts" if account_names else ""
+    totals = "".join(f", {len(data[k])} {label}" for k, label in (('ec2', "instances"), ('vpcs', "VPCs")) if k in data)
+    console.print(f"\n[dim]Scan completed at {data['timestamp']}{totals}{accounts}.[/dim]\n")
 
 @click.command()
 @click.option('--pretty', '-p', is_flag=True, help='Pretty print table')
-def scan(pretty):
-    data = asyncio.run(scan_all_async())
+@click.option('--s3-details', is_flag=True, help='Add S3 bucket region, size, object count and storage classes (CloudWatch)')
+@click.option('--s3-sample', default=0, type=click.IntRange(min=0), help='Sample the first page of up to N top-level prefixes per bucket')
+@click.option('--columnar', 'as_columns', is_flag=True, help='JSON output as one column list per field instead of one object per resource')
+@click.option('--accounts', type=click.Choice(ACCOUNT_SOURCES), help='Scan many accounts: fellows.toml credentials, local AWS profiles, or the AWS Organization')
+@click.option('--role', default=ORG_ROLE_NAME, show_default=True, help='Role assumed in member accounts with --accounts org')
+@click.option('--max-workers', default=MAX_SCAN_WORKERS, type=click.IntRange(1), show_default=True, help='Concurrent region scans across all accounts')
+@click.option('--costs', is_flag=True, help='Add hourly rate and accrued cost to running instances and volumes (Pricing API, cached)')
+@click.option('--kinds', multiple=True, type=click.Choice([*SCAN_KINDS, 'all']), help=f'Resource kinds to scan (repeatable; default: {", ".join((*DEFAULT_KINDS, "s3"))})')
+@click.option('--tagged', is_flag=True, help='Fast path: list tagged resources of every service with one Resource Groups Tagging API pagination per region')
+@click.option('--describe', multiple=True, type=click.Choice(FROM_TAGS_KINDS), help='With --tagged, kinds still described in full instead of built from tags (repeatable)')
+def scan(pretty, s3_details, s3_sample, as_columns, accounts, role, max_workers, costs, kinds, tagged, describe):
+    """Global snapshot of resources across all regions."""
+    from rich.console import Console
+    if describe and not tagged:
+        raise click.UsageError("--describe only applies with --tagged.")
+    custom = bool(kinds)
+    kinds = SCAN_KINDS if 'all' in kinds else tuple(kinds) or None
+    options = dict(s3_details=s3_details, s3_sample=s3_sample, max_workers=max_workers, kinds=kinds, tagged=tagged, describe=describe)
+    data = None
+    if not (s3_details or s3_sample or accounts or tagged or custom):
+        data = daemon.query("scan")
+    if data is None and accounts:
+        console = Console(stderr=True)
+        try:
+            with console.status(f"[bold green]Resolving {accounts} accounts..."):
+                resolved, errors = load_accounts(accounts, role)
+        except Exception as e:
+            console.print(f"[red]Error loading {accounts} accounts: {e}[/red]")
+            return
+        for err in errors:
+            console.print(f"[yellow]Skipping account {err['Name']}: {err['Error']}[/yellow]")
+        if not resolved:
+            console.print("[red]No accounts to scan.[/red]")
+            return
+        data = aio.run(scan_all_async(accounts=resolved, **options))
+        data["account_errors"] = errors
+    elif data is None:
+        data = aio.run(scan_all_async(**options))
+        # Snapshot feeds shell completion of instance IDs and bucket names;
+        # a --tagged or --kinds one lacks resources, so it is not cached
+        if not (tagged or custom):
+            write_cache(account_cache("scan"), data)
+    if costs:
+        with Console(stderr=True).status("[bold green]Pricing running resources..."):
+            annotate_costs(data)
     if pretty:
         print_pretty(data)
+    elif as_columns:
+        print(dumps(columnar(data), indent=True))
     else:
-        print(json.dumps(data, indent=2, default=json_serial))
+        print(dumps(data, indent=True))
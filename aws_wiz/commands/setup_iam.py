@@ -1,99 +1,40 @@
-import boto3
 import click
-import json
-import time
-from botocore.exceptions import ClientError
-from rich.console import Console
 
-console = Console()
+from aws_wiz.complete import complete_regions
+from aws_wiz.iam import (
+    BUCKET_NAME, PROFILE_NAME, READY_TIMEOUT, ROLE_NAME,
+    probe_launch_args, provision_instance_profile, wait_for_profile,
+)
+from aws_wiz.utils import get_console
 
-BUCKET_NAME = "s3-throughput-test-1769529024"
-ROLE_NAME = "S3ThroughputRole"
-PROFILE_NAME = "S3ThroughputProfile"
-POLICY_NAME = "S3ThroughputAccess"
 
 @click.command()
-def setup_iam():
+@click.option('--bucket', '-b', default=BUCKET_NAME, show_default=True, help='Bucket the role may access')
+@click.option('--role', default=ROLE_NAME, show_default=True, help='IAM role name')
+@click.option('--profile', default=PROFILE_NAME, show_default=True, help='Instance profile name')
+@click.option('--region', '-r', default='us-east-1', shell_complete=complete_regions, help='Region in which to confirm EC2 accepts the profile')
+@click.option('--timeout', default=READY_TIMEOUT, show_default=True, help='Seconds to wait for EC2 to accept the profile')
+def setup_iam(bucket, role, profile, region, timeout):
     """Set up IAM role and instance profile for S3 throughput testing."""
-    iam = boto3.client('iam')
-
-    # 1. Create Role
-    trust_policy = {
-        "Version": "2012-10-17",
-        "Statement": [
-            {
-                "Effect": "Allow",
-                "Principal": {"Service": "ec2.amazonaws.com"},
-                "Action": "sts:AssumeRole"
-            }
-        ]
-    }
-
-    try:
-        iam.create_role(
-            RoleName=ROLE_NAME,
-            AssumeRolePolicyDocument=json.dumps(trust_policy),
-            Description="Role for S3 throughput testing"
-        )
-        console.print(f"[green]Created role: {ROLE_NAME}[/green]")
-    except ClientError as e:
-        if e.response['Error']['Code'] == 'EntityAlreadyExists':
-            console.print(f"[yellow]Role {ROLE_NAME} already exists.[/yellow]")
-        else:
-            raise
-
-    # 2. Put Role Policy (Inline)
-    s3_policy = {
-        "Version": "2012-10-17",
-        "Statement": [
-            {
-                "Effect": "Allow",
-                "Action": [
-                    "s3:*",
-                    "ec2:Describe*"
-                ],
-                "Resource": "*"
-            }
-        ]
-    }
+    import boto3
+    console = get_console()
 
     try:
-        iam.put_role_policy(
-            RoleName=ROLE_NAME,
-            PolicyName=POLICY_NAME,
-            PolicyDocument=json.dumps(s3_policy)
-        )
-        console.print(f"[green]Attached inline policy {POLICY_NAME} to {ROLE_NAME}[/green]")
+        provision_instance_profile(bucket, role, profile, log=console.print)
     except Exception as e:
-        console.print(f"[red]Error attaching policy: {e}[/red]")
+        console.print(f"[red]IAM setup failed: {e}[/red]")
+        return
 
-    # 3. Create Instance Profile
+    ec2 = boto3.client('ec2', region_name=region)
     try:
-        iam.create_instance_profile(InstanceProfileName=PROFILE_NAME)
-        console.print(f"[green]Created instance profile: {PROFILE_NAME}[/green]")
-    except ClientError as e:
-        if e.response['Error']['Code'] == 'EntityAlreadyExists':
-            console.print(f"[yellow]Instance profile {PROFILE_NAME} already exists.[/yellow]")
-        else:
-            raise
-
-    # 4. Add Role to Instance Profile
-    try:
-        iam.add_role_to_instance_profile(
-            InstanceProfileName=PROFILE_NAME,
-            RoleName=ROLE_NAME
-        )
-        console.print(f"[green]Added role {ROLE_NAME} to profile {PROFILE_NAME}[/green]")
-    except ClientError as e:
-        if e.response['Error']['Code'] == 'LimitExceeded':
-             console.print(f"[yellow]Role already added to profile (LimitExceeded usually means this).[/yellow]")
-        elif 'already exists' in str(e): # Sometimes the error message varies
-             console.print(f"[yellow]Role {ROLE_NAME} is already in profile {PROFILE_NAME}[/yellow]")
-        else:
-             # Often throws if already attached, let's just log and continue
-             console.print(f"[dim]Note: {e}[/dim]")
-
-    # Wait for propagation
-    console.print("[dim]Waiting 10s for IAM propagation...[/dim]")
-    time.sleep(10)
-    console.print(f"[bold green]IAM Setup Complete. Profile Name: {PROFILE_NAME}[/bold green]")
+        with console.status(f"Waiting for EC2 in {region} to accept {profile}..."):
+            waited = wait_for_profile(ec2, probe_launch_args(ec2, profile), timeout)
+    except TimeoutError as e:
+        console.print(f"[red]{e}[/red]")
+        return
+    except Exception as e:
+        # The probe launch itself can fail (no default VPC, SCPs, ...); the profile may still be fine
+        console.print(f"[yellow]Could not confirm readiness in {region}: {e}[/yellow]")
+        console.print(f"[bold green]IAM Setup Complete. Profile Name: {profile}[/bold green]")
+        return
+    console.print(f"[bold green]IAM Setup Complete. Profile Name: {profile}[/bold green] [dim](ready in {region} after {waited:.1f}s)[/dim]")
@@ -1,16 +1,17 @@
-import boto3
 import click
 import os
-from rich.console import Console
-from rich.panel import Panel
 
+from aws_wiz.complete import complete_instance_ids, complete_regions
 from aws_wiz.state import KEYS_DIR
 
 @click.command()
-@click.option('--id', '-i', required=True, help='Instance ID')
-@click.option('--region', '-r', default='us-east-1', help='AWS Region')
+@click.option('--id', '-i', required=True, shell_complete=complete_instance_ids, help='Instance ID')
+@click.option('--region', '-r', default='us-east-1', shell_complete=complete_regions, help='AWS Region')
 def start(id, region):
     """Start an EC2 instance."""
+    import boto3
+    from rich.console import Console
+    from rich.panel import Panel
     console = Console()
     ec2 = boto3.client('ec2', region_name=region)
 
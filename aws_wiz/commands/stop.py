@@ -1,13 +1,15 @@
-import boto3
 import click
-from rich.console import Console
-from rich.panel import Panel
+
+from aws_wiz.complete import complete_instance_ids, complete_regions
 
 @click.command()
-@click.option('--id', '-i', required=True, help='Instance ID')
-@click.option('--region', '-r', default='us-east-1', help='AWS Region')
+@click.option('--id', '-i', required=True, shell_complete=complete_instance_ids, help='Instance ID')
+@click.option('--region', '-r', default='us-east-1', shell_complete=complete_regions, help='AWS Region')
 def stop(id, region):
     """Stop an EC2 instance."""
+    import boto3
+    from rich.console import Console
+    from rich.panel import Panel
     console = Console()
     ec2 = boto3.client('ec2', region_name=region)
 
@@ -1,15 +1,17 @@
-import boto3
 import click
-from rich.console import Console
-from rich.panel import Panel
+
+from aws_wiz.complete import complete_regions, complete_resource_ids
 
 @click.command()
 @click.option('--type', '-t', required=True, type=click.Choice(['ec2', 's3']), help='Resource type (ec2 or s3)')
-@click.option('--id', '-i', required=True, help='Resource ID (Instance ID or Bucket Name)')
-@click.option('--region', '-r', default='us-east-1', help='AWS Region (default: us-east-1)')
+@click.option('--id', '-i', required=True, shell_complete=complete_resource_ids, help='Resource ID (Instance ID or Bucket Name)')
+@click.option('--region', '-r', default='us-east-1', shell_complete=complete_regions, help='AWS Region (default: us-east-1)')
 @click.option('--force', '-f', is_flag=True, help='Force deletion (e.g., delete non-empty S3 buckets)')
 def terminate(type, id, region, force):
     """Safely terminate an AWS resource (EC2 Instance or S3 Bucket)."""
+    import boto3
+    from rich.console import Console
+    from rich.panel import Panel
     console = Console()
 
     # 1. Verification Phase
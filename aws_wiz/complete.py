@@ -0,0 +1,35 @@
+from click.shell_completion import CompletionItem
+
+from aws_wiz.cache import account_cache, read_cache
+
+# Dynamic completions are served from local caches only, so TAB never calls AWS:
+#   regions         written by utils.get_regions (per AWS identity)
+#   scan            last `awiz scan` snapshot of the current AWS identity
+#   instance-types  catalog collected by `awiz list-instances`
+
+
+def complete_regions(ctx, param, incomplete):
+    return [CompletionItem(r) for r in read_cache(account_cache("regions")) or [] if r.startswith(incomplete)]
+
+def complete_instance_ids(ctx, param, incomplete):
+    snapshot = read_cache(account_cache("scan")) or {}
+    region = ctx.params.get("region")
+    items = []
+    for i in snapshot.get("ec2", []):
+        if not i["InstanceId"].startswith(incomplete):
+            continue
+        if region and i["Region"] != region:
+            continue
+        name = i.get("Tags", {}).get("Name", "-")
+        items.append(CompletionItem(i["InstanceId"], help=f"{name} {i['InstanceType']} {i['State']} {i['Region']}"))
+    return items
+
+def complete_resource_ids(ctx, param, incomplete):
+    """Instance IDs, or bucket names when completing `terminate --type s3`."""
+    if ctx.params.get("type") == "s3":
+        snapshot = read_cache(account_cache("scan")) or {}
+        return [CompletionItem(b["Name"]) for b in snapshot.get("s3", []) if b["Name"].startswith(incomplete)]
+    return complete_instance_ids(ctx, param, incomplete)
+
+def complete_instance_types(ctx, param, incomplete):
+    return [CompletionItem(t) for t in read_cache("instance-types") or [] if t.startswith(incomplete)]
@@ -0,0 +1,212 @@
+"""Optional background daemon serving warm scan/quota/catalog data over a Unix socket.
+
+Protocol: one JSON request per connection, terminated by a newline,
+e.g. {"op": "scan"}; the daemon replies with {"ok": true, "result": ...}.
+
+Commands call `query()` first and fall back to hitting AWS directly when no
+daemon is running (or AWIZ_NO_DAEMON is set). Every request carries the
+caller's `identity_key()`; the daemon only answers callers using the same
+AWS identity it was started with (ping and shutdown excepted). The daemon uses the regular
+boto3 configuration, so AWS_ENDPOINT_URL pointed at a moto server works for
+local testing.
+"""
+import argparse
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+from datetime import datetime
+
+from aws_wiz.cache import account_cache, identity_key
+from aws_wiz.records import dumps
+from aws_wiz.state import STATE_DIR
+
+SOCKET_PATH = STATE_DIR / "awiz.sock"
+LOG_PATH = STATE_DIR / "daemon.log"
+QUERY_TIMEOUT = 30
+CATALOG_TTL = 24 * 3600
+
+
+def query(op, **params):
+    """Ask a running daemon; returns the result, or None if no daemon answered."""
+    if os.environ.get("AWIZ_NO_DAEMON") or not SOCKET_PATH.exists():
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(QUERY_TIMEOUT)
+            sock.connect(str(SOCKET_PATH))
+            request = {"op": op, "identity": identity_key(), **params}
+            sock.sendall(json.dumps(request).encode() + b"\n")
+            chunks = []
+            while chunk := sock.recv(65536):
+                chunks.append(chunk)
+        response = json.loads(b"".join(chunks))
+    except (OSError, ValueError):
+        return None
+    return response["result"] if response.get("ok") else None
+
+
+class ResourceIndex:
+    """In-memory state refreshed on a schedule and served to clients."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.started = datetime.now().isoformat()
+        self.identity = identity_key()
+        self.refreshed = None
+        self.scan = None
+        self.store = None
+        self.quotas = {}
+        self.catalog = {}
+        self.lock = threading.Lock()
+
+    def refresh(self):
+        from aws_wiz import aio
+        from aws_wiz.cache import write_cache
+        from aws_wiz.commands.quota_check import run_scan
+        from aws_wiz.commands.scan import scan_all_async
+        from aws_wiz.index import ResourceStore
+
+        scan, quotas = aio.run(aio.gather(scan_all_async(show_progress=False), run_scan('all')))
+        store = ResourceStore(scan)
+        with self.lock:
+            self.scan = scan
+            self.store = store
+            self.quotas = {q["region"]: q for q in quotas}
+            self.refreshed = datetime.now().isoformat()
+        write_cache(account_cache("scan"), scan)
+
+    def refresh_forever(self, stop_event):
+        while not stop_event.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"{datetime.now().isoformat()} refresh failed: {e}", file=sys.stderr, flush=True)
+            stop_event.wait(self.interval)
+
+    def handle(self, request):
+        op = request.get("op")
+        if op == "ping":
+            return {"pid": os.getpid(), "started": self.started, "refreshed": self.refreshed,
+                    "interval": self.interval, "identity": self.identity}
+        if request.get("identity") != self.identity:
+            # Another profile/credentials/endpoint: let the caller go to AWS itself
+            return None
+        if op == "scan":
+            with self.lock:
+                return self.scan
+        if op == "query":
+            with self.lock:
+                store, timestamp = self.store, (self.scan or {}).get("timestamp")
+            if store is None:
+                return None
+            matches = store.query(request["expr"])
+            return {"timestamp": timestamp, "matches": [{"Kind": kind, **record} for kind, record in matches]}
+        if op == "quota-check":
+            return self.quota_check(request.get("region", "all"), request.get("usage", False))
+        if op == "list-instances":
+            return self.list_instances(request["pattern"], request.get("region", "all"))
+        raise ValueError(f"unknown op: {op}")
+
+    def quota_check(self, region, usage):
+        from aws_wiz import scheduler
+        from aws_wiz.commands.quota_check import scan_region_buckets, scan_region_usage
+
+        with self.lock:
+            if not self.quotas:
+                return None
+            regions = sorted(self.quotas) if region == "all" else [region]
+            results = [self.quotas.get(r) for r in regions]
+        results = [res or scan_region_buckets(r) for r, res in zip(regions, results)]
+        if not usage:
+            return results
+        usages = scheduler.sweep(scan_region_usage, [(r,) for r in regions], 'ec2', name='quota-usage')
+        return [{**res, "usage": used} for res, used in zip(results, usages)]
+
+    def list_instances(self, pattern, region):
+        from aws_wiz import scheduler
+        from aws_wiz.commands.list_instances import aggregate_types, fetch_region_types, filter_types
+        from aws_wiz.utils import get_regions
+
+        regions = get_regions() if region == "all" else [region]
+        now = time.time()
+        stale = [r for r in regions if now - self.catalog.get(r, (0, None))[0] > CATALOG_TTL]
+        if stale:
+            for r, types in zip(stale, scheduler.sweep(fetch_region_types, [(r,) for r in stale], 'ec2', name='list-instances')):
+                if types:
+                    self.catalog[r] = (now, types)
+        results = [filter_types(self.catalog.get(r, (0, {}))[1], pattern) for r in regions]
+        return aggregate_types(results)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+            if request.get("op") == "shutdown":
+                response = {"ok": True, "result": "bye"}
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+            else:
+                result = self.server.index.handle(request)
+                response = {"ok": result is not None, "result": result}
+        except Exception as e:
+            response = {"ok": False, "error": str(e)}
+        self.wfile.write(dumps(response).encode())
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def is_running():
+    return query("ping") is not None
+
+
+def serve(interval):
+    """Run the daemon in the foreground until shut down."""
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    if SOCKET_PATH.exists():
+        if is_running():
+            print(f"Daemon already running on {SOCKET_PATH}", file=sys.stderr)
+            return
+        SOCKET_PATH.unlink()
+    # Never answer our own queries through the socket
+    os.environ["AWIZ_NO_DAEMON"] = "1"
+
+    index = ResourceIndex(interval)
+    stop_event = threading.Event()
+    refresher = threading.Thread(target=index.refresh_forever, args=(stop_event,), daemon=True)
+
+    # The socket is created by bind(); under this umask it is 0600 from the
+    # start, so no other user can connect before it is locked down
+    old_umask = os.umask(0o177)
+    try:
+        server = _Server(str(SOCKET_PATH), _Handler)
+    finally:
+        os.umask(old_umask)
+
+    with server:
+        server.index = index
+        refresher.start()
+        print(f"{datetime.now().isoformat()} awiz daemon listening on {SOCKET_PATH}", file=sys.stderr, flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            stop_event.set()
+            SOCKET_PATH.unlink(missing_ok=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="awiz background daemon")
+    parser.add_argument("--interval", type=int, default=300, help="Refresh interval in seconds")
+    args = parser.parse_args()
+    serve(args.interval)
+
+
+if __name__ == "__main__":
+    main()
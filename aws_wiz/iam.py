@@ -0,0 +1,133 @@
+"""IAM instance profile provisioning for instances that need S3 access.
+
+IAM is eventually consistent: a new instance profile can be readable in IAM
+while EC2 still rejects it in run_instances. Rather than sleeping a fixed
+time, `provision_instance_profile` waits on the IAM waiters and
+`wait_for_profile` probes run_instances with DryRun until EC2 accepts the
+profile, backing off up to a bounded timeout.
+"""
+import json
+import time
+
+BUCKET_NAME = "s3-throughput-test-1769529024"
+ROLE_NAME = "S3ThroughputRole"
+PROFILE_NAME = "S3ThroughputProfile"
+POLICY_NAME = "S3ThroughputAccess"
+
+READY_TIMEOUT = 90
+# Minimal launch used to probe readiness when there is no real launch to probe
+PROBE_AMI_PARAMETER = "/aws/service/ami-amazon-linux-latest/al2023-ami-kernel-default-x86_64"
+PROBE_INSTANCE_TYPE = "t3.micro"
+
+TRUST_POLICY = {
+    "Version": "2012-10-17",
+    "Statement": [
+        {
+            "Effect": "Allow",
+            "Principal": {"Service": "ec2.amazonaws.com"},
+            "Action": "sts:AssumeRole"
+        }
+    ]
+}
+
+
+def bucket_policy(bucket):
+    return {
+        "Version": "2012-10-17",
+        "Statement": [
+            {
+                "Effect": "Allow",
+                "Action": "s3:*",
+                "Resource": [f"arn:aws:s3:::{bucket}", f"arn:aws:s3:::{bucket}/*"]
+            },
+            {
+                "Effect": "Allow",
+                "Action": "ec2:Describe*",
+                "Resource": "*"
+            }
+        ]
+    }
+
+def provision_instance_profile(bucket=BUCKET_NAME, role_name=ROLE_NAME, profile_name=PROFILE_NAME, log=print):
+    """Create (or reuse) the role, its bucket policy and the instance profile.
+
+    Returns once IAM reports both the role and the profile with the role
+    attached; EC2 may still need a moment (see wait_for_profile).
+    """
+    import boto3
+    from botocore.exceptions import ClientError
+    iam = boto3.client('iam')
+
+    try:
+        iam.create_role(
+            RoleName=role_name,
+            AssumeRolePolicyDocument=json.dumps(TRUST_POLICY),
+            Description=f"EC2 access to s3://{bucket}"
+        )
+        log(f"[green]Created role: {role_name}[/green]")
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'EntityAlreadyExists':
+            raise
+        log(f"[yellow]Role {role_name} already exists.[/yellow]")
+    iam.get_waiter('role_exists').wait(RoleName=role_name, WaiterConfig={'Delay': 1, 'MaxAttempts': 30})
+
+    iam.put_role_policy(RoleName=role_name, PolicyName=POLICY_NAME, PolicyDocument=json.dumps(bucket_policy(bucket)))
+    log(f"[green]Attached inline policy {POLICY_NAME} (s3://{bucket}) to {role_name}[/green]")
+
+    try:
+        iam.create_instance_profile(InstanceProfileName=profile_name)
+        log(f"[green]Created instance profile: {profile_name}[/green]")
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'EntityAlreadyExists':
+            raise
+        log(f"[yellow]Instance profile {profile_name} already exists.[/yellow]")
+    iam.get_waiter('instance_profile_exists').wait(InstanceProfileName=profile_name, WaiterConfig={'Delay': 1, 'MaxAttempts': 30})
+
+    # A profile holds at most one role; only attach when it is not there yet
+    roles = iam.get_instance_profile(InstanceProfileName=profile_name)['InstanceProfile']['Roles']
+    if any(r['RoleName'] == role_name for r in roles):
+        log(f"[yellow]Role {role_name} is already in profile {profile_name}.[/yellow]")
+    elif roles:
+        raise RuntimeError(f"Instance profile {profile_name} already holds role {roles[0]['RoleName']}")
+    else:
+        iam.add_role_to_instance_profile(InstanceProfileName=profile_name, RoleName=role_name)
+        log(f"[green]Added role {role_name} to profile {profile_name}[/green]")
+
+def is_profile_not_ready(error):
+    """True for the run_instances errors EC2 returns while a new profile propagates."""
+    err = error.response['Error']
+    return err['Code'] in ('InvalidParameterValue', 'NoSuchEntity') and 'profile' in err.get('Message', '').lower()
+
+def wait_for_profile(ec2, launch_args, timeout=READY_TIMEOUT):
+    """Probe run_instances(**launch_args, DryRun=True) until EC2 accepts the instance profile.
+
+    Returns the seconds waited. Raises TimeoutError if the profile is still
+    rejected after `timeout`; any other probe error is raised unchanged.
+    """
+    from botocore.exceptions import ClientError
+    start = time.monotonic()
+    delay = 0.5
+    while True:
+        try:
+            ec2.run_instances(**launch_args, DryRun=True)
+            return time.monotonic() - start
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'DryRunOperation':
+                return time.monotonic() - start
+            if not is_profile_not_ready(e):
+                raise
+            waited = time.monotonic() - start
+            if waited + delay > timeout:
+                raise TimeoutError(f"EC2 still rejects the instance profile after {waited:.0f}s: {e}")
+        time.sleep(delay)
+        delay = min(delay * 2, 5)
+
+def probe_launch_args(ec2, profile_name):
+    """Smallest launch that exercises the profile: latest Amazon Linux on a t3.micro in the default VPC."""
+    import boto3
+    ssm = boto3.client('ssm', region_name=ec2.meta.region_name)
+    ami_id = ssm.get_parameter(Name=PROBE_AMI_PARAMETER)['Parameter']['Value']
+    return {
+        'ImageId': ami_id, 'InstanceType': PROBE_INSTANCE_TYPE, 'MinCount': 1, 'MaxCount': 1,
+        'IamInstanceProfile': {'Name': profile_name},
+    }
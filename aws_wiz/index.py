@@ -0,0 +1,220 @@
+"""Hash-indexed store over scan output plus a small query language.
+
+    awiz query 'ec2 vpc=vpc-0abc tag:team=ml age>2d state=running'
+
+A query is an optional resource kind followed by clauses (optionally joined
+with `and`):
+
+    field=value   field!=value   tag:Key=value   tag:Key   age>2d   size>=100
+
+Equality on id, kind, region, vpc, state, account and tags is answered from hash
+indexes; every other clause is checked only against those candidates. Values
+may contain `*` wildcards. Unknown fields are compared against the record key
+of the same name (e.g. InstanceType=g5.*).
+"""
+import re
+import shlex
+from datetime import datetime, timezone
+from fnmatch import fnmatchcase
+
+from aws_wiz.collectors import REGISTRY
+
+# kind -> primary ID field
+KIND_ID_FIELDS = {
+    **{c.kind: c.id_field for c in REGISTRY},
+    "s3": "Name",
+    "tagged": "Arn",
+}
+
+KIND_ALIASES = {
+    **{alias: c.kind for c in REGISTRY for alias in c.aliases},
+    "bucket": "s3", "buckets": "s3",
+    "resource": "tagged", "resources": "tagged",
+}
+
+# Record fields that carry a creation time, in lookup order
+TIME_FIELDS = ("LaunchTime", "CreateTime", "CreationDate", "StartTime")
+
+INDEXED_FIELDS = ("id", "kind", "region", "vpc", "state", "account", "tag")
+
+_CLAUSE = re.compile(r"^(?P<field>[A-Za-z_][\w:.\-/]*?)(?P<op>!=|>=|<=|=|>|<)(?P<value>.*)$")
+_DURATION = re.compile(r"^(\d+(?:\.\d+)?)([smhdw])$")
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+class QuerySyntaxError(ValueError):
+    pass
+
+
+def parse_duration(text):
+    m = _DURATION.match(text)
+    if not m:
+        raise QuerySyntaxError(f"Invalid duration '{text}' (use e.g. 30m, 6h, 2d)")
+    return float(m.group(1)) * _UNITS[m.group(2)]
+
+
+def parse_query(expr):
+    """Split an expression into (kind, [(field, op, value), ...])."""
+    kind = None
+    clauses = []
+    try:
+        tokens = shlex.split(expr)
+    except ValueError as e:
+        raise QuerySyntaxError(str(e))
+
+    for pos, token in enumerate(tokens):
+        if token.lower() == "and":
+            continue
+        m = _CLAUSE.match(token)
+        if m:
+            clauses.append((m.group("field"), m.group("op"), m.group("value")))
+        elif token.startswith("tag:"):
+            clauses.append((token, "exists", None))
+        elif pos == 0:
+            kind = KIND_ALIASES.get(token, token)
+            if kind not in KIND_ID_FIELDS:
+                raise QuerySyntaxError(f"Unknown resource kind '{token}'")
+        else:
+            raise QuerySyntaxError(f"Cannot parse '{token}'")
+    return kind, clauses
+
+
+def _record_time(record):
+    for field in TIME_FIELDS:
+        value = record.get(field)
+        if value:
+            if isinstance(value, str):
+                value = datetime.fromisoformat(value)
+            if value.tzinfo is None:
+                value = value.replace(tzinfo=timezone.utc)
+            return value
+    return None
+
+
+class ResourceStore:
+    """Scan output flattened into one record list with hash indexes on it."""
+
+    def __init__(self, snapshot):
+        self.records = []
+        self.kinds = []
+        self.indexes = {field: {} for field in INDEXED_FIELDS}
+
+        for kind, id_field in KIND_ID_FIELDS.items():
+            for record in snapshot.get(kind, []):
+                pos = len(self.records)
+                self.records.append(record)
+                self.kinds.append(kind)
+                self._add("id", record.get(id_field), pos)
+                self._add("kind", kind, pos)
+                self._add("region", record.get("Region"), pos)
+                self._add("vpc", record.get("VpcId"), pos)
+                self._add("state", record.get("State"), pos)
+                self._add("account", record.get("Account"), pos)
+                for key, value in (record.get("Tags") or {}).items():
+                    self._add("tag", (key, value), pos)
+                    self._add("tag", (key, None), pos)
+
+    def _add(self, field, value, pos):
+        if value is not None:
+            self.indexes[field].setdefault(value, set()).add(pos)
+
+    def lookup(self, field, values):
+        """Positions whose indexed `field` equals any of `values`."""
+        index = self.indexes[field]
+        if isinstance(values, (str, tuple)):
+            values = [values]
+        hits = set()
+        for value in values:
+            hits |= index.get(value, set())
+        return hits
+
+    def find(self, kind=None, **equalities):
+        """Records matching indexed equalities, e.g. find("subnets", vpc={...})."""
+        positions = self.lookup("kind", kind) if kind else None
+        for field, values in equalities.items():
+            hits = self.lookup(field, values)
+            positions = hits if positions is None else positions & hits
+        if positions is None:
+            positions = range(len(self.records))
+        return [self.records[p] for p in sorted(positions)]
+
+    def query(self, expr):
+        """Evaluate a query expression; returns (kind, record) pairs."""
+        kind, clauses = parse_query(expr)
+
+        # 1. Candidate set from the hash indexes, smallest first
+        indexed, residual = [], []
+        for field, op, value in clauses:
+            name = field.lower()
+            if op == "=" and "*" not in value and (name in INDEXED_FIELDS[:-1]):
+                indexed.append(self.lookup(name, value))
+            elif op in ("=", "exists") and name.startswith("tag:") and "*" not in (value or ""):
+                indexed.append(self.lookup("tag", (field[4:], value)))
+            else:
+                residual.append((field, op, value))
+        if kind:
+            indexed.append(self.lookup("kind", kind))
+
+        if indexed:
+            indexed.sort(key=len)
+            candidates = set(indexed[0]).intersection(*indexed[1:])
+        else:
+            candidates = range(len(self.records))
+
+        # 2. Residual predicates on the candidates only
+        now = datetime.now(timezone.utc)
+        matches = []
+        for pos in sorted(candidates):
+            record = self.records[pos]
+            if all(self._check(self.kinds[pos], record, clause, now) for clause in residual):
+                matches.append((self.kinds[pos], record))
+        return matches
+
+    def _check(self, kind, record, clause, now):
+        field, op, value = clause
+        name = field.lower()
+
+        if name == "age":
+            created = _record_time(record)
+            if created is None:
+                return False
+            return _compare((now - created).total_seconds(), op, parse_duration(value))
+
+        if name.startswith("tag:"):
+            actual = (record.get("Tags") or {}).get(field[4:])
+            if op == "exists":
+                return actual is not None
+        elif name == "id":
+            actual = record.get(KIND_ID_FIELDS[kind])
+        elif name == "kind":
+            actual = kind
+        elif name in ("region", "vpc", "state", "account"):
+            actual = record.get({"region": "Region", "vpc": "VpcId", "state": "State", "account": "Account"}[name])
+        elif name == "type":
+            actual = record.get("InstanceType")
+        elif name == "name":
+            actual = record.get("Name") or (record.get("Tags") or {}).get("Name")
+        else:
+            actual = record.get(field)
+            if actual is None:
+                # Case-insensitive fallback on record keys
+                actual = next((v for k, v in record.items() if k.lower() == name), None)
+
+        if op in (">", "<", ">=", "<="):
+            try:
+                return _compare(float(actual), op, float(value))
+            except (TypeError, ValueError):
+                return False
+
+        matched = actual is not None and fnmatchcase(str(actual), value)
+        return matched if op == "=" else not matched
+
+
+def _compare(left, op, right):
+    if op == ">": return left > right
+    if op == "<": return left < right
+    if op == ">=": return left >= right
+    if op == "<=": return left <= right
+    if op == "=": return left == right
+    if op == "!=": return left != right
+    raise QuerySyntaxError(f"Unsupported operator '{op}'")
@@ -0,0 +1,195 @@
+"""Hourly prices for instances and volumes, cached in a local price store.
+
+On-demand and EBS prices come from the Pricing API (queried in us-east-1),
+spot prices from describe_spot_price_history. Every price is stored under
+STATE_DIR/cache/prices.json with its fetch time, so a warm scan annotates
+costs without any API calls.
+
+`annotate_costs` collects the distinct (type, region) keys of a snapshot,
+fetches only the missing ones in parallel, then joins rates onto every
+record in one pass.
+"""
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from aws_wiz.cache import read_cache, write_cache
+from aws_wiz.utils import get_client
+
+PRICE_STORE = "prices"
+ON_DEMAND_TTL = 7 * 86400
+SPOT_TTL = 3600
+HOURS_PER_MONTH = 730
+
+
+def platform_os(platform_details):
+    """Pricing API operatingSystem for an instance's PlatformDetails."""
+    return 'Windows' if 'windows' in (platform_details or '').lower() else 'Linux'
+
+def _first_usd_price(price_list):
+    for item in price_list:
+        product = json.loads(item)
+        for term in product.get('terms', {}).get('OnDemand', {}).values():
+            for dim in term.get('priceDimensions', {}).values():
+                price = float(dim['pricePerUnit'].get('USD', 0))
+                if price > 0:
+                    return price
+    return None
+
+def _match(**fields):
+    return [{'Type': 'TERM_MATCH', 'Field': k, 'Value': v} for k, v in fields.items()]
+
+def fetch_on_demand(instance_type, region, os_name):
+    """On-demand $/hour for a shared-tenancy instance with no pre-installed software."""
+    pricing = get_client('pricing', 'us-east-1')
+    resp = pricing.get_products(ServiceCode='AmazonEC2', Filters=_match(
+        instanceType=instance_type, regionCode=region, operatingSystem=os_name,
+        tenancy='Shared', preInstalledSw='NA', capacitystatus='Used', licenseModel='No License required'
+    ))
+    return _first_usd_price(resp.get('PriceList', []))
+
+def fetch_ebs(volume_type, region):
+    """EBS storage $/GB-month (provisioned IOPS/throughput charges are not included)."""
+    pricing = get_client('pricing', 'us-east-1')
+    resp = pricing.get_products(ServiceCode='AmazonEC2', Filters=_match(
+        productFamily='Storage', volumeApiName=volume_type, regionCode=region
+    ))
+    return _first_usd_price(resp.get('PriceList', []))
+
+def fetch_spot(region, instance_types, os_name):
+    """Current spot $/hour per instance type, averaged over the region's AZs."""
+    ec2 = get_client('ec2', region)
+    description = 'Windows' if os_name == 'Windows' else 'Linux/UNIX'
+    latest = {}
+    paginator = ec2.get_paginator('describe_spot_price_history')
+    for page in paginator.paginate(InstanceTypes=sorted(instance_types), ProductDescriptions=[description],
+                                   StartTime=datetime.now(timezone.utc)):
+        for entry in page['SpotPriceHistory']:
+            # Newest first; keep one price per (type, AZ)
+            latest.setdefault((entry['InstanceType'], entry['AvailabilityZone']), float(entry['SpotPrice']))
+
+    prices = {}
+    for (instance_type, _az), price in latest.items():
+        prices.setdefault(instance_type, []).append(price)
+    return {t: sum(p) / len(p) for t, p in prices.items()}
+
+
+class PriceStore:
+    """`prices.json`: {"kind|key|...": [price, fetched_at]} with per-kind TTLs."""
+
+    def __init__(self):
+        self.entries = read_cache(PRICE_STORE) or {}
+        self.dirty = False
+
+    def get(self, key, ttl):
+        entry = self.entries.get(key)
+        if entry and time.time() - entry[1] <= ttl:
+            return entry
+        return None
+
+    def put(self, key, price):
+        self.entries[key] = [price, time.time()]
+        self.dirty = True
+
+    def save(self):
+        if self.dirty:
+            write_cache(PRICE_STORE, self.entries)
+
+
+def _hours_since(start, now):
+    if not start:
+        return None
+    if isinstance(start, str):
+        start = datetime.fromisoformat(start)
+    return max((now - start).total_seconds(), 0) / 3600
+
+def resolve_prices(od_keys, ebs_keys, spot_keys, store=None):
+    """Price table for the given keys, fetching only what the store lacks.
+
+    od_keys: {(type, region, os)}, ebs_keys: {(volume_type, region)},
+    spot_keys: {(type, region, os)}. Returns {store_key: price or None}.
+    """
+    store = store or PriceStore()
+    wanted = (
+        [(f"od|{t}|{r}|{o}", ON_DEMAND_TTL) for t, r, o in od_keys] +
+        [(f"ebs|{v}|{r}", ON_DEMAND_TTL) for v, r in ebs_keys] +
+        [(f"spot|{t}|{r}|{o}", SPOT_TTL) for t, r, o in spot_keys]
+    )
+    table = {}
+    for key, ttl in wanted:
+        entry = store.get(key, ttl)
+        if entry:
+            table[key] = entry[0]
+
+    missing_od = [(t, r, o) for t, r, o in od_keys if f"od|{t}|{r}|{o}" not in table]
+    missing_ebs = [(v, r) for v, r in ebs_keys if f"ebs|{v}|{r}" not in table]
+    # Spot prices: one history call per (region, os) covering all its types
+    spot_groups = {}
+    for t, r, o in spot_keys:
+        if f"spot|{t}|{r}|{o}" not in table:
+            spot_groups.setdefault((r, o), set()).add(t)
+
+    def fetch(job):
+        kind, args = job
+        try:
+            if kind == 'od':
+                return [(f"od|{'|'.join(args)}", fetch_on_demand(*args))]
+            if kind == 'ebs':
+                return [(f"ebs|{'|'.join(args)}", fetch_ebs(*args))]
+            region, os_name, types = args
+            prices = fetch_spot(region, types, os_name)
+            return [(f"spot|{t}|{region}|{os_name}", prices.get(t)) for t in types]
+        except Exception:
+            # Not stored, so the next scan retries
+            return []
+
+    jobs = ([('od', k) for k in missing_od] + [('ebs', k) for k in missing_ebs] +
+            [('spot', (r, o, types)) for (r, o), types in spot_groups.items()])
+    if jobs:
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            for results in executor.map(fetch, jobs):
+                for key, price in results:
+                    table[key] = price
+                    store.put(key, price)
+        store.save()
+    return table
+
+def annotate_costs(data, now=None):
+    """Set HourlyRate/AccruedCost on running instances and on volumes, in place.
+
+    Accrued cost runs from LaunchTime (the last start) for instances and from
+    CreateTime for volumes. Returns the total hourly rate of priced resources.
+    """
+    now = now or datetime.now(timezone.utc)
+    running = [i for i in data.get('ec2', []) if i.get('State') == 'running']
+    volumes = data.get('volumes', [])
+
+    def instance_key(i):
+        kind = 'spot' if i.get('InstanceLifecycle') == 'spot' else 'od'
+        return kind, i['InstanceType'], i['Region'], platform_os(i.get('PlatformDetails'))
+
+    keys = [instance_key(i) for i in running]
+    table = resolve_prices(
+        od_keys={k[1:] for k in keys if k[0] == 'od'},
+        ebs_keys={(v['VolumeType'], v['Region']) for v in volumes if v.get('VolumeType')},
+        spot_keys={k[1:] for k in keys if k[0] == 'spot'},
+    )
+
+    total = 0.0
+    for i, key in zip(running, keys):
+        rate = table.get("|".join(key))
+        hours = _hours_since(i.get('LaunchTime'), now)
+        i['HourlyRate'] = rate
+        i['AccruedCost'] = rate * hours if rate is not None and hours is not None else None
+        total += rate or 0
+
+    for v in volumes:
+        per_gb_month = table.get(f"ebs|{v.get('VolumeType')}|{v['Region']}")
+        rate = per_gb_month * (v.get('Size') or 0) / HOURS_PER_MONTH if per_gb_month is not None else None
+        hours = _hours_since(v.get('CreateTime'), now)
+        v['HourlyRate'] = rate
+        v['AccruedCost'] = rate * hours if rate is not None and hours is not None else None
+        total += rate or 0
+
+    return total
@@ -0,0 +1,288 @@
+"""Compact typed records for scan results.
+
+Each resource is a slotted dataclass instead of a dict, so field names are
+stored once per class rather than once per resource. Records still behave like
+read-mostly mappings (`r['InstanceId']`, `r.get('Tags')`, `{**r}`), so code
+written against the old dict output keeps working, as do snapshots loaded
+back from the cache or the daemon as plain dicts.
+"""
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from types import MappingProxyType
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Shared by every untagged resource instead of one empty dict each
+NO_TAGS = MappingProxyType({})
+
+
+def tags_of(raw):
+    """EC2 `Tags` list as a dict (NO_TAGS when untagged)."""
+    return {t['Key']: t['Value'] for t in raw} if raw else NO_TAGS
+
+
+class Record:
+    """Mapping-style access over a dataclass' fields."""
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if key not in self.__dataclass_fields__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in self.__dataclass_fields__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self.__dataclass_fields__
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.__dataclass_fields__ else default
+
+    def keys(self):
+        return self.__dataclass_fields__.keys()
+
+    def items(self):
+        return ((k, getattr(self, k)) for k in self.__dataclass_fields__)
+
+    def to_dict(self):
+        return {k: getattr(self, k) for k in self.__dataclass_fields__}
+
+
+@dataclass(slots=True)
+class Instance(Record):
+    InstanceId: str
+    InstanceType: str = None
+    State: str = None
+    PublicIpAddress: str = None
+    PrivateIpAddress: str = None
+    LaunchTime: datetime = None
+    KeyName: str = None
+    ImageId: str = None
+    PlatformDetails: str = ''
+    InstanceLifecycle: str = None
+    VpcId: str = None
+    SubnetId: str = None
+    Tags: dict = field(default_factory=dict)
+    Region: str = None
+    Account: str = None
+    HourlyRate: float = None
+    AccruedCost: float = None
+
+
+@dataclass(slots=True)
+class Volume(Record):
+    VolumeId: str
+    Size: int = None
+    VolumeType: str = None
+    State: str = None
+    CreateTime: datetime = None
+    Region: str = None
+    Account: str = None
+    HourlyRate: float = None
+    AccruedCost: float = None
+
+
+@dataclass(slots=True)
+class SecurityGroup(Record):
+    GroupId: str
+    GroupName: str = None
+    Description: str = None
+    VpcId: str = None
+    Region: str = None
+    Account: str = None
+
+
+@dataclass(slots=True)
+class KeyPair(Record):
+    KeyName: str
+    KeyPairId: str = None
+    Region: str = None
+    Account: str = None
+
+
+@dataclass(slots=True)
+class ElasticIp(Record):
+    PublicIp: str
+    AllocationId: str = None
+    Region: str = None
+    Account: str = None
+
+
+@dataclass(slots=True)
+class Vpc(Record):
+    VpcId: str
+    IsDefault: bool = False
+    CidrBlock: str = None
+    Name: str = "-"
+    Region: str = None
+    Account: str = None
+
+
+@dataclass(slots=True)
+class Subnet(Record):
+    SubnetId: str
+    VpcId: str = None
+    CidrBlock: str = None
+    Name: str = "-"
+    Region: str = None
+    Account: str = None
+
+
+@dataclass(slots=True)
+class InternetGateway(Record):
+    InternetGatewayId: str
+    VpcId: str = "-"
+    Name: str = "-"
+    Region: str = None
+    Account: str = None
+
+
+@dataclass(slots=True)
+class NatGateway(Record):
+    NatGatewayId: str
+    State: str = None
+    VpcId: str = None
+    SubnetId: str = None
+    PublicIp: str = None
+    CreateTime: datetime = None
+    Tags: dict = field(default_factory=dict)
+    Region: str = None
+    Account: str = None
+
+
+@dataclass(slots=True)
+class NetworkInterface(Record):
+    NetworkInterfaceId: str
+    State: str = None
+    InterfaceType: str = None
+    VpcId: str = None
+    SubnetId: str = None
+    PrivateIpAddress: str = None
+    Description: str = None
+    Tags: dict = field(default_factory=dict)
+    Region: str = None
+    Account: str = None
+
+
+@dataclass(slots=True)
+class Snapshot(Record):
+    SnapshotId: str
+    VolumeId: str = None
+    VolumeSize: int = None
+    State: str = None
+    StartTime: datetime = None
+    Description: str = None
+    Tags: dict = field(default_factory=dict)
+    Region: str = None
+    Account: str = None
+
+
+@dataclass(slots=True)
+class Image(Record):
+    ImageId: str
+    Name: str = None
+    State: str = None
+    CreationDate: str = None
+    Tags: dict = field(default_factory=dict)
+    Region: str = None
+    Account: str = None
+
+
+@dataclass(slots=True)
+class LoadBalancer(Record):
+    LoadBalancerName: str
+    LoadBalancerArn: str = None
+    Type: str = None
+    Scheme: str = None
+    State: str = None
+    VpcId: str = None
+    DNSName: str = None
+    CreateTime: datetime = None
+    Region: str = None
+    Account: str = None
+
+
+@dataclass(slots=True)
+class SageMakerEndpoint(Record):
+    EndpointName: str
+    EndpointArn: str = None
+    State: str = None
+    CreateTime: datetime = None
+    Region: str = None
+    Account: str = None
+
+
+@dataclass(slots=True)
+class EksCluster(Record):
+    Name: str
+    Arn: str = None
+    State: str = None
+    Version: str = None
+    CreateTime: datetime = None
+    Tags: dict = field(default_factory=dict)
+    Region: str = None
+    Account: str = None
+
+@dataclass(slots=True)
+class TaggedResource(Record):
+    Arn: str
+    Service: str = None
+    ResourceType: str = None
+    ResourceId: str = None
+    Tags: dict = field(default_factory=dict)
+    Region: str = None
+    Account: str = None
+
+
+def _default(obj):
+    if isinstance(obj, Record):
+        return obj.to_dict()
+    if isinstance(obj, MappingProxyType):
+        return dict(obj)
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    return str(obj)
+
+
+def dumps(data, indent=False):
+    """Serialise scan output (records, dicts, datetimes) to a JSON string.
+
+    Uses orjson when installed, which encodes slotted dataclasses natively.
+    """
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if indent else 0
+        return orjson.dumps(data, default=_default, option=option).decode()
+    return json.dumps(data, indent=2 if indent else None, default=_default)
+
+
+def to_columns(records):
+    """Column-oriented view of one resource kind: {field: [values...]}.
+
+    Records of a single dataclass share one field list; plain dicts (S3
+    buckets, cached snapshots) contribute the union of their keys.
+    """
+    if not records:
+        return {}
+    if all(isinstance(r, Record) for r in records) and len({type(r) for r in records}) == 1:
+        names = list(records[0].__dataclass_fields__)
+    else:
+        names = list(dict.fromkeys(k for r in records for k in r.keys()))
+    return {name: [r.get(name) for r in records] for name in names}
+
+
+def columnar(data):
+    """Whole scan snapshot as {kind: {"count": n, "columns": {...}}}."""
+    batch = {}
+    for kind, records in data.items():
+        if isinstance(records, list):
+            batch[kind] = {"count": len(records), "columns": to_columns(records)}
+        else:
+            batch[kind] = records
+    return batch
@@ -0,0 +1,273 @@
+"""Fan-out scheduler for every region/account sweep.
+
+Jobs run on the shared aio pool; on top of it the scheduler:
+
+* Tunes concurrency per AWS service with AIMD. The limit is one budget per
+  service: every fan-out on that service, in any command or daemon refresh
+  running at the same time, takes its slots from the same Limiter. Every
+  HTTP attempt a client
+  makes is observed on botocore's needs-retry event: a throttling error
+  halves the service's limit, an attempt LATENCY_FACTOR times slower than
+  the fastest seen for that operation and region trims it by 10%, and any
+  other attempt adds one slot per window of calls (one per call until the
+  first cut, like TCP slow start). Cuts are at least COOLDOWN apart, so a
+  burst of throttles counts once.
+* Starts jobs slowest-first, from a per-account latency map of previous
+  runs (keys never seen count as slowest), so the long pole starts first
+  instead of last.
+* Calls on_start(job) / on_done(job, result) on the event loop; track()
+  turns a Rich Progress task into an on_done.
+"""
+import threading
+import time
+
+from aws_wiz import aio
+from aws_wiz.cache import account_cache, read_cache, write_cache
+
+LATENCY_CACHE = "region-latency"
+
+DEFAULT_CONCURRENCY = 20
+# Services with low per-account API rate limits start lower
+INITIAL_CONCURRENCY = {"ce": 5, "service-quotas": 10}
+MIN_CONCURRENCY = 1
+
+LATENCY_FACTOR = 4
+# Attempts faster than this never count as slow, whatever the fastest was
+LATENCY_FLOOR = 0.5
+COOLDOWN = 1.0
+# How often a job waiting for a slot re-reads its service's limit
+POLL = 0.25
+
+# The error codes botocore's standard retry mode treats as throttling
+THROTTLE_CODES = frozenset({
+    "Throttling", "ThrottlingException", "ThrottledException", "RequestThrottledException",
+    "TooManyRequestsException", "ProvisionedThroughputExceededException",
+    "TransactionInProgressException", "RequestLimitExceeded", "BandwidthLimitExceeded",
+    "LimitExceededException", "RequestThrottled", "SlowDown", "PriorRequestNotComplete",
+    "EC2ThrottledException",
+})
+
+_SENT = "awiz_scheduler_sent"
+_limiters = {}
+_lock = threading.Lock()
+_installed = False
+
+
+class Limiter:
+    """AIMD concurrency limit for one AWS service."""
+
+    def __init__(self, service, initial):
+        self.service = service
+        self.limit = float(initial)
+        self.slow_start = True
+        self.fastest = {}
+        self.last_cut = 0.0
+        self.throttles = 0
+        # Jobs running on this service across all fan-outs, and fan-outs waiting for a slot
+        self.in_flight = 0
+        self.waiters = []
+        self.lock = threading.Lock()
+
+    def observe(self, operation, region, seconds, throttled):
+        with self.lock:
+            if throttled:
+                self.throttles += 1
+                self.cut(0.5)
+                return
+            fastest = self.fastest.get((operation, region))
+            if fastest is None or seconds < fastest:
+                self.fastest[(operation, region)] = fastest = seconds
+            if seconds > max(LATENCY_FACTOR * fastest, LATENCY_FLOOR):
+                self.cut(0.9)
+            else:
+                self.limit = min(self.limit + (1 if self.slow_start else 1 / self.limit), aio.MAX_THREADS)
+
+    def cut(self, factor):
+        now = time.monotonic()
+        if now - self.last_cut < COOLDOWN:
+            return
+        self.last_cut = now
+        self.slow_start = False
+        self.limit = max(MIN_CONCURRENCY, self.limit * factor)
+
+    def slots(self):
+        return max(MIN_CONCURRENCY, int(self.limit))
+
+    def try_acquire(self):
+        """Take a slot if fewer than slots() jobs are in flight; else queue a waiter for release()."""
+        import asyncio
+        with self.lock:
+            if self.in_flight < self.slots():
+                self.in_flight += 1
+                return None
+            waiter = asyncio.get_running_loop().create_future()
+            self.waiters.append(waiter)
+            return waiter
+
+    async def acquire(self):
+        import asyncio
+        while True:
+            waiter = self.try_acquire()
+            if waiter is None:
+                return
+            try:
+                # The limit also grows without a release, so re-check every POLL
+                await asyncio.wait_for(waiter, POLL)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                with self.lock:
+                    if waiter in self.waiters:
+                        self.waiters.remove(waiter)
+
+    def release(self):
+        with self.lock:
+            self.in_flight -= 1
+            waiter = self.waiters.pop(0) if self.waiters else None
+        # Fan-outs may run on other threads' event loops (daemon handlers)
+        if waiter is not None:
+            waiter.get_loop().call_soon_threadsafe(_wake, waiter)
+
+
+def _wake(waiter):
+    if not waiter.done():
+        waiter.set_result(None)
+
+def limiter(service):
+    """The process-wide Limiter for `service`."""
+    with _lock:
+        if service not in _limiters:
+            _limiters[service] = Limiter(service, INITIAL_CONCURRENCY.get(service, DEFAULT_CONCURRENCY))
+        return _limiters[service]
+
+def install():
+    """Observe every botocore client created from now on (idempotent)."""
+    global _installed
+    from botocore.session import Session
+    with _lock:
+        if _installed:
+            return
+        _installed = True
+        create_client = Session.create_client
+
+        def scheduled_create_client(session, *args, **kwargs):
+            client = create_client(session, *args, **kwargs)
+            attach(client)
+            return client
+
+        Session.create_client = scheduled_create_client
+
+def attach(client):
+    service = client.meta.service_model.service_name
+    region = client.meta.region_name or "global"
+    events = client.meta.events
+    # First in line: replay and the retry handler answer these events themselves
+    events.register_first("before-send", _stamp)
+    events.register_first("needs-retry", lambda **kw: _observe(service, region, **kw))
+
+def _stamp(request, **kwargs):
+    if request.context is not None:
+        request.context[_SENT] = time.perf_counter()
+
+def _observe(service, region, request_dict, response=None, event_name="", **kwargs):
+    sent = request_dict.get("context", {}).pop(_SENT, None)
+    if sent is None:
+        return None
+    throttled = False
+    if response is not None:
+        http_response, parsed = response
+        code = parsed.get("Error", {}).get("Code")
+        throttled = http_response.status_code == 429 or code in THROTTLE_CODES
+    limiter(service).observe(event_name.rsplit(".", 1)[-1], region, time.perf_counter() - sent, throttled)
+    # Never decide the retry; botocore's own handler does
+    return None
+
+def load_latencies(name):
+    return (read_cache(account_cache(LATENCY_CACHE)) or {}).get(name, {})
+
+def save_latencies(name, measured):
+    """Fold this run's job times into the cached map (mean with the previous value)."""
+    latencies = read_cache(account_cache(LATENCY_CACHE)) or {}
+    previous = latencies.get(name, {})
+    latencies[name] = {
+        **previous,
+        **{k: round((s + previous[k]) / 2 if k in previous else s, 3) for k, s in measured.items()},
+    }
+    write_cache(account_cache(LATENCY_CACHE), latencies)
+
+def track(progress, task_id):
+    """on_done callback advancing a Rich Progress task by one per finished job."""
+    return lambda job, result: progress.advance(task_id)
+
+async def fan_out(fn, jobs, service, name=None, key=None, ceiling=None, on_start=None, on_done=None, return_exceptions=False):
+    """Run fn(*job) for every job; results in job order.
+
+    Jobs take their slots from the `service` Limiter, shared with every
+    other fan-out on that service, so at most its current limit run at once
+    across all of them; this fan-out also never runs more than `ceiling`.
+    With `name`, jobs start slowest-first by the latency map stored under
+    it, keyed by key(job) (default: the first argument, the region), and the
+    map is updated with this run's times. As with asyncio.gather,
+    `return_exceptions` returns a job's exception as its result instead of
+    raising it.
+    """
+    import asyncio
+    install()
+    gate = limiter(service)
+    ceiling = ceiling or aio.MAX_THREADS
+    key = key or (lambda job: job[0])
+    jobs = list(jobs)
+
+    order = list(range(len(jobs)))
+    if name:
+        latencies = load_latencies(name)
+        order.sort(key=lambda i: -latencies.get(key(jobs[i]), float("inf")))
+
+    def clocked(i):
+        # Timed on the pool thread, so time queued for a thread is not latency
+        start = time.perf_counter()
+        try:
+            return fn(*jobs[i]), None, time.perf_counter() - start
+        except Exception as e:
+            return None, e, time.perf_counter() - start
+
+    async def run(i):
+        async with own:
+            await gate.acquire()
+            try:
+                if on_start is not None:
+                    on_start(jobs[i])
+                result, error, seconds = await aio.call(clocked, i)
+            finally:
+                gate.release()
+        if error is not None:
+            if not return_exceptions:
+                raise error
+            result = error
+        return i, result, seconds
+
+    # This fan-out's own bound, on top of the service-wide one
+    own = asyncio.Semaphore(ceiling)
+    results = [None] * len(jobs)
+    measured = {}
+    # Created in start order, so they queue for slots slowest-first
+    tasks = [asyncio.ensure_future(run(i)) for i in order]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            i, result, seconds = await next_done
+            results[i] = result
+            k = key(jobs[i])
+            measured[k] = max(seconds, measured.get(k, 0))
+            if on_done is not None:
+                on_done(jobs[i], result)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    if name and measured:
+        save_latencies(name, measured)
+    return results
+
+def sweep(fn, jobs, service, **kwargs):
+    """fan_out for synchronous callers."""
+    return aio.run(fan_out(fn, jobs, service, **kwargs))
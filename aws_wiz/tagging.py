@@ -0,0 +1,64 @@
+"""Resource Groups Tagging API collector for `awiz scan --tagged`.
+
+get_resources returns the ARN and tags of every tagged resource in a region,
+across services, in one paginated call. The fast path builds the kinds that
+declare `from_tags` in the collector registry (security groups, VPCs,
+subnets, internet gateways: ID and Name tag only) from it, keeps the
+describe calls for kinds whose attributes matter (instance state and type,
+volume size, key names, public IPs, ...), and reports resources of
+unregistered types as the `tagged` kind.
+
+The API only knows resources that carry (or once carried) a tag: untagged
+security groups, VPCs, subnets and gateways, such as the default VPC, are
+missing unless their kind is described with --describe.
+"""
+from aws_wiz.collectors import COLLECTORS, REGISTRY
+from aws_wiz.records import TaggedResource, tags_of
+from aws_wiz.utils import get_client
+
+# Kinds that can be built from the tagging API alone
+FROM_TAGS_KINDS = tuple(c.kind for c in REGISTRY if c.from_tags)
+
+# (service, ARN resource type) -> registered kind; S3 is listed by scan itself
+ARN_KINDS = {c.arn: c.kind for c in REGISTRY if c.arn}
+ARN_KINDS[("s3", "")] = "s3"
+
+
+def parse_arn(arn):
+    """(service, resource type, resource ID) of an ARN; the type is '' when the ARN has none."""
+    parts = arn.split(":", 5)
+    service, resource = parts[2], parts[5]
+    for sep in ("/", ":"):
+        if sep in resource:
+            resource_type, resource_id = resource.split(sep, 1)
+            return service, resource_type, resource_id
+    return service, "", resource
+
+def tagged_resources(region, session=None, account=None, from_tags=FROM_TAGS_KINDS):
+    """{kind: records} from get_resources.
+
+    Kinds in `from_tags` are built from ID and tags, resources of
+    unregistered types become `tagged` records, and everything else
+    (kinds that are described, or not asked for) is left out.
+    """
+    client = get_client('resourcegroupstaggingapi', region, session)
+    data = {kind: [] for kind in from_tags}
+    data["tagged"] = []
+    try:
+        paginator = client.get_paginator('get_resources')
+        for page in paginator.paginate(ResourcesPerPage=100):
+            for r in page.get('ResourceTagMappingList', []):
+                arn = r['ResourceARN']
+                service, resource_type, resource_id = parse_arn(arn)
+                tags = tags_of(r.get('Tags'))
+                kind = ARN_KINDS.get((service, resource_type))
+                if kind is None:
+                    data["tagged"].append(TaggedResource(
+                        Arn=arn, Service=service, ResourceType=resource_type, ResourceId=resource_id,
+                        Tags=tags, Region=region, Account=account
+                    ))
+                elif kind in from_tags:
+                    data[kind].append(COLLECTORS[kind].from_tags(resource_id, tags, region, account))
+    except Exception:
+        pass
+    return data
@@ -0,0 +1,166 @@
+"""Per-API-call tracing for `awiz --trace`.
+
+install() hooks botocore client creation, so every client built afterwards
+(boto3.client, get_client, per-account sessions) gets before-call/after-call
+handlers recording one span per API call: service, operation, region,
+latency, retries, request/response bytes and error code. Calls a command
+swallows in a bare `except` still show up with their error.
+
+On exit the tracer prints the slowest calls and the per-region critical
+path to stderr and writes a Chrome trace-event file (chrome://tracing or
+https://ui.perfetto.dev), one row per worker thread.
+"""
+import json
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlencode
+
+from aws_wiz.state import STATE_DIR
+
+TRACE_DIR = STATE_DIR / "traces"
+_START = "awiz_trace_start"
+
+
+def body_size(body):
+    if isinstance(body, (bytes, bytearray)):
+        return len(body)
+    if isinstance(body, str):
+        return len(body.encode())
+    if isinstance(body, dict):
+        # Query-protocol services (EC2, IAM, STS...) send form-encoded dicts
+        return len(urlencode(body, doseq=True))
+    return None
+
+
+class Tracer:
+    def __init__(self):
+        self.spans = []
+        self.lock = threading.Lock()
+        self.origin = time.perf_counter()
+
+    def install(self):
+        from botocore.session import Session
+        create_client = Session.create_client
+        tracer = self
+
+        def traced_create_client(session, *args, **kwargs):
+            client = create_client(session, *args, **kwargs)
+            tracer.attach(client)
+            return client
+
+        Session.create_client = traced_create_client
+
+    def attach(self, client):
+        service = client.meta.service_model.service_name
+        region = client.meta.region_name or "global"
+        events = client.meta.events
+        events.register("before-call", self.before_call)
+        events.register("after-call", lambda **kw: self.after_call(service, region, **kw))
+        events.register("after-call-error", lambda **kw: self.after_call_error(service, region, **kw))
+
+    def before_call(self, params, context, **kwargs):
+        context[_START] = (time.perf_counter(), body_size(params.get("body")))
+
+    def after_call(self, service, region, http_response, parsed, model, context, **kwargs):
+        error = None
+        if http_response.status_code >= 300:
+            error = parsed.get("Error", {}).get("Code") or str(http_response.status_code)
+        received = http_response.headers.get("content-length")
+        self.record(service, model.name, region, context,
+                    retries=parsed.get("ResponseMetadata", {}).get("RetryAttempts", 0),
+                    received=int(received) if received is not None else None,
+                    error=error)
+
+    def after_call_error(self, service, region, exception, context, **kwargs):
+        operation = kwargs.get("event_name", "").rsplit(".", 1)[-1]
+        self.record(service, operation, region, context, error=type(exception).__name__)
+
+    def record(self, service, operation, region, context, retries=0, received=None, error=None):
+        start, sent = context.get(_START, (None, None))
+        if start is None:
+            return
+        end = time.perf_counter()
+        with self.lock:
+            self.spans.append({
+                "service": service, "operation": operation, "region": region,
+                "start": start - self.origin, "seconds": end - start,
+                "retries": retries, "sent": sent, "received": received, "error": error,
+                "thread": threading.current_thread().name,
+            })
+
+    def write_chrome_trace(self, path):
+        threads = {}
+        events = []
+        for s in self.spans:
+            tid = threads.setdefault(s["thread"], len(threads) + 1)
+            events.append({
+                "name": f"{s['service']}.{s['operation']}", "cat": s["service"], "ph": "X",
+                "ts": round(s["start"] * 1e6), "dur": round(s["seconds"] * 1e6),
+                "pid": 1, "tid": tid,
+                "args": {k: s[k] for k in ("region", "retries", "sent", "received", "error")},
+            })
+        events.extend(
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": name}}
+            for name, tid in threads.items()
+        )
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def print_summary(self, console, top=10):
+        from rich.table import Table
+        from rich import box
+        if not self.spans:
+            console.print("[dim]trace: no AWS API calls.[/dim]")
+            return
+
+        wall = max(s["start"] + s["seconds"] for s in self.spans)
+        busy = sum(s["seconds"] for s in self.spans)
+        errors = sum(1 for s in self.spans if s["error"])
+        retries = sum(s["retries"] for s in self.spans)
+        console.print(
+            f"\n[bold]trace:[/bold] {len(self.spans)} API calls in {wall:.2f}s "
+            f"({busy:.2f}s of call time, {errors} errors, {retries} retries)"
+        )
+
+        table = Table(box=box.SIMPLE, header_style="bold white", title="Slowest calls")
+        for col in ("Call", "Region", "ms", "Retries", "Bytes in", "Error"):
+            table.add_column(col, justify="right" if col in ("ms", "Retries", "Bytes in") else "left")
+        for s in sorted(self.spans, key=lambda s: s["seconds"], reverse=True)[:top]:
+            table.add_row(
+                f"{s['service']}.{s['operation']}", s["region"], f"{s['seconds'] * 1000:.0f}",
+                str(s["retries"]), str(s["received"] if s["received"] is not None else "-"),
+                f"[red]{s['error']}[/red]" if s["error"] else "",
+            )
+        console.print(table)
+
+        # The region whose calls finish last bounds the whole fan-out
+        regions = {}
+        for s in self.spans:
+            r = regions.setdefault(s["region"], {"first": s["start"], "last": 0.0, "calls": 0, "busy": 0.0, "slowest": s})
+            r["first"] = min(r["first"], s["start"])
+            r["last"] = max(r["last"], s["start"] + s["seconds"])
+            r["calls"] += 1
+            r["busy"] += s["seconds"]
+            if s["seconds"] > r["slowest"]["seconds"]:
+                r["slowest"] = s
+
+        table = Table(box=box.SIMPLE, header_style="bold white", title="Per-region critical path")
+        for col in ("Region", "Calls", "Start s", "End s", "Busy s", "Slowest call"):
+            table.add_column(col, justify="left" if col in ("Region", "Slowest call") else "right")
+        for name, r in sorted(regions.items(), key=lambda kv: kv[1]["last"], reverse=True)[:top]:
+            slow = r["slowest"]
+            table.add_row(
+                name, str(r["calls"]), f"{r['first']:.2f}", f"{r['last']:.2f}", f"{r['busy']:.2f}",
+                f"{slow['service']}.{slow['operation']} ({slow['seconds'] * 1000:.0f} ms)",
+            )
+        console.print(table)
+
+    def report(self, path=None):
+        from rich.console import Console
+        console = Console(stderr=True)
+        self.print_summary(console)
+        path = path or TRACE_DIR / f"trace-{datetime.now().strftime('%Y%m%dT%H%M%S')}.json"
+        self.write_chrome_trace(path)
+        console.print(f"[dim]trace: Chrome trace written to {path}[/dim]")
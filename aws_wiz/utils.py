@@ -1,10 +1,53 @@
-import boto3
+import threading
+from functools import cache
+
+from aws_wiz.aio import MAX_POOL_CONNECTIONS
+from aws_wiz.cache import account_cache, read_cache, write_cache
+
+REGIONS_CACHE_TTL = 24 * 3600
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(service, region=None, session=None):
+    """Shared client pool keyed by (session, service, region).
+
+    Clients are thread-safe once built; building them is not, hence the lock.
+    Each keeps up to aio.MAX_POOL_CONNECTIONS connections, so concurrent
+    fan-out jobs on one region do not queue for botocore's default 10.
+    """
+    import boto3
+    from botocore.config import Config
+    key = (session, service, region)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = (session or boto3).client(
+                service, region_name=region, config=Config(max_pool_connections=MAX_POOL_CONNECTIONS)
+            )
+            _clients[key] = client
+    return client
+
+
+@cache
+def get_console():
+    """Process-wide rich Console, created on first use so importing a command stays cheap."""
+    from rich.console import Console
+    return Console()
 
 
 def get_regions():
+    # Opt-in regions differ per account
+    import boto3
+    cached = read_cache(account_cache("regions"), REGIONS_CACHE_TTL)
+    if cached:
+        return cached
     try:
         ec2 = boto3.client('ec2', region_name='us-east-1')
         response = ec2.describe_regions()
-        return [r['RegionName'] for r in response['Regions']]
+        regions = [r['RegionName'] for r in response['Regions']]
     except Exception:
         return ['us-east-1']
+    write_cache(account_cache("regions"), regions)
+    return regions
@@ -0,0 +1,281 @@
+"""Fan-out benchmark for the region/account-parallel commands.
+
+Starts a local moto server, seeds it with a configurable number of resources
+in N regions, then runs scan, list-instances, quota-check, quota-status,
+fellow-costs and nuke in process against it. Every botocore client gets a
+per-call latency (and optional throttling) injected on `before-send`, and is
+traced with aws_wiz.trace, so each command reports wall time, API calls,
+retries, errors, peak Python heap (tracemalloc) and calls/s:
+
+    python benchmarks/fanout.py [--regions 4] [--latency-ms 50] [--throttle 0.05]
+    python benchmarks/fanout.py --save-baseline      # record benchmarks/baselines/fanout.json
+    python benchmarks/fanout.py --threshold 0.25     # exit 1 on >25% regression vs baseline
+
+Seeding and resets go straight to moto, without injection or tracing. moto
+does not implement Service Quotas listing/history, so quota-check and
+quota-status exercise their fan-out and error paths only.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import urllib.request
+from pathlib import Path
+
+BASELINE = Path(__file__).parent / "baselines" / "fanout.json"
+REGIONS = [
+    "us-east-1", "us-west-2", "eu-west-1", "ap-northeast-1", "eu-central-1", "ap-southeast-2",
+    "us-east-2", "us-west-1", "eu-west-2", "ap-south-1", "sa-east-1", "ca-central-1",
+]
+# Compared against the baseline; wall time is noisy, call counts are exact
+METRICS = ("seconds", "api_calls", "peak_mb")
+
+SCENARIOS = {
+    "scan": ["scan"],
+    "list-instances": ["list-instances", "--filter", "t3", "--region", "all"],
+    "quota-check": ["quota-check", "--refresh", "--usage"],
+    "quota-status": ["quota-status", "--all"],
+    "fellow-costs": ["fellow-costs"],
+    # Destructive, so it always runs last
+    "nuke": ["nuke", "--force"],
+}
+
+# Throttling error bodies per botocore protocol, so retry handlers see a real throttle
+THROTTLES = {
+    "ec2": (503, {}, b"<Response><Errors><Error><Code>RequestLimitExceeded</Code><Message>Request limit exceeded.</Message></Error></Errors><RequestID>bench</RequestID></Response>"),
+    "query": (400, {}, b"<ErrorResponse><Error><Type>Sender</Type><Code>Throttling</Code><Message>Rate exceeded</Message></Error><RequestId>bench</RequestId></ErrorResponse>"),
+    "rest-xml": (503, {}, b"<Error><Code>SlowDown</Code><Message>Please reduce your request rate.</Message></Error>"),
+    "json": (400, {"x-amzn-ErrorType": "ThrottlingException"}, b'{"__type": "ThrottlingException", "message": "Rate exceeded"}'),
+    "rest-json": (429, {"x-amzn-ErrorType": "ThrottlingException"}, b'{"message": "Rate exceeded"}'),
+}
+
+
+class _Body:
+    def __init__(self, data):
+        self.data = data
+
+    def stream(self, **kwargs):
+        yield self.data
+
+
+class Injector:
+    """Adds latency to every request and answers a fraction of them with a throttling error."""
+
+    def __init__(self, latency, throttle, seed=0):
+        self.latency = latency
+        self.throttle = throttle
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.throttled = 0
+
+    def install(self):
+        from botocore.session import Session
+        create_client = Session.create_client
+        injector = self
+
+        def injected_create_client(session, *args, **kwargs):
+            client = create_client(session, *args, **kwargs)
+            protocol = client.meta.service_model.protocol
+            client.meta.events.register("before-send", lambda request, **kw: injector.before_send(protocol, request))
+            return client
+
+        Session.create_client = injected_create_client
+
+    def before_send(self, protocol, request):
+        from botocore.awsrequest import AWSResponse
+        if self.latency:
+            time.sleep(self.latency)
+        with self.lock:
+            throttle = protocol in THROTTLES and self.random.random() < self.throttle
+            self.throttled += throttle
+        if not throttle:
+            return None
+        status, headers, body = THROTTLES[protocol]
+        return AWSResponse(request.url, status, headers, _Body(body))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_moto():
+    port = free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "moto.server", "-H", "127.0.0.1", "-p", str(port)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    endpoint = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(f"{endpoint}/moto-api/", timeout=1)
+            return proc, endpoint
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise SystemExit("moto server did not start (pip install 'moto[server]')")
+
+def reset_moto(endpoint):
+    urllib.request.urlopen(urllib.request.Request(f"{endpoint}/moto-api/reset", method="POST"))
+
+def seed_clients(endpoint, regions):
+    """Clients for seeding; built before the injector and tracer hook client creation."""
+    import boto3
+    ec2 = {r: boto3.client("ec2", region_name=r, endpoint_url=endpoint) for r in regions}
+    return ec2, boto3.client("s3", region_name="us-east-1", endpoint_url=endpoint)
+
+def seed(clients, opts):
+    """Create the resources every scenario reads (or nuke deletes)."""
+    ec2_clients, s3 = clients
+    for region, ec2 in ec2_clients.items():
+        image_id = ec2.describe_images(Owners=["amazon"])["Images"][0]["ImageId"]
+        vpc_id = ec2.create_vpc(CidrBlock="10.0.0.0/16")["Vpc"]["VpcId"]
+        subnet_id = ec2.create_subnet(VpcId=vpc_id, CidrBlock="10.0.1.0/24", AvailabilityZone=f"{region}a")["Subnet"]["SubnetId"]
+        for n in range(opts.groups):
+            ec2.create_security_group(GroupName=f"bench-{n}", Description="benchmark", VpcId=vpc_id)
+        if opts.instances:
+            ec2.run_instances(ImageId=image_id, InstanceType="t3.micro", SubnetId=subnet_id,
+                              MinCount=opts.instances, MaxCount=opts.instances)
+        for _ in range(opts.volumes):
+            ec2.create_volume(Size=8, AvailabilityZone=f"{region}a")
+        ec2.create_key_pair(KeyName="bench")
+        ec2.allocate_address(Domain="vpc")
+
+    for n in range(opts.buckets):
+        s3.create_bucket(Bucket=f"bench-{n}")
+
+def write_fellows(path, count):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        for n in range(count):
+            f.write(f'[fellow-{n}]\naws_access_key_id = "AKIABENCH{n:011d}"\naws_secret_access_key = "bench"\n\n')
+
+def run_scenario(cli, tracer, args):
+    """Run one command in process; returns its metrics."""
+    tracer.spans.clear()
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+        try:
+            cli.main(args, prog_name="awiz", standalone_mode=False)
+        except SystemExit:
+            pass
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    spans = list(tracer.spans)
+    return {
+        "seconds": round(seconds, 3),
+        "api_calls": len(spans),
+        "retries": sum(s["retries"] for s in spans),
+        "errors": sum(1 for s in spans if s["error"]),
+        "peak_mb": round(peak / 1e6, 2),
+        "calls_per_s": round(len(spans) / seconds, 1) if seconds else None,
+    }
+
+def compare(results, baseline, threshold):
+    """Names of (scenario, metric) pairs that regressed more than `threshold` vs the baseline."""
+    if baseline.get("config") != results["config"]:
+        print("baseline was recorded with a different config; skipping threshold check", file=sys.stderr)
+        return []
+    regressions = []
+    for name, metrics in results["scenarios"].items():
+        base = baseline["scenarios"].get(name)
+        if not base:
+            continue
+        for metric in METRICS:
+            if base[metric] and metrics[metric] > base[metric] * (1 + threshold):
+                regressions.append(f"{name} {metric}: {metrics[metric]} vs baseline {base[metric]}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--regions", type=int, default=4, help=f"Regions to seed and scan (max {len(REGIONS)})")
+    parser.add_argument("--instances", type=int, default=5, help="Instances per region")
+    parser.add_argument("--volumes", type=int, default=5, help="Extra volumes per region")
+    parser.add_argument("--groups", type=int, default=5, help="Security groups per region")
+    parser.add_argument("--buckets", type=int, default=10)
+    parser.add_argument("--fellows", type=int, default=5, help="Accounts in fellows.toml for fellow-costs")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Latency added to every API call")
+    parser.add_argument("--throttle", type=float, default=0.0, help="Fraction of calls answered with a throttling error")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, help="Run only these (repeatable)")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed regression vs baseline (0.25 = 25%%)")
+    parser.add_argument("--save-baseline", action="store_true", help="Store results as the new baseline instead of checking against it")
+    parser.add_argument("--output", "-o", type=Path, help="Also write results as JSON to this file")
+    opts = parser.parse_args()
+
+    regions = REGIONS[:opts.regions]
+    proc, endpoint = start_moto()
+    home = tempfile.mkdtemp(prefix="awiz-bench-")
+    # Before importing aws_wiz: STATE_DIR and the identity key come from the environment
+    os.environ.update({
+        "HOME": home, "AWS_ENDPOINT_URL": endpoint, "AWIZ_NO_DAEMON": "1",
+        "AWS_ACCESS_KEY_ID": "bench", "AWS_SECRET_ACCESS_KEY": "bench", "AWS_DEFAULT_REGION": "us-east-1",
+    })
+    os.environ.pop("AWS_PROFILE", None)
+
+    try:
+        from aws_wiz.cache import CACHE_DIR, account_cache, write_cache
+        from aws_wiz.cli import cli
+        from aws_wiz.state import FELLOWS_FILE
+        from aws_wiz.trace import Tracer
+
+        clients = seed_clients(endpoint, regions)
+        injector = Injector(opts.latency_ms / 1000, opts.throttle)
+        injector.install()
+        tracer = Tracer()
+        tracer.install()
+        write_fellows(FELLOWS_FILE, opts.fellows)
+
+        results = {
+            "config": {k: getattr(opts, k) for k in ("regions", "instances", "volumes", "groups", "buckets", "fellows", "latency_ms", "throttle")},
+            "python": platform.python_version(),
+            "machine": f"{platform.machine()} x{os.cpu_count()}",
+            "scenarios": {},
+        }
+        tracemalloc.start()
+        for name in [n for n in SCENARIOS if not opts.scenario or n in opts.scenario]:
+            reset_moto(endpoint)
+            seed(clients, opts)
+            # Cold caches for every command, but only the seeded regions
+            for path in CACHE_DIR.glob("*.json"):
+                path.unlink()
+            write_cache(account_cache("regions"), regions)
+
+            metrics = run_scenario(cli, tracer, SCENARIOS[name])
+            results["scenarios"][name] = metrics
+            print(f"{name:15s} {metrics['seconds']:8.3f} s  {metrics['api_calls']:5d} calls  "
+                  f"{metrics['retries']:4d} retries  {metrics['errors']:4d} errors  "
+                  f"{metrics['peak_mb']:7.2f} MB  {metrics['calls_per_s']:7.1f} calls/s")
+        tracemalloc.stop()
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    if opts.output:
+        opts.output.write_text(json.dumps(results, indent=2))
+    if opts.save_baseline:
+        BASELINE.parent.mkdir(parents=True, exist_ok=True)
+        BASELINE.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"baseline written to {BASELINE}")
+        return
+
+    if not BASELINE.exists():
+        print("no baseline yet; run with --save-baseline", file=sys.stderr)
+        return
+    regressions = compare(results, json.loads(BASELINE.read_text()), opts.threshold)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
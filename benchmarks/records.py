@@ -0,0 +1,91 @@
+"""Memory and serialisation benchmark for scan records.
+
+Builds N synthetic instances as the old per-resource dicts and as slotted
+records (aws_wiz.records), then reports peak memory and build/serialise time
+per 100k resources for row-oriented and columnar JSON output:
+
+    python benchmarks/records.py [--count 100000]
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from aws_wiz import records
+from aws_wiz.records import Instance, columnar, dumps, tags_of
+
+REGIONS = ["us-east-1", "us-west-2", "eu-west-1", "ap-northeast-1"]
+BASE_TIME = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def raw_instances(count):
+    """describe_instances-shaped payloads; a third of them untagged."""
+    for n in range(count):
+        tags = [{'Key': 'Name', 'Value': f"node-{n}"}, {'Key': 'team', 'Value': 'ml'}] if n % 3 else []
+        # Fresh string per record, as botocore's parser produces
+        region = (REGIONS[n % len(REGIONS)] + " ")[:-1]
+        yield region, {
+            'InstanceId': f"i-{n:017x}", 'InstanceType': 'g5.xlarge', 'State': {'Name': 'running'},
+            'PublicIpAddress': None, 'PrivateIpAddress': f"10.0.{n // 256 % 256}.{n % 256}",
+            'LaunchTime': BASE_TIME + timedelta(seconds=n), 'KeyName': 'lab', 'ImageId': 'ami-0123456789abcdef0',
+            'PlatformDetails': 'Linux/UNIX', 'VpcId': 'vpc-0abc', 'SubnetId': 'subnet-0abc', 'Tags': tags,
+        }
+
+
+def build_dicts(raw):
+    return [{
+        'InstanceId': i.get('InstanceId'), 'InstanceType': i.get('InstanceType'),
+        'State': i.get('State', {}).get('Name'), 'PublicIpAddress': i.get('PublicIpAddress'),
+        'PrivateIpAddress': i.get('PrivateIpAddress'), 'LaunchTime': i.get('LaunchTime'),
+        'KeyName': i.get('KeyName'), 'ImageId': i.get('ImageId'),
+        'PlatformDetails': i.get('PlatformDetails', ''), 'VpcId': i.get('VpcId'), 'SubnetId': i.get('SubnetId'),
+        'Tags': {tag['Key']: tag['Value'] for tag in i.get('Tags', [])}, 'Region': region,
+    } for region, i in raw]
+
+
+def build_records(raw):
+    return [Instance(
+        InstanceId=i.get('InstanceId'), InstanceType=i.get('InstanceType'),
+        State=i.get('State', {}).get('Name'), PublicIpAddress=i.get('PublicIpAddress'),
+        PrivateIpAddress=i.get('PrivateIpAddress'), LaunchTime=i.get('LaunchTime'),
+        KeyName=i.get('KeyName'), ImageId=i.get('ImageId'),
+        PlatformDetails=i.get('PlatformDetails', ''), VpcId=i.get('VpcId'), SubnetId=i.get('SubnetId'),
+        Tags=tags_of(i.get('Tags')), Region=sys.intern(region),
+    ) for region, i in raw]
+
+
+def measure(label, build, serialise, raw, per):
+    tracemalloc.start()
+    start = time.perf_counter()
+    data = build(raw)
+    built = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    size = len(serialise({"ec2": data}))
+    dumped = time.perf_counter() - start
+
+    print(f"{label:<28} {peak * per / 2**20:>9.1f} MiB {built * per * 1000:>9.0f} ms {dumped * per * 1000:>9.0f} ms {size * per / 2**20:>9.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=100_000, help="Resources to generate")
+    args = parser.parse_args()
+
+    raw = list(raw_instances(args.count))
+    per = 100_000 / args.count
+    print(f"Per 100k instances (orjson {'available' if records.orjson else 'not installed'})")
+    print(f"{'':<28} {'peak mem':>13} {'build':>12} {'serialise':>12} {'JSON size':>13}")
+
+    default = lambda o: o.isoformat() if isinstance(o, datetime) else str(o)
+    measure("dicts + json", build_dicts, lambda d: json.dumps(d, default=default), raw, per)
+    measure("records + dumps", build_records, dumps, raw, per)
+    measure("records + columnar dumps", build_records, lambda d: dumps(columnar(d)), raw, per)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Startup benchmark for the awiz CLI.
+
+Runs `awiz --help` and tab completion requests (command names and option
+values) in fresh interpreters under
+`python -X importtime`, reports wall time and the slowest imports, and fails
+(exit 1) if either exceeds the budget or pulls in boto3/rich:
+
+    python benchmarks/startup.py [--runs 5] [--budget-ms 150]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ENTRY = "from aws_wiz.cli import cli; cli(prog_name='awiz')"
+FORBIDDEN = ("boto3", "botocore", "rich")
+
+SCENARIOS = {
+    "help": (["--help"], {}),
+    "complete": ([], {"_AWIZ_COMPLETE": "bash_complete", "COMP_WORDS": "awiz quota-", "COMP_CWORD": "1"}),
+    # Value completion imports the command module to reach its shell_complete callback
+    "complete-id": ([], {"_AWIZ_COMPLETE": "bash_complete", "COMP_WORDS": "awiz stop --id i-", "COMP_CWORD": "3"}),
+    "complete-region": ([], {"_AWIZ_COMPLETE": "bash_complete", "COMP_WORDS": "awiz stop --region ", "COMP_CWORD": "3"}),
+    "complete-idle": ([], {"_AWIZ_COMPLETE": "bash_complete", "COMP_WORDS": "awiz idle --region ", "COMP_CWORD": "3"}),
+    "complete-launch": ([], {"_AWIZ_COMPLETE": "bash_complete", "COMP_WORDS": "awiz launch --type g5", "COMP_CWORD": "3"}),
+}
+
+
+def run_once(args, extra_env):
+    env = {**os.environ, **extra_env}
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", ENTRY, *args],
+        env=env, capture_output=True, text=True,
+    )
+    elapsed = (time.perf_counter() - start) * 1000
+    if proc.returncode != 0:
+        raise SystemExit(f"awiz {' '.join(args)} exited with {proc.returncode}:\n{proc.stderr[-2000:]}")
+
+    imports = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        imports.append((int(cumulative_us), name.strip()))
+    return elapsed, imports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=150.0, help="Median wall-time budget per scenario")
+    opts = parser.parse_args()
+
+    failed = False
+    for name, (args, extra_env) in SCENARIOS.items():
+        timings = []
+        for _ in range(opts.runs):
+            elapsed, imports = run_once(args, extra_env)
+            timings.append(elapsed)
+
+        median = statistics.median(timings)
+        loaded = {mod for _, mod in imports}
+        leaked = sorted(m for m in loaded if m.split(".")[0] in FORBIDDEN)
+        top = sorted(imports, reverse=True)[:5]
+
+        status = "ok"
+        if median > opts.budget_ms:
+            status = f"FAIL (median {median:.0f} ms > budget {opts.budget_ms:.0f} ms)"
+            failed = True
+        if leaked:
+            status = f"FAIL (imports {', '.join(m for m in leaked if '.' not in m)})"
+            failed = True
+
+        print(f"{name:10s} median {median:7.1f} ms  min {min(timings):7.1f} ms  {status}")
+        for cumulative_us, mod in top:
+            print(f"    {cumulative_us / 1000:7.1f} ms  {mod}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""The daemon against a moto server: ping, scan/query answers, identity check, shutdown."""
+import json
+import os
+import socket
+import stat
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+moto_server = pytest.importorskip("moto.server")
+
+from aws_wiz import daemon
+from aws_wiz.cache import account_cache
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def send(path, request):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(30)
+        sock.connect(str(path))
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        chunks = []
+        while chunk := sock.recv(65536):
+            chunks.append(chunk)
+    return json.loads(b"".join(chunks))
+
+
+@pytest.fixture(scope="module")
+def aws_env():
+    server = moto_server.ThreadedMotoServer(port=0)
+    server.start()
+    host, port = server.get_host_and_port()
+    env = {
+        "AWS_ENDPOINT_URL": f"http://{host}:{port}",
+        "AWS_ACCESS_KEY_ID": "testing",
+        "AWS_SECRET_ACCESS_KEY": "testing",
+        "AWS_DEFAULT_REGION": "us-east-1",
+    }
+    with pytest.MonkeyPatch.context() as mp:
+        for key, value in env.items():
+            mp.setenv(key, value)
+        mp.delenv("AWS_PROFILE", raising=False)
+        mp.delenv("AWIZ_NO_DAEMON", raising=False)
+        yield env
+    server.stop()
+
+
+@pytest.fixture(scope="module")
+def running_daemon(aws_env, tmp_path_factory):
+    import boto3
+    tmp_path = tmp_path_factory.mktemp("home")
+    ec2 = boto3.client("ec2")
+    ec2.create_vpc(CidrBlock="10.9.0.0/16")
+    # Seed the region list so the daemon's first refresh sweeps one region only
+    cache_dir = tmp_path / ".aws-wiz" / "cache"
+    cache_dir.mkdir(parents=True)
+    (cache_dir / f"{account_cache('regions')}.json").write_text(json.dumps(["us-east-1"]))
+
+    socket_path = tmp_path / ".aws-wiz" / "awiz.sock"
+    mp = pytest.MonkeyPatch()
+    mp.setattr(daemon, "SOCKET_PATH", socket_path)
+    env = {**os.environ, "HOME": str(tmp_path), "PYTHONPATH": str(ROOT)}
+    proc = subprocess.Popen([sys.executable, "-m", "aws_wiz.daemon", "--interval", "3600"], env=env, cwd=tmp_path,
+                            stderr=subprocess.PIPE)
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        if socket_path.exists() and (daemon.query("ping") or {}).get("refreshed"):
+            break
+        if proc.poll() is not None:
+            pytest.fail(proc.stderr.read().decode())
+        time.sleep(0.2)
+    else:
+        proc.kill()
+        pytest.fail("daemon did not finish its first refresh")
+    yield socket_path, proc
+    mp.undo()
+    if proc.poll() is None:
+        proc.kill()
+
+
+def test_socket_is_private(running_daemon):
+    socket_path, _ = running_daemon
+    assert stat.S_IMODE(socket_path.stat().st_mode) == 0o600
+
+
+def test_ping_scan_and_query(running_daemon):
+    ping = daemon.query("ping")
+    assert ping["refreshed"] and ping["identity"]
+    scan = daemon.query("scan")
+    assert any(v["CidrBlock"] == "10.9.0.0/16" for v in scan["vpcs"])
+    result = daemon.query("query", expr="vpc")
+    assert any(m["Kind"] == "vpcs" and m["CidrBlock"] == "10.9.0.0/16" for m in result["matches"])
+
+
+def test_other_identity_is_refused(running_daemon, monkeypatch):
+    socket_path, _ = running_daemon
+    response = send(socket_path, {"op": "scan", "identity": "someone-else"})
+    assert response["ok"] is False and response["result"] is None
+    # A client with other credentials gets no answer and falls back to AWS
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "other")
+    assert daemon.query("scan") is None
+    assert daemon.query("ping") is not None
+
+
+def test_shutdown(running_daemon):
+    socket_path, proc = running_daemon
+    assert send(socket_path, {"op": "shutdown"}) == {"ok": True, "result": "bye"}
+    proc.wait(timeout=30)
+    assert not socket_path.exists()
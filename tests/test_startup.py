@@ -0,0 +1,63 @@
+"""`awiz --help` and tab completion stay cheap: no boto3/rich imports, help text in sync."""
+import importlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from aws_wiz.cli import LAZY_COMMANDS
+
+ROOT = Path(__file__).resolve().parent.parent
+FORBIDDEN = ("boto3", "botocore", "rich")
+# Twice benchmarks/startup.py's budget, so a loaded machine does not flake
+BUDGET_MS = 300
+
+# Prints the forbidden modules loaded by the time the interpreter exits (click always sys.exit()s)
+ENTRY = f"""
+import atexit, json, sys
+atexit.register(lambda: print("LOADED " + json.dumps(sorted({{m.split('.')[0] for m in sys.modules}} & set({FORBIDDEN!r}))), file=sys.stderr))
+from aws_wiz.cli import cli
+cli(prog_name='awiz')
+"""
+
+SCENARIOS = {
+    "help": (["--help"], {}),
+    "complete-command": ([], {"_AWIZ_COMPLETE": "bash_complete", "COMP_WORDS": "awiz quota-", "COMP_CWORD": "1"}),
+    "complete-id": ([], {"_AWIZ_COMPLETE": "bash_complete", "COMP_WORDS": "awiz stop --id i-", "COMP_CWORD": "3"}),
+    "complete-region": ([], {"_AWIZ_COMPLETE": "bash_complete", "COMP_WORDS": "awiz idle --region ", "COMP_CWORD": "3"}),
+    "complete-type": ([], {"_AWIZ_COMPLETE": "bash_complete", "COMP_WORDS": "awiz launch --type g5", "COMP_CWORD": "3"}),
+}
+
+
+def run_cli(args, extra_env):
+    env = {**os.environ, "PYTHONPATH": str(ROOT), **extra_env}
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-c", ENTRY, *args], env=env, capture_output=True, text=True)
+    elapsed = (time.perf_counter() - start) * 1000
+    assert proc.returncode == 0, proc.stderr
+    loaded = [line for line in proc.stderr.splitlines() if line.startswith("LOADED ")]
+    return json.loads(loaded[-1][len("LOADED "):]), elapsed
+
+
+@pytest.mark.parametrize("scenario", SCENARIOS)
+def test_no_heavy_imports(scenario):
+    loaded, _ = run_cli(*SCENARIOS[scenario])
+    assert loaded == []
+
+
+def test_help_within_budget():
+    timings = [run_cli(*SCENARIOS["help"])[1] for _ in range(3)]
+    assert statistics.median(timings) < BUDGET_MS
+
+
+@pytest.mark.parametrize("name", LAZY_COMMANDS)
+def test_lazy_short_help_matches_command(name):
+    module_name, attr, short_help = LAZY_COMMANDS[name]
+    command = getattr(importlib.import_module(module_name), attr)
+    assert command.get_short_help_str(1000) == short_help
+